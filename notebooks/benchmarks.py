@@ -0,0 +1,479 @@
+# Benchmarks for the cleaning functions
+#
+# Run from the notebooks folder:  python benchmarks.py [GSAF5.xls]
+# Suite of every cleaning function:  python benchmarks.py --suite [--scales 1 10 100 1000] [--compare old.json]
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import bitmap_index
+import cube
+import functions as f
+import synthetic
+
+
+# Number of rows in the raw GSAF5.xls spreadsheet
+REAL_ROWS = 6970
+
+# Sample of the date forms found in the raw 'Date' column
+SAMPLE_DATES = [
+    datetime.datetime(2024, 9, 16), datetime.datetime(2023, 7, 4), datetime.datetime(1998, 1, 2),
+    '15 Mar 2024', '02 Mar-2024', '04-Feb-2024', '09-Sep-23', 'Aug-24-1806', 'Sep-1805',
+    'October 1815', '1900-1905', '1990 or 1991', 'Reported 10 Jul 2019', 'Ca. 214 B.C.',
+    'Ca. 77 A.D.', 'Circa 1855', 'Before 1903', 'Between 1900 & 1910', 'No date', 'Late 1960s',
+    '1934.a', 'World War II', '1942', np.nan,
+]
+
+# Sample of the values found in the raw 'Age' column
+SAMPLE_AGES = [
+    30, 16, 15, 23, 'Middle age', '13', '46', '30s', '20/30', '20s', '40s', 'teen', 'Teen', '45 and 15',
+    '28 & 22', '60s', "20's", '9 & 60', 'a minor', '18 months', '18 or 20', '12 or 13', '\xa0 ', ' ',
+    '6½', '21 & ?', 'mid-30s', ' 30', '7      &    31', '20?', 'Elderly', 'Ca. 33', '74 ', '>50',
+    '37, 67, 35, 27,  ? & 27', 'X', 'Both 11', 'A.M.', '!2', np.nan,
+]
+
+# Sample of the values found in the raw 'Time' column
+SAMPLE_TIMES = [
+    '1600hr', '11.30hr', '11hr15', '13h15', '9h', '15h30', 'Not stated', 'Not advised', '?', 'Morning',
+    'Afternoon', 'Night', '"Midday"', 'Early  morning', '11hoo', '`17h00', '10j30', 1415, '14h00-15h00',
+    'Evening', 'Before 10h00', 'Dusk', 'Late afternoon', 'After dusk', 'Just before noon', '>17h30',
+    'Sometime between 06h00 & 08hoo', '-16h30', '1500h ', ' ', np.nan,
+]
+
+
+def scale_values(values, scale, base_rows=REAL_ROWS):
+    '''
+    Repeat a list of sample values up to base_rows * scale rows.
+    '''
+    rows = int(base_rows * scale)
+    repeats = -(-rows // len(values))
+    return pd.Series(list(values) * repeats, dtype=object).iloc[:rows].reset_index(drop=True)
+
+
+def time_call(func, *args, **kwargs):
+    '''
+    Return (seconds, result) for a single call.
+    '''
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def same_values(old, new):
+    '''
+    True when both Series hold the same values in the same order, ignoring the dtype.
+    '''
+    old = old.astype(object).reset_index(drop=True)
+    new = new.astype(object).reset_index(drop=True)
+    missing = old.isna()
+    return len(old) == len(new) and missing.equals(new.isna()) and bool((old[~missing] == new[~missing]).all())
+
+
+def legacy_clean_age(df):
+    '''
+    The replace chain that clean_age used before, kept as the reference for benchmark_clean_age.
+    '''
+    df["Age"] = df["Age"].replace(['Middle Age', '(adult)', '"middle-age"', '50s', 'adult','Middle age'], 50)
+    df['Age'] = df["Age"].replace(['20/30','20s', '28 & 22',  "20's", '28 & 26', '28, 23 & 30', '21 & ?', '23 & 20','20?', 'mid-20s','21 or 26','18 to 22','? & 19','23 & 26','25 or 28','"young"','young','17 & 35','18 or 20'],25)
+    df["Age"] = df['Age'].replace(['40s', '45 and 15', '9 & 60', '46 & 34'], 45)
+    df["Age"] = df['Age'].replace(['teen', 'Teen','a minor','Teens','?    &   14', '13 or 14','7      &    31', '16 to 18','13 or 18', '12 or 13'], 15)
+    df["Age"] = df["Age"].replace('Both 11', 11)
+    df["Age"] = df['Age'].replace(['a minor', '18 months', '9 months'], 1)
+    df["Age"] = df['Age'].replace(['Elderly', '>50', "60's", '60s'], 65)
+    df["Age"] = df['Age'].replace(['9 or 10', '10 or 12', '7 or 8','9 & 60','8 or 10'], 10)
+    df["Age"] = df['Age'].replace(['mid-30s', '33 & 26', '31 or 33', '36 & 23','30 or 36','21, 34,24 & 35','Ca. 33','33 & 37','32 & 30','37, 67, 35, 27,  ? & 27','30 & 32','33 or 37'], 33)
+
+    df['Age'] = df['Age'].str.split(" ").str[0].apply(pd.to_numeric, errors = "coerce")
+
+    return df
+
+
+def benchmark_date_clean(dates=None, scales=(10, 100, 1000), old_path=True):
+    '''
+    Compare the row-wise clean_date path against normalize_dates.
+
+    Args:
+    dates (list or pd.Series): Raw 'Date' values to scale up. Defaults to SAMPLE_DATES.
+    scales (tuple): Multiples of the real row count to benchmark.
+    old_path (bool): Also time dates.apply(clean_date) and check both outputs match.
+
+    Returns:
+    pd.DataFrame: One row per scale with timings and speedup.
+    '''
+    dates = SAMPLE_DATES if dates is None else list(dates)
+    results = []
+
+    for scale in scales:
+        column = scale_values(dates, scale)
+        new_seconds, new = time_call(f.normalize_dates, column)
+        row = {'scale': scale, 'rows': len(column), 'vectorized_s': new_seconds}
+
+        if old_path:
+            old_seconds, old = time_call(column.apply, f.clean_date)
+            row['row_wise_s'] = old_seconds
+            row['speedup'] = old_seconds / new_seconds
+            row['same_output'] = same_values(old, new)
+
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+def benchmark_cleaned_time(times=None, scales=(10, 100, 1000), old_path=True):
+    '''
+    Compare clean_time_format + categorize_time against classify_time.
+
+    Args:
+    times (list or pd.Series): Raw 'Time' values to scale up. Defaults to SAMPLE_TIMES.
+    scales (tuple): Multiples of the real row count to benchmark.
+    old_path (bool): Also time the two .apply passes and check both outputs match.
+
+    Returns:
+    pd.DataFrame: One row per scale with timings and speedup.
+    '''
+    times = SAMPLE_TIMES if times is None else list(times)
+    results = []
+
+    for scale in scales:
+        column = scale_values(times, scale)
+        new_seconds, new = time_call(f.classify_time, column)
+        row = {'scale': scale, 'rows': len(column), 'vectorized_s': new_seconds}
+
+        if old_path:
+            old_seconds, old = time_call(
+                lambda values: values.apply(f.clean_time_format).replace('', np.nan).apply(f.categorize_time), column)
+            row['row_wise_s'] = old_seconds
+            row['speedup'] = old_seconds / new_seconds
+            row['same_output'] = same_values(old, new)
+
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+def benchmark_clean_age(ages=None, scales=(10, 100, 1000), old_path=True):
+    '''
+    Compare the former replace chain (legacy_clean_age) against clean_age.
+
+    Args:
+    ages (list or pd.Series): Raw 'Age' values to scale up. Defaults to SAMPLE_AGES.
+    scales (tuple): Multiples of the real row count to benchmark.
+    old_path (bool): Also time legacy_clean_age and check both outputs match.
+
+    Returns:
+    pd.DataFrame: One row per scale with timings and speedup.
+    '''
+    ages = SAMPLE_AGES if ages is None else list(ages)
+    results = []
+
+    for scale in scales:
+        column = scale_values(ages, scale)
+        new_seconds, new = time_call(f.clean_age, pd.DataFrame({'Age': column}))
+        row = {'scale': scale, 'rows': len(column), 'vectorized_s': new_seconds}
+
+        if old_path:
+            old_seconds, old = time_call(legacy_clean_age, pd.DataFrame({'Age': column}))
+            row['row_wise_s'] = old_seconds
+            row['speedup'] = old_seconds / new_seconds
+            row['same_output'] = same_values(old['Age'], new['Age'])
+
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+def benchmark_read_data(source, columns=f.is_kept_column, repeats=3):
+    '''
+    Time a cold read_data (parses the workbook and fills the column cache) against warm reads.
+
+    Args:
+    source (str): Path or URL of the spreadsheet.
+    columns (list or callable): Column projection of the warm reads.
+    repeats (int): Number of warm reads.
+
+    Returns:
+    pd.DataFrame: One row per read with its kind, seconds and shape.
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        seconds, df = time_call(f.read_data, source, cache_dir=cache_dir)
+        results.append({'read': 'cold', 'seconds': seconds, 'rows': df.shape[0], 'columns': df.shape[1]})
+
+        for _ in range(repeats):
+            seconds, df = time_call(f.read_data, source, columns=columns, cache_dir=cache_dir)
+            results.append({'read': 'warm', 'seconds': seconds, 'rows': df.shape[0], 'columns': df.shape[1]})
+
+        seconds, df = time_call(f.read_data, source, cache_dir=cache_dir)
+        results.append({'read': 'warm, all columns', 'seconds': seconds, 'rows': df.shape[0], 'columns': df.shape[1]})
+
+    return pd.DataFrame(results)
+
+
+def benchmark_cube(scales=(1, 10, 100), path='cleaned_data.parquet', seed=0):
+    '''
+    Time the cube build and a filtered chart query on the cleaned data repeated scale times,
+    with random years, months and ages so that the cube grows with the table.
+
+    Returns:
+    pd.DataFrame: One row per scale with the table and cube sizes and the timings.
+    '''
+    df = f.load_cleaned(path)
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for scale in scales:
+        table = pd.concat([df] * scale, ignore_index=True)
+        if scale > 1:
+            table['Year'] = rng.integers(1900, 2025, len(table))
+            table['Month'] = rng.integers(1, 13, len(table))
+            table['Age'] = rng.integers(1, 90, len(table))
+
+        build_seconds, cells = time_call(cube.build_cube, table)
+        query_seconds, _ = time_call(
+            lambda: cube.counts_by(cube.filter_cube(cells, years=(2000, 2020), Continent=['Oceania'], Sex=['M']), 'Activity', 5))
+        results.append({'scale': scale, 'rows': len(table), 'cells': len(cells),
+                        'build_s': build_seconds, 'query_ms': query_seconds * 1000})
+
+    return pd.DataFrame(results)
+
+
+# Filter combinations of the dashboard
+BITMAP_QUERIES = [
+    {'Sex': ['F']},
+    {'Country': ['usa', 'australia'], 'Sex': ['M']},
+    {'Continent': ['Oceania'], 'Activity': ['Surfing', 'Swimming'], 'Time': ['Afternoon']},
+    {'Ocean_Sea': ['Pacific Ocean'], 'Species': ['White Shark', 'Tiger Shark']},
+    {'Country': ['south africa'], 'Species': ['White Shark'], 'Activity': ['Surfing'], 'Time': ['Morning'], 'Sex': ['M']},
+]
+
+
+def pandas_count(df, selections):
+    '''
+    Number of rows matching the selections with pandas boolean masks (the scan the bitmap index replaces).
+    '''
+    mask = pd.Series(True, index=df.index)
+    for column, values in selections.items():
+        if column == 'Ocean_Sea':
+            mask &= df[column].astype(str).str.contains('|'.join(values))
+        else:
+            mask &= df[column].isin(values)
+    return int(mask.sum())
+
+
+def benchmark_bitmap_index(rows=1_000_000, path='cleaned_data.parquet', queries=BITMAP_QUERIES, repeats=5, seed=0):
+    '''
+    Time filter counts with the bitmap index against pandas masks on rows sampled from the cleaned data.
+
+    Returns:
+    pd.DataFrame: One row per query with both timings (best of repeats) and the count.
+    '''
+    df = f.load_cleaned(path, columns=bitmap_index.BITMAP_COLUMNS)
+    rng = np.random.default_rng(seed)
+    table = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+
+    build_seconds, index = time_call(bitmap_index.build_index, table)
+    size, uncompressed = bitmap_index.index_bytes(index)
+    print(f'Bitmap index of {rows} rows built in {build_seconds:.2f}s, {size / 2**20:.1f} MiB '
+          f'({uncompressed / 2**20:.1f} MiB without compression)')
+
+    results = []
+    for query in queries:
+        pandas_seconds, expected = min(time_call(pandas_count, table, query) for _ in range(repeats))
+        bitmap_seconds, found = min(time_call(lambda: bitmap_index.count(bitmap_index.select(index, **query)))
+                                    for _ in range(repeats))
+        assert found == expected, (query, found, expected)
+        results.append({'query': ', '.join(query), 'count': found, 'pandas_ms': pandas_seconds * 1000,
+                        'bitmap_ms': bitmap_seconds * 1000, 'speedup': pandas_seconds / bitmap_seconds})
+
+    return pd.DataFrame(results)
+
+
+# Suite of the cleaning functions: name -> (function of a raw frame, raw columns it reads)
+CLEANERS = {
+    'date_clean': (f.date_clean, ['Date']),
+    'type_column': (f.type_column, ['Type']),
+    'country_cleaned': (f.country_cleaned, ['Country']),
+    'state_cleaned': (f.state_cleaned, ['State']),
+    'sex_clean': (f.sex_clean, ['Sex']),
+    'clean_age': (f.clean_age, ['Age']),
+    'cleaned_time': (f.cleaned_time, ['Time']),
+    'clean_location_column': (lambda df: f.clean_location_column(df, 'Location'), ['Location']),
+    'clean_activity_column': (lambda df: f.clean_activity_column(df, 'Activity'), ['Activity']),
+    'clean_injury_column': (lambda df: f.clean_injury_column(df, 'Injury'), ['Injury']),
+    'clean_and_normalize_species': (lambda df: f.clean_and_normalize_species(df, 'Species'), ['Species']),
+    'add_oceans_column': (lambda df: f.add_oceans_column(df, 'Country', 'Ocean_Sea'), ['Country']),
+}
+
+SUITE_SCALES = (1, 10, 100, 1000)
+
+# Timed calls per function and scale after a warm-up call, their best and median times are kept
+SUITE_REPEATS = 5
+
+# Differences below these are noise, whatever their ratio
+NOISE_SECONDS = 0.01
+NOISE_MIB = 1.0
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.benchmarks')
+
+def raw_sample(columns, path='cleaned_data.parquet', seed=0):
+    '''
+    REAL_ROWS rows of some raw columns from the synthetic GSAF generator.
+    '''
+    chunk = next(synthetic.generate(REAL_ROWS, REAL_ROWS, seed, path))
+    return chunk.rename(columns={'Species ': 'Species'})[columns]
+
+
+def measure(func, df, memory=True, repeats=SUITE_REPEATS):
+    '''
+    Best and median wall time of func on a copy of df over repeats calls, after a warm-up call (regexes
+    compiled, lookup tables built, caches filled), and, in one more call under tracemalloc, its peak Python memory.
+    '''
+    func(df.copy())
+    timings = []
+    for _ in range(repeats):
+        data = df.copy()
+        # Like timeit, without the garbage collector pauses of the previous calls
+        gc.collect()
+        gc.disable()
+        try:
+            timings.append(time_call(func, data)[0])
+        finally:
+            gc.enable()
+    peak = None
+    if memory:
+        data = df.copy()
+        tracemalloc.start()
+        func(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(timings), float(np.median(timings)), peak
+
+
+def benchmark_suite(scales=SUITE_SCALES, cleaners=None, memory=True, path='cleaned_data.parquet', seed=0,
+                    repeats=SUITE_REPEATS):
+    '''
+    Run every cleaning function on the raw sample repeated at each scale.
+
+    Args:
+    scales (tuple): Multiples of the real row count.
+    cleaners (list): Names of CLEANERS to run, None for all.
+    memory (bool): Also measure the peak memory (one more call per function and scale).
+    repeats (int): Timed calls per function and scale, the best one is kept.
+
+    Returns:
+    pd.DataFrame: One row per function and scale with the best and median seconds, rows/s (of the best) and peak MiB.
+    '''
+    results = []
+    for name in cleaners or CLEANERS:
+        func, columns = CLEANERS[name]
+        sample = raw_sample(columns, path, seed)
+        for scale in scales:
+            df = sample.iloc[np.tile(np.arange(len(sample)), scale)].reset_index(drop=True)
+            seconds, median, peak = measure(func, df, memory, repeats)
+            results.append({'function': name, 'scale': scale, 'rows': len(df), 'seconds': seconds, 'median_seconds': median,
+                            'rows_per_s': len(df) / seconds, 'peak_mib': None if peak is None else peak / 2**20})
+            del df
+    return pd.DataFrame(results)
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'commit': commit or 'unknown', 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor()}
+
+
+def save_results(results, results_dir=RESULTS_DIR):
+    '''
+    Save the suite results with the commit and versions, as <results_dir>/<commit>.json.
+
+    Returns:
+    str: The path of the file.
+    '''
+    meta = environment()
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{meta['commit']}.json")
+    with open(path, 'w') as file:
+        json.dump({'environment': meta, 'results': results.to_dict(orient='records')}, file, indent=1)
+    return path
+
+
+def load_results(path):
+    with open(path) as file:
+        return pd.DataFrame(json.load(file)['results'])
+
+
+def compare_results(old, new, threshold=1.2, min_seconds=NOISE_SECONDS, min_mib=NOISE_MIB):
+    '''
+    Join two suite results by function and scale and flag the regressions: the best time of the new run
+    is above threshold times the best time of the reference and slower than its median by more than
+    min_seconds (the spread of the reference calls is noise), or the peak memory grew likewise.
+
+    Args:
+    old (pd.DataFrame): Reference results (load_results).
+    new (pd.DataFrame): Results to check.
+    threshold (float): Ratio of seconds (or peak memory) above which a result is a regression.
+    min_seconds (float): Smallest increase of seconds over the reference median counted as a regression.
+    min_mib (float): Smallest increase of peak memory counted as a regression.
+
+    Returns:
+    pd.DataFrame: Both timings, the ratios and a 'regression' column.
+    '''
+    merged = old.merge(new, on=['function', 'scale'], suffixes=('_old', '_new'))
+    merged['time_ratio'] = merged['seconds_new'] / merged['seconds_old']
+    merged['memory_ratio'] = merged['peak_mib_new'] / merged['peak_mib_old']
+    # Results saved before the median was recorded only have the best time
+    median_old = merged['median_seconds_old'] if 'median_seconds_old' in merged else merged['seconds_old']
+    slower = (merged['time_ratio'] > threshold) & (merged['seconds_new'] - median_old > min_seconds)
+    larger = (merged['memory_ratio'] > threshold) & (merged['peak_mib_new'] - merged['peak_mib_old'] > min_mib)
+    merged['regression'] = slower | larger
+    return merged[['function', 'scale', 'seconds_old', 'seconds_new', 'time_ratio',
+                   'peak_mib_old', 'peak_mib_new', 'memory_ratio', 'regression']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the cleaning functions.')
+    parser.add_argument('source', nargs='?', help='raw GSAF5.xls spreadsheet, also times the raw cache')
+    parser.add_argument('--suite', action='store_true', help='run the suite of every cleaning function and save it')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SUITE_SCALES), help='scales of the suite')
+    parser.add_argument('--only', nargs='+', choices=list(CLEANERS), help='cleaning functions of the suite')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory measurement')
+    parser.add_argument('--repeats', type=int, default=SUITE_REPEATS, help='timed calls per function and scale')
+    parser.add_argument('--compare', help='results file of a previous run to compare the suite with')
+    args = parser.parse_args()
+
+    if args.suite:
+        # Read the reference first, it may be the file this run overwrites
+        reference = load_results(args.compare) if args.compare else None
+        results = benchmark_suite(args.scales, args.only, memory=not args.no_memory, repeats=args.repeats)
+        print(results.to_string(index=False))
+        print('Saved to', save_results(results))
+        if reference is not None:
+            comparison = compare_results(reference, results)
+            print(comparison.to_string(index=False))
+            sys.exit(1 if comparison['regression'].any() else 0)
+    else:
+        print(benchmark_date_clean())
+        print(benchmark_cleaned_time())
+        print(benchmark_clean_age())
+        print(benchmark_cube())
+        print(benchmark_bitmap_index())
+
+        # python benchmarks.py GSAF5.xls also times the raw spreadsheet cache
+        if args.source:
+            print(benchmark_read_data(args.source))
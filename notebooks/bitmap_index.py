@@ -0,0 +1,159 @@
+# Bitmap index of the categorical columns of the cleaned data
+#
+# One bitset per value of each indexed column, so any combination of filters is resolved with
+# bitwise OR (values of a column) and AND (columns) over 64-bit words, and counted with popcount.
+# Values present in few rows are stored compressed as their sorted row positions instead of a bitset.
+#
+#   index = bitmap_index.build_index(df)
+#   selection = bitmap_index.select(index, Country=['usa', 'australia'], Sex=['F'], Ocean_Sea=['Pacific Ocean'])
+#   bitmap_index.count(selection), bitmap_index.rows(selection), bitmap_index.counts_by(index, 'Activity', selection)
+#
+# Ocean_Sea is indexed by body of water: an incident is in the bitset of every ocean or sea of its country.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import geo_index
+
+
+BITMAP_COLUMNS = ['Country', 'Species', 'Activity', 'Sex', 'Time', 'Continent', 'Ocean_Sea']
+
+
+def words_for(rows):
+    return -(-rows // 64)
+
+
+def from_mask(mask):
+    '''
+    Bitset (uint64 words, row i in bit i % 64 of word i // 64) of a boolean mask.
+    '''
+    mask = np.asarray(mask, dtype=bool)
+    packed = np.packbits(mask, bitorder='little')
+    packed = np.pad(packed, (0, words_for(len(mask)) * 8 - len(packed)))
+    return packed.view('<u8')
+
+
+def from_positions(positions, rows):
+    mask = np.zeros(rows, dtype=bool)
+    mask[positions] = True
+    return from_mask(mask)
+
+
+def compress(positions, rows):
+    '''
+    Store the rows of a value as positions (uint32) when that is smaller than a bitset.
+    '''
+    if len(positions) * 32 < rows:
+        return positions.astype(np.uint32)
+    return from_positions(positions, rows)
+
+
+def dense(entry, rows):
+    '''
+    Bitset of an index entry, whatever its storage.
+    '''
+    if entry.dtype == np.uint32:
+        return from_positions(entry, rows)
+    return entry
+
+
+def _column_entries(codes, categories, rows):
+    # Row positions of every code in one pass: a stable sort keeps them ascending inside each code
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(categories)))])
+    order = order[np.count_nonzero(codes < 0):]
+    return {value: compress(order[bounds[code]:bounds[code + 1]], rows)
+            for code, value in enumerate(categories) if bounds[code + 1] > bounds[code]}
+
+
+def build_index(df, columns=BITMAP_COLUMNS):
+    '''
+    Build the bitmap index of some categorical columns of the cleaned data.
+
+    Args:
+    df (pd.DataFrame): The cleaned data (Ocean_Sea is rebuilt from the Country column).
+    columns (list): Columns to index.
+
+    Returns:
+    SimpleNamespace: rows and bitmaps (column -> value -> bitset or row positions).
+    '''
+    rows = len(df)
+    bitmaps = {}
+    for column in columns:
+        if column == 'Ocean_Sea':
+            codes = geo_index.country_codes(geo_index.normalize_country(df['Country']))
+            bits = np.where(codes >= 0, geo_index.INDEX.ocean_bits[codes], 0)
+            bitmaps[column] = {}
+            for body_code, body in enumerate(geo_index.INDEX.bodies):
+                positions = np.flatnonzero((bits >> np.uint32(body_code)) & 1)
+                if len(positions):
+                    bitmaps[column][body] = compress(positions, rows)
+        else:
+            values = pd.Categorical(df[column])
+            bitmaps[column] = _column_entries(values.codes.astype(np.int64), values.categories, rows)
+    return SimpleNamespace(rows=rows, bitmaps=bitmaps)
+
+
+def all_rows(index):
+    return from_mask(np.ones(index.rows, dtype=bool))
+
+
+def select(index, bitmap=None, **selections):
+    '''
+    Rows matching the selected values: OR inside a column, AND across columns.
+
+    Args:
+    index (SimpleNamespace): The index from build_index.
+    bitmap (np.ndarray): Bitset to start from (e.g. from_mask of a year range), None for every row.
+    selections: Column -> list of values to keep, an empty list or None keeps every value.
+
+    Returns:
+    np.ndarray: The bitset of the matching rows.
+    '''
+    result = all_rows(index) if bitmap is None else bitmap.copy()
+    for column, values in selections.items():
+        if values:
+            matches = np.zeros(words_for(index.rows), dtype=np.uint64)
+            for value in values:
+                entry = index.bitmaps[column].get(value)
+                if entry is not None:
+                    matches |= dense(entry, index.rows)
+            result &= matches
+    return result
+
+
+def count(bitmap):
+    return int(np.bitwise_count(bitmap).sum())
+
+
+def rows(bitmap, rows_total=None):
+    '''
+    Row positions of the set bits of a bitset.
+    '''
+    bits = np.unpackbits(bitmap.view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits[:rows_total] if rows_total is not None else bits)
+
+
+def counts_by(index, column, bitmap=None):
+    '''
+    Number of rows of each value of a column inside a bitset (every row if None), sorted by count.
+    '''
+    counts = {}
+    for value, entry in index.bitmaps[column].items():
+        if bitmap is None:
+            counts[value] = len(entry) if entry.dtype == np.uint32 else count(entry)
+        elif entry.dtype == np.uint32:
+            counts[value] = int(((bitmap[entry >> 6] >> (entry & 63).astype(np.uint64)) & 1).sum())
+        else:
+            counts[value] = count(entry & bitmap)
+    return pd.Series(counts, name='count', dtype='int64').sort_values(ascending=False)
+
+
+def index_bytes(index):
+    '''
+    Memory of the index, and of the same index with a full bitset for every value.
+    '''
+    entries = [entry for values in index.bitmaps.values() for entry in values.values()]
+    return sum(entry.nbytes for entry in entries), len(entries) * words_for(index.rows) * 8
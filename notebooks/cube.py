@@ -0,0 +1,99 @@
+# Aggregation cube of the cleaned data for the interactive charts
+#
+# One row per non-empty combination of the dimensions with its number of incidents (sparse storage),
+# built by pipeline.py and loaded once by the Streamlit app. Every chart is a filter + sum over it.
+
+import numpy as np
+import pandas as pd
+
+import geo_index
+
+
+CUBE_DIMENSIONS = ['Year', 'Month', 'Continent', 'Country', 'Activity', 'Species', 'Sex', 'Time', 'AgeRange']
+
+# Age ranges of the visualization notebook
+AGE_BINS = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+AGE_LABELS = ['0-10', '11-20', '21-30', '31-40', '41-50', '51-60', '61-70', '71-80', '81-90', '91-100']
+
+
+def age_ranges(ages):
+    return pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS, right=False)
+
+
+def build_cube(df):
+    '''
+    Count the incidents of each combination of CUBE_DIMENSIONS found in the cleaned data.
+
+    Args:
+    df (pd.DataFrame): The cleaned data.
+
+    Returns:
+    pd.DataFrame: The dimensions (categoricals, Year and Month as small ints) and a 'count' column.
+    '''
+    dims = df.assign(AgeRange=age_ranges(df['Age']))[CUBE_DIMENSIONS]
+    dims = dims.astype({dim: 'category' for dim in CUBE_DIMENSIONS if dim not in ('Year', 'Month')})
+    dims = dims.astype({'Year': 'Int16', 'Month': 'Int8'})
+
+    cube = dims.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).size().rename('count').reset_index()
+    cube['count'] = cube['count'].astype(np.int32)
+    return cube
+
+
+def combine_cubes(cubes):
+    '''
+    Sum cubes built on parts of the cleaned data into the cube of the whole data.
+    '''
+    cube = pd.concat(cubes, ignore_index=True)
+    cube = cube.astype({dim: 'category' for dim in CUBE_DIMENSIONS if dim not in ('Year', 'Month')})
+    cube = cube.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)['count'].sum().reset_index()
+    cube = cube.astype({'Year': 'Int16', 'Month': 'Int8'})
+    cube['count'] = cube['count'].astype(np.int32)
+    return cube
+
+
+def save_cube(cube, path):
+    cube.to_parquet(path, index=False)
+
+
+def load_cube(path):
+    return pd.read_parquet(path)
+
+
+def filter_cube(cube, years=None, **selections):
+    '''
+    Cells of the cube inside a year range and matching the selected values.
+
+    Args:
+    cube (pd.DataFrame): The cube from build_cube.
+    years (tuple): (first, last) year, both included. None keeps every year.
+    selections: Dimension -> list of values to keep, an empty list or None keeps every value.
+
+    Returns:
+    pd.DataFrame: The matching cells.
+    '''
+    mask = np.ones(len(cube), dtype=bool)
+    if years is not None:
+        mask &= cube['Year'].between(*years).fillna(False).to_numpy(dtype=bool)
+    for dim, values in selections.items():
+        if values:
+            mask &= cube[dim].isin(values).to_numpy()
+    return cube[mask]
+
+
+def counts_by(cube, dimension, top=None):
+    '''
+    Number of incidents per value of a dimension, sorted by value (or the top values by count).
+    '''
+    counts = cube.groupby(dimension, observed=True)['count'].sum()
+    if top:
+        counts = counts.sort_values(ascending=False).head(top)
+    return counts
+
+
+def ocean_counts(cube):
+    '''
+    Number of incidents per ocean or sea, counting an incident once for each body of water of its country.
+    '''
+    by_country = counts_by(cube, 'Country').reset_index()
+    bridge = geo_index.ocean_bridge(by_country)
+    return bridge.groupby('Ocean_Sea', observed=True)['count'].sum().sort_values(ascending=False)
@@ -0,0 +1,259 @@
+# Headless build of the figures of data_visualization.ipynb
+#
+# Run from the notebooks folder:
+#   python figures.py              (renders the figures whose data or spec changed)
+#   python figures.py --force      (renders every figure)
+#
+# Each chart is defined once in FIGURES and written to reports/Figures and, when it has an
+# app image name, to streamlit_app/images. Figures are rendered with the Agg backend in a
+# process pool. A figure is skipped when the hash of its input columns, its spec and the
+# renderer code match the last build and the files on disk still have the recorded content.
+
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+import cube
+import functions as f
+import geo_index
+import pipeline
+import time_index
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA = os.path.join(HERE, 'cleaned_data.parquet')
+REPORTS_DIR = os.path.join(HERE, '..', 'reports', 'Figures')
+APP_IMAGES_DIR = os.path.join(HERE, '..', 'streamlit_app', 'images')
+MANIFEST = os.path.join(pipeline.CACHE_DIR, 'figures.json')
+
+# One spec per figure: the counted column (top values, a year range or the last complete years), the chart and its labels
+FIGURES = [
+    {'name': 'Distribution of Age Ranges', 'image': 'age.png', 'column': 'AgeRange', 'sort': 'index',
+     'chart': 'bar', 'figsize': (10, 6), 'xlabel': 'Age Range', 'ylabel': 'Frequency', 'rotation': 45},
+    {'name': 'Distribution of Sex', 'column': 'Sex', 'sort': 'index',
+     'chart': 'bar', 'figsize': (10, 6), 'xlabel': 'Sex', 'ylabel': 'Count'},
+    {'name': 'Distribution of Sex_2', 'image': 'sex.png', 'title': 'Distribution of Sex', 'column': 'Sex',
+     'chart': 'pie', 'figsize': (8, 8), 'colors': ['#ff9999', '#66b3ff']},
+    {'name': 'Top 5 Activities with Most Attacks', 'image': 'activities.png', 'column': 'Activity', 'top': 5,
+     'chart': 'barh', 'figsize': (10, 6), 'xlabel': 'Number of Attacks', 'ylabel': 'Activity'},
+    {'name': 'Top 10 Most Common Shark Types', 'image': 'sharks.png', 'column': 'Species', 'top': 10,
+     'chart': 'barh', 'figsize': (10, 6), 'xlabel': 'Number of Occurrences', 'ylabel': 'Shark Type'},
+    {'name': 'Frequency of Oceans and Seas', 'image': 'ocean.png', 'column': 'Ocean_Sea',
+     'chart': 'barh', 'figsize': (12, 8), 'xlabel': 'Number of Attacks', 'ylabel': 'Ocean or Sea'},
+    {'name': 'Distribution of Time', 'image': 'time.png', 'column': 'Time', 'sort': 'index',
+     'chart': 'bar', 'figsize': (10, 6), 'xlabel': 'Time', 'ylabel': 'Frequency', 'rotation': 45},
+    {'name': 'Top 10 Years with Most Attacks', 'column': 'Year', 'top': 10,
+     'chart': 'bar', 'figsize': (12, 8), 'xlabel': 'Year', 'ylabel': 'Number of Attacks', 'rotation': 45},
+    {'name': 'Distribution of Attacks by Month', 'image': 'month.png', 'column': 'Month', 'sort': 'index',
+     'chart': 'bar', 'figsize': (12, 8), 'xlabel': 'Month', 'ylabel': 'Number of Attacks'},
+    {'name': 'Number of Attacks from {first} to {last}', 'image': 'years.png', 'column': 'Year', 'last_years': 10, 'sort': 'index',
+     'chart': 'bar', 'figsize': (12, 8), 'xlabel': 'Year', 'ylabel': 'Number of Attacks', 'rotation': 45},
+    {'name': 'Top 10 Countries with Most Attacks', 'column': 'Country', 'top': 10,
+     'chart': 'bar', 'figsize': (12, 8), 'xlabel': 'Country', 'ylabel': 'Number of Attacks', 'rotation': 45},
+    {'name': 'Continent with Most Attacks', 'image': 'continent.png', 'column': 'Continent',
+     'chart': 'bar', 'figsize': (10, 6), 'xlabel': 'Continent', 'ylabel': 'Number of Attacks', 'rotation': 45},
+    {'name': 'Distribution of Attacks by Continent', 'column': 'Continent',
+     'chart': 'donut', 'figsize': (10, 10), 'colors': ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#c2c2f0', '#ffb3e6']},
+]
+
+# Columns of the cleaned data needed for the derived columns
+SOURCE_COLUMNS = {'AgeRange': ['Age'], 'Ocean_Sea': ['Country']}
+
+
+def spec_columns(spec):
+    columns = SOURCE_COLUMNS.get(spec['column'], [spec['column']])
+    # The time index of the last complete years needs the months
+    return list(dict.fromkeys(columns + ['Year', 'Month'])) if 'last_years' in spec else columns
+
+
+def resolve_window(spec, df):
+    '''
+    Spec of a figure over the last complete years, with its year range taken from the time index
+    of the data (the last year of the data is incomplete) and its name built from the range.
+    '''
+    if 'last_years' not in spec:
+        return spec
+    index = time_index.build_time_index(df)
+    last = index.last_year - 1
+    first = last - spec['last_years'] + 1
+    return {**spec, 'name': spec['name'].format(first=first, last=last), 'years': (first, last)}
+
+
+def figure_counts(spec, df):
+    '''
+    Number of incidents per value of the spec column, in the order of the chart.
+    '''
+    if spec['column'] == 'Ocean_Sea':
+        values = geo_index.ocean_bridge(df)['Ocean_Sea']
+    elif spec['column'] == 'AgeRange':
+        values = cube.age_ranges(df['Age'])
+    else:
+        values = df[spec['column']]
+
+    if 'years' in spec:
+        values = values[values.between(*spec['years'])]
+
+    counts = values.value_counts()
+    counts = counts[counts > 0]
+    if spec.get('top'):
+        counts = counts.head(spec['top'])
+    if spec.get('sort') == 'index':
+        counts = counts.sort_index()
+    return counts
+
+
+def render_figure(spec, df):
+    '''
+    Draw one figure with the style of the visualization notebook and return its PNG bytes.
+    '''
+    sns.set_style('whitegrid')
+    counts = figure_counts(spec, df)
+    labels = [str(label) for label in counts.index]
+    plt.figure(figsize=spec['figsize'])
+
+    if spec['chart'] == 'bar':
+        sns.barplot(x=labels, y=counts.values, hue=labels, palette='viridis', legend=False)
+    elif spec['chart'] == 'barh':
+        sns.barplot(x=counts.values, y=labels, hue=labels, palette='viridis', legend=False, orient='h')
+    elif spec['chart'] == 'pie':
+        counts.plot.pie(autopct='%1.1f%%', colors=spec['colors'], startangle=90,
+                        explode=[0.1] + [0] * (len(counts) - 1))
+    elif spec['chart'] == 'donut':
+        counts.plot.pie(autopct=lambda pct: '{:.0f}%'.format(pct), colors=spec['colors'], startangle=90,
+                        explode=[0.1] + [0] * (len(counts) - 1), pctdistance=0.85,
+                        textprops={'fontsize': 10}, labels=[''] * len(counts))
+        plt.gcf().gca().add_artist(plt.Circle((0, 0), 0.70, fc='white'))
+        plt.legend(labels=labels, loc='best', fontsize=12)
+
+    plt.title(spec.get('title', spec['name']), fontsize=16 if spec['chart'] == 'donut' else None)
+    plt.xlabel(spec.get('xlabel', ''))
+    plt.ylabel(spec.get('ylabel', ''))
+    if 'rotation' in spec:
+        plt.xticks(rotation=spec['rotation'])
+    plt.tight_layout()
+
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', metadata={'Software': None})
+    plt.close('all')
+    return buffer.getvalue()
+
+
+def figure_key(spec, df):
+    '''
+    Hash of the input columns of a figure, its spec and the renderer code.
+    '''
+    parts = [
+        json.dumps(spec, sort_keys=True),
+        pipeline.hash_data(df[spec_columns(spec)]),
+        pipeline.source_fingerprint(render_figure),
+    ]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+
+def figure_paths(spec, reports_dir=REPORTS_DIR, app_images_dir=APP_IMAGES_DIR):
+    paths = [os.path.join(reports_dir, spec['name'] + '.png')]
+    if spec.get('image') and app_images_dir:
+        paths.append(os.path.join(app_images_dir, spec['image']))
+    return paths
+
+
+def file_sha(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def build_figures(data=DATA, figures=FIGURES, reports_dir=REPORTS_DIR, app_images_dir=APP_IMAGES_DIR,
+                  manifest=MANIFEST, workers=None, force=False, verbose=True):
+    '''
+    Render the figures whose inputs changed since the last build and write them to both destinations.
+    Figures of the last build that are no longer in figures (e.g. a year window that moved) are dropped
+    from the manifest, with their report file.
+
+    Args:
+    data (str): The cleaned Parquet file.
+    figures (list): Figure specs.
+    reports_dir (str): Folder of the report figures.
+    app_images_dir (str): Folder of the Streamlit images (None to skip it).
+    manifest (str): JSON file with the key and PNG hash of every figure of the last build.
+    workers (int): Size of the process pool, defaults to the number of CPUs.
+    force (bool): Render every figure.
+    verbose (bool): Print one line per figure.
+
+    Returns:
+    dict: Figure name -> 'rendered', 'skipped' or 'removed'.
+    '''
+    start = time.perf_counter()
+    columns = sorted({column for spec in figures for column in spec_columns(spec)})
+    df = f.load_cleaned(data, columns)
+    figures = [resolve_window(spec, df) for spec in figures]
+
+    built = {}
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            built = json.load(file)
+
+    status = {}
+    jobs = []
+    for spec in figures:
+        key = figure_key(spec, df)
+        previous = built.get(spec['name'], {})
+        up_to_date = previous.get('key') == key and all(
+            file_sha(path) == previous.get('sha') for path in figure_paths(spec, reports_dir, app_images_dir))
+        if up_to_date and not force:
+            status[spec['name']] = 'skipped'
+        else:
+            jobs.append((spec, key))
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        images = pool.map(render_figure, [spec for spec, key in jobs], [df[spec_columns(spec)] for spec, key in jobs])
+        for (spec, key), png in zip(jobs, images):
+            sha = hashlib.sha256(png).hexdigest()
+            for path in figure_paths(spec, reports_dir, app_images_dir):
+                # Files are only rewritten when their content changes
+                if file_sha(path) != sha:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, 'wb') as file:
+                        file.write(png)
+            built[spec['name']] = {'key': key, 'sha': sha}
+            status[spec['name']] = 'rendered'
+
+    current = {spec['name'] for spec in figures}
+    for name in [name for name in built if name not in current]:
+        # The report file is only removed when it is still the one this build wrote
+        path = os.path.join(reports_dir, name + '.png')
+        if file_sha(path) == built[name].get('sha'):
+            os.remove(path)
+        del built[name]
+        status[name] = 'removed'
+
+    os.makedirs(os.path.dirname(manifest), exist_ok=True)
+    with open(manifest + '.tmp', 'w') as file:
+        json.dump(built, file, indent=1)
+    os.replace(manifest + '.tmp', manifest)
+
+    if verbose:
+        for name in [spec['name'] for spec in figures] + [name for name in status if name not in current]:
+            print(f'{status[name]:<9} {name}')
+        print(f'{len(jobs)} of {len(figures)} figures rendered in {time.perf_counter() - start:.2f}s')
+    return status
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the report and app figures from the cleaned data.')
+    parser.add_argument('--data', default=DATA, help='cleaned Parquet file')
+    parser.add_argument('--workers', type=int, help='number of processes')
+    parser.add_argument('--force', action='store_true', help='render every figure')
+    args = parser.parse_args()
+
+    build_figures(args.data, workers=args.workers, force=args.force)
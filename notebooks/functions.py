@@ -2,30 +2,330 @@
 
 import pandas as pd
 import re
+import contextlib
 import datetime
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import urllib.request
 import numpy as np
 
-def read_data(url): 
-    df = pd.read_excel(url)
-    return df
+import geo_index
+import instrument
+
+# Folder for the on-disk memo cache of the string cleaners (disabled when None)
+MEMO_CACHE_DIR = os.environ.get('SHARK_MEMO_CACHE')
+
+# Folder for the column cache of the raw spreadsheet (set SHARK_RAW_CACHE to an empty string to disable it)
+RAW_CACHE_DIR = os.environ.get('SHARK_RAW_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.raw_cache'))
+
+
+def _is_url(source):
+    return str(source).startswith(('http://', 'https://', 'ftp://'))
+
+
+def raw_cache_key(source, data=None):
+    '''
+    Cache key of a spreadsheet: path, size and mtime for a local file, content hash for downloaded bytes.
+    '''
+    if data is not None:
+        return hashlib.sha1(data).hexdigest()[:16]
+    stat = os.stat(source)
+    key = f'{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def _select_columns(names, columns):
+    if columns is None:
+        return list(names)
+    if callable(columns):
+        return [name for name in names if columns(name)]
+    return [name for name in names if name in columns]
+
+
+def save_raw_cache(df, cache_dir, key):
+    '''
+    Save every column in its own pickle, plus the list of columns (written last).
+    The raw columns mix datetimes, numbers and strings in the same column, which the
+    cleaners rely on, so they are pickled as they are instead of converted to Parquet.
+    '''
+    folder = os.path.join(cache_dir, key)
+    os.makedirs(folder, exist_ok=True)
+    for position, name in enumerate(df.columns):
+        with open(os.path.join(folder, f'{position}.pkl'), 'wb') as file:
+            pickle.dump(df.iloc[:, position], file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(folder, 'columns.pkl.tmp'), 'wb') as file:
+        pickle.dump(list(df.columns), file)
+    os.replace(os.path.join(folder, 'columns.pkl.tmp'), os.path.join(folder, 'columns.pkl'))
+
+
+def load_raw_cache(cache_dir, key, columns=None):
+    '''
+    Load the cached columns of a spreadsheet (None when it is not cached), reading only the selected ones.
+    '''
+    folder = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(folder, 'columns.pkl')):
+        return None
+    with open(os.path.join(folder, 'columns.pkl'), 'rb') as file:
+        names = pickle.load(file)
+
+    selected = set(_select_columns(names, columns))
+    series = []
+    for position, name in enumerate(names):
+        if name in selected:
+            with open(os.path.join(folder, f'{position}.pkl'), 'rb') as file:
+                series.append(pickle.load(file))
+    return pd.concat(series, axis=1) if series else pd.DataFrame()
+
+
+@instrument.step
+def read_data(url, columns=None, cache_dir=RAW_CACHE_DIR): 
+    '''
+    Read the GSAF spreadsheet from a URL or a local path.
+
+    The first read parses the workbook and saves it in a column cache, later reads of the
+    same file (same mtime, or same bytes for a URL) load only the requested columns from it.
+
+    Args:
+    url (str): URL or path of the spreadsheet.
+    columns (list or callable): Columns to return (or a function of the column name), None for all.
+    cache_dir (str): Folder of the column cache, None or '' to always parse the workbook.
+
+    Returns:
+    pd.DataFrame: The spreadsheet.
+    '''
+    data = None
+    if _is_url(url):
+        with urllib.request.urlopen(url) as response:
+            data = response.read()
+
+    key = raw_cache_key(url, data) if cache_dir else None
+    if key:
+        df = load_raw_cache(cache_dir, key, columns)
+        if df is not None:
+            return df
+
+    df = pd.read_excel(io.BytesIO(data) if data is not None else url)
+    if key:
+        save_raw_cache(df, cache_dir, key)
+    return df[_select_columns(df.columns, columns)]
+
+
+# Columns of the raw spreadsheet that are not used
+USELESS_COLUMNS = ["Case Number.1", "Unnamed: 21", "Unnamed: 11", "Unnamed: 22", "Case Number", "href formula", "href", "pdf"]
+
+
+def is_kept_column(name):
+    '''
+    True for the raw columns that survive drop_columns, to use as read_data(url, columns=is_kept_column).
+    '''
+    return str(name).strip() not in USELESS_COLUMNS
+
+
+def copy_on_write():
+    '''
+    Context that turns on pandas copy-on-write (always on from pandas 3).
+    '''
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return contextlib.nullcontext()
+    return pd.option_context('mode.copy_on_write', True)
 
 
+@instrument.step
 def drop_columns(df): 
     '''
-    Drop useless columns
+    Drop useless columns (the ones already left out by read_data(url, columns=is_kept_column) are skipped)
     '''
     
-    df.drop(columns=["Case Number.1"], inplace=True)
-    df.drop(columns=["Unnamed: 21"], inplace=True)
-    df.drop(columns=["Unnamed: 11"], inplace=True)
-    df.drop(columns=["Unnamed: 22"], inplace=True)
-    df.drop(columns=["Case Number"], inplace=True)
-    df.drop(columns=["href formula"], inplace=True)
-    df.drop(columns=["href"], inplace=True)
-    df.drop(columns=["pdf"], inplace=True)
+    with copy_on_write():
+        df = df.drop(columns=USELESS_COLUMNS, errors='ignore')
     
     return df
-    
+
+
+@instrument.step
+def filter_rows(df, rules, dropna=()):
+    '''
+    Drop the rows rejected by any rule with a single boolean mask.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to filter.
+    rules (dict): Column name -> list of values that reject the row.
+    dropna (list): Columns whose missing values also reject the row.
+
+    Returns:
+    tuple: The filtered DataFrame and a dict {column: {value: rejected rows}} (JSON-safe, so it can
+    be kept in attrs), where value is None for missing values. A row is counted for the first rule
+    rejecting it.
+    '''
+    with copy_on_write():
+        rejected = np.zeros(len(df), dtype=bool)
+        report = {}
+
+        for column, values in rules.items():
+            hits = df[column].isin(values).to_numpy() & ~rejected
+            counts = df[column][hits].value_counts()
+            report[column] = {value: int(counts.get(value, 0)) for value in values}
+            rejected |= hits
+
+        for column in dropna:
+            hits = df[column].isna().to_numpy() & ~rejected
+            report.setdefault(column, {})[None] = int(hits.sum())
+            rejected |= hits
+
+        if rejected.any():
+            df = df[~rejected]
+
+    return df, report
+
+
+# Fill missing values with the mode
+
+def _group_modes(keys, codes, ranks, n_keys, n_values):
+    # Mode code of the values of each group (-1 for a group without values), from a hash aggregation
+    # of the (group, value) pairs; ties go to the smallest value, like Series.mode()[0]
+    present = (keys >= 0) & (codes >= 0)
+    pairs = pd.Series(keys[present].astype(np.int64) * n_values + codes[present]).value_counts()
+    table = pd.DataFrame({'key': pairs.index // n_values, 'code': pairs.index % n_values, 'count': pairs.to_numpy()})
+    table['rank'] = ranks[table['code'].to_numpy()]
+    table = table.sort_values(['key', 'count', 'rank'], ascending=[True, False, True]).drop_duplicates('key')
+    modes = np.full(n_keys, -1, dtype=np.int64)
+    modes[table['key'].to_numpy()] = table['code'].to_numpy()
+    return modes
+
+
+@instrument.step
+def impute(df, columns, groups=None):
+    '''
+    Fill the missing values of several columns with their mode: every mode is counted in one scan of
+    the codes of its column, and the filled columns replace the old ones in a single assign.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to fill.
+    columns (list): Columns to fill, in order.
+    groups (dict): Column -> column to group by, to fill with the mode of the rows of the same group
+        (e.g. {'State': 'Country', 'Location': 'State'}). A group column listed before is used filled.
+        Rows whose group has no value get the mode of the whole column.
+
+    Returns:
+    tuple: The filled DataFrame and a dict {column: imputed cells}. Columns without any value are left as they are.
+    '''
+    groups = groups or {}
+    filled = {}
+    coded = {}
+    report = {}
+    for column in columns:
+        codes, uniques = pd.factorize(df[column])
+        missing = codes < 0
+        report[column] = 0
+        coded[column] = codes, uniques
+        if not missing.any() or len(uniques) == 0:
+            continue
+
+        # Position of each distinct value once sorted: among tied counts the first one is the value of Series.mode()[0]
+        ranks = pd.factorize(uniques, sort=True)[0]
+        counts = np.bincount(codes[~missing], minlength=len(uniques))
+        tied = np.flatnonzero(counts == counts.max())
+        mode = int(tied[ranks[tied].argmin()])
+
+        fill = mode
+        if column in groups:
+            # A group column filled before is grouped by its filled codes
+            keys, key_values = coded.get(groups[column]) or pd.factorize(df[groups[column]])
+            modes = _group_modes(keys, codes, ranks, len(key_values), len(uniques))
+            by_group = np.where(keys >= 0, modes[keys], -1)
+            fill = np.where(by_group >= 0, by_group, mode)
+
+        # The filled column is rebuilt from the codes (a take, faster than a fillna and of the same dtype)
+        codes = np.where(missing, fill, codes)
+        filled[column] = pd.Series(uniques.take(codes), index=df.index, name=column)
+        coded[column] = codes, uniques
+        report[column] = int(missing.sum())
+
+    return df.assign(**filled), report
+
+
+# Apply a cleaner once per distinct value
+
+def cleaner_version(cleaner):
+    '''
+    Short hash of the cleaner source code, changes whenever the cleaner is edited.
+    '''
+    source = inspect.getsource(cleaner)
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+
+
+def _memo_cache_path(cleaner, cache_dir, version):
+    return os.path.join(cache_dir, f'{cleaner.__name__}-{version}.pkl')
+
+
+def load_memo_cache(cleaner, cache_dir, version=None):
+    '''
+    Load the {input value: cleaned value} dict saved for this cleaner version.
+    '''
+    path = _memo_cache_path(cleaner, cache_dir, version or cleaner_version(cleaner))
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def save_memo_cache(memo, cleaner, cache_dir, version=None):
+    '''
+    Save the memo dict of a cleaner version (written to a temporary file of the process first, so
+    that workers cleaning chunks of the same column never write to the same file).
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _memo_cache_path(cleaner, cache_dir, version or cleaner_version(cleaner))
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        pickle.dump(memo, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+@instrument.step
+def apply_on_uniques(values, cleaner, cache_dir=None, version=None):
+    '''
+    Same result as values.apply(cleaner) for a pure cleaner, calling it once per distinct value.
+
+    Args:
+    values (pd.Series): The column to clean.
+    cleaner (function): Pure function of a single value.
+    cache_dir (str): Folder of the on-disk memo cache, only values never seen by this
+        cleaner version are cleaned. None disables the cache.
+    version (str): Cache version of the cleaner, defaults to a hash of its source code.
+
+    Returns:
+    pd.Series: The cleaned column.
+    '''
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=object)
+    missing = uniques.isna().to_numpy()
+
+    memo = {}
+    if cache_dir is not None:
+        version = version or cleaner_version(cleaner)
+        memo = load_memo_cache(cleaner, cache_dir, version)
+
+    # Missing values are not hashable in a reliable way, they are always cleaned
+    cleaned = np.empty(len(uniques), dtype=object)
+    new_values = {}
+    for position, value in enumerate(uniques):
+        if missing[position]:
+            cleaned[position] = cleaner(value)
+        elif value in memo:
+            cleaned[position] = memo[value]
+        else:
+            cleaned[position] = new_values[value] = cleaner(value)
+
+    if cache_dir is not None and new_values:
+        memo.update(new_values)
+        save_memo_cache(memo, cleaner, cache_dir, version)
+
+    return pd.Series(cleaned[codes], index=values.index, name=values.name).infer_objects()
+
 
 # Clean and Standarize Date Formats
 
@@ -99,13 +399,117 @@ def clean_date(date_str):
     
     return date_str
 
-def date_clean(df): 
-    df['Date'] = df['Date'].apply(clean_date)
-    return df 
+
+# Vectorized date normalization (same output as clean_date, compiled once)
+
+_DATE_NOISE = re.compile(r'Reported|Ca\.|Ca|Early|Late|Between|Before|After|Anniversary Day|No date|During the war|Before the war|Said to be|World War II|a few years before|early|late|between|before|after|anniversary day|no date|during the war|before the war|said to be|world war ii', flags=re.IGNORECASE)
+_DATE_SUFFIX = re.compile(r'\.\w$')
+_DATE_FORMATS = [
+    (re.compile(r'(\d{2})-(\w+)-(\d{4})'), r'\1 \2 \3'),  # 09-Sep-2023 -> 09 Sep 2023
+    (re.compile(r'(\d{2}) (\w+)-(\d{4})'), r'\1 \2 \3'),  # 09 Sep-2023 -> 09 Sep 2023
+    (re.compile(r'(\d{2})-(\w+)-(\d{2})'), r'\1 \2 20\3'),  # 09-Sep-23 -> 09 Sep 2023
+    (re.compile(r'(\w+)-(\d{2})-(\d{4})'), r'\2 \1 \3'),  # Aug-24-1806 -> 24 Aug 1806
+]
+_DATE_YEAR_RANGE = re.compile(r'(\d{4})-(\d{4})')
+_DATE_ONLY_YEAR = re.compile(r'^\d{4}$')
+_DATE_MONTH_YEAR = re.compile(r'^\w+ \d{4}$')
+_DATE_MONTH_DASH_YEAR = re.compile(r'^\w+-\d{4}$')
+_DATE_YEAR_OR_YEAR = re.compile(r'^\d{4} or \d{4}$')
+_DATE_BC = re.compile(r'B\.C\.', flags=re.IGNORECASE)
+_DATE_AD = re.compile(r'A\.D\.', flags=re.IGNORECASE)
+_DATE_CIRCA = re.compile(r'Circa|circa')
+_DATE_SPECIFIC_CASES = [
+    (re.compile(r'Before (\d{4})'), lambda m: f'01 Jan {int(m.group(1)) - 1}'),
+    (re.compile(r'Before (\d{2})-(\w+)-(\d{4})'), lambda m: f'{int(m.group(1)) - 1} {m.group(2)} {m.group(3)}'),
+    (re.compile(r'Between (\d{4}) & (\d{4})'), lambda m: f'01 Jan {(int(m.group(1)) + int(m.group(2))) // 2}'),
+]
+
+# Strings already in 'DD Mon YYYY' form go through clean_date unchanged
+_DATE_CANONICAL = re.compile(r'^\d{2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) \d{4}$')
+
+
+def _year_range_midpoint(match):
+    return f'01 Jan {(int(match.group(1)) + int(match.group(2))) // 2}'
+
+
+def _normalize_date_strings(dates):
+    '''
+    Run the clean_date regex passes over a Series of strings, one .str pass per rule.
+    '''
+    dates = dates.str.replace(_DATE_NOISE, '', regex=True).str.strip()
+    dates = dates.str.replace(_DATE_SUFFIX, '', regex=True).str.strip()
+
+    for pattern, replacement in _DATE_FORMATS:
+        dates = dates.str.replace(pattern, replacement, regex=True)
+    dates = dates.str.replace(_DATE_YEAR_RANGE, _year_range_midpoint, regex=True)
+
+    # Only year, month and year, month-year (e.g. 1900, Jan 1900, Sep-1805)
+    dates = dates.mask(dates.str.match(_DATE_ONLY_YEAR), '01 Jan ' + dates)
+    dates = dates.mask(dates.str.match(_DATE_MONTH_YEAR), '01 ' + dates)
+    dates = dates.mask(dates.str.match(_DATE_MONTH_DASH_YEAR), '01 ' + dates.str.replace('-', ' ', regex=False))
+
+    # "1990 or 1991" keeps the first year
+    dates = dates.mask(dates.str.match(_DATE_YEAR_OR_YEAR), dates.str.split(' or ').str[0])
+
+    dates = dates.str.replace(_DATE_BC, 'BC', regex=True)
+    dates = dates.str.replace(_DATE_AD, 'AD', regex=True)
+    dates = dates.str.replace(_DATE_CIRCA, '', regex=True).str.strip()
+
+    for pattern, func in _DATE_SPECIFIC_CASES:
+        dates = dates.str.replace(pattern, func, regex=True)
+
+    return dates
+
+
+@instrument.step
+def normalize_dates(dates):
+    '''
+    Vectorized version of clean_date for a whole 'Date' Series.
+
+    Datetimes are formatted in one call, strings already in 'DD Mon YYYY' form are
+    kept as they are and only the distinct remaining strings go through the regex passes.
+    Returns the same values as dates.apply(clean_date).
+    '''
+    dates = pd.Series(dates, dtype=object)
+    values = dates.to_numpy()
+    result = values.copy()
+
+    missing = pd.isna(values)
+    is_datetime = np.array([isinstance(value, datetime.datetime) for value in values], dtype=bool) & ~missing
+    is_string = np.array([isinstance(value, str) for value in values], dtype=bool)
+
+    # Datetimes -> 'DD Mon YYYY'
+    stamps = pd.Series(values[is_datetime], dtype=object)
+    formatted = pd.to_datetime(stamps, errors='coerce').dt.strftime('%d %b %Y').astype(object)
+    out_of_bounds = formatted.isna().to_numpy()
+    if out_of_bounds.any():
+        formatted[out_of_bounds] = stamps[out_of_bounds].map(lambda value: value.strftime('%d %b %Y'))
+    result[is_datetime] = formatted.to_numpy()
+
+    # Clean each distinct non canonical string once and scatter the result back
+    is_text = is_datetime | is_string
+    text = result[is_text]
+    pending = ~pd.Series(text, dtype=object).str.match(_DATE_CANONICAL).to_numpy(dtype=bool)
+    if pending.any():
+        codes, uniques = pd.factorize(text[pending])
+        cleaned = _normalize_date_strings(pd.Series(uniques, dtype=object)).to_numpy()
+        text[pending] = cleaned[codes]
+        result[is_text] = text
+
+    result[missing] = pd.NaT
+
+    return pd.Series(result, index=dates.index, name=dates.name, dtype=object)
+
+
+@instrument.step
+def date_clean(df):
+    df['Date'] = normalize_dates(df['Date'])
+    return df
 
 
 #Type column 
 
+@instrument.step
 def type_column(df): 
     
     # Step 1: Remove leading/trailing spaces
@@ -135,21 +539,24 @@ def clean_country(country):
     
     return country
 
+@instrument.step
 def country_cleaned(df): 
     
-    df['Country'] = df['Country'].apply(clean_country)
+    df['Country'] = apply_on_uniques(df['Country'], clean_country, MEMO_CACHE_DIR)
     
     return df
 
 
 
 
+@instrument.step
 def state_cleaned(df): 
     
-    df['State'] = df['State'].apply(clean_country)
+    df['State'] = apply_on_uniques(df['State'], clean_country, MEMO_CACHE_DIR)
     
     return df
 
+@instrument.step
 def sex_clean(df): 
     
     df['Sex'] = df['Sex'].replace([' M', 'M ', 'M x 2' ], 'M')
@@ -160,20 +567,102 @@ def sex_clean(df):
 
 # Age
 
+# Textual ages and the age they stand for
+AGE_TEXT = [
+    (50, ['Middle Age', '(adult)', '"middle-age"', '50s', 'adult','Middle age']),
+    (25, ['20/30','20s', '28 & 22',  "20's", '28 & 26', '28, 23 & 30', '21 & ?', '23 & 20','20?', 'mid-20s','21 or 26','18 to 22','? & 19','23 & 26','25 or 28','"young"','young','17 & 35','18 or 20']),
+    (45, ['40s', '45 and 15', '9 & 60', '46 & 34']),
+    (15, ['teen', 'Teen','a minor','Teens','?    &   14', '13 or 14','7      &    31', '16 to 18','13 or 18', '12 or 13']),
+    (11, ['Both 11']),
+    (1, ['a minor', '18 months', '9 months']),
+    (65, ['Elderly', '>50', "60's", '60s']),
+    (10, ['9 or 10', '10 or 12', '7 or 8','9 & 60','8 or 10']),
+    (33, ['mid-30s', '33 & 26', '31 or 33', '36 & 23','30 or 36','21, 34,24 & 35','Ca. 33','33 & 37','32 & 30','37, 67, 35, 27,  ? & 27','30 & 32','33 or 37']),
+]
+
+# Text -> age lookup table, the first group listing a text wins
+AGE_LOOKUP = {}
+for age, texts in AGE_TEXT:
+    for text in texts:
+        AGE_LOOKUP.setdefault(text, age)
+
+# Oldest age accepted when parsing numbers out of the text
+MAX_AGE = 120
+
+# Fraction after a whole age ("2 1/2", "6½"), dropped so that it is not read as a range bound
+AGE_FRACTION = r'(?<=\d)(?:\s+\d/\d+|\s*½)'
+
+
+@instrument.step
+def parse_ages(ages, bounds=False):
+    '''
+    Table-driven age parser for a raw 'Age' Series.
+
+    Textual ages go through AGE_LOOKUP, numbers are kept and the numbers found in ranges
+    ("21 or 26", "28 & 22") give the middle of the range. Fractions of a year ("2 1/2") are
+    dropped. Each distinct value is parsed once.
+
+    Args:
+    ages (pd.Series): Raw ages.
+    bounds (bool): Also return the lower and upper age of each range.
+
+    Returns:
+    pd.Series: Nullable Int8 ages, or a DataFrame with Age, Age_min and Age_max when bounds is True.
+    '''
+    ages = pd.Series(ages, dtype=object)
+    codes, uniques = pd.factorize(ages)
+    uniques = pd.Series(uniques, dtype=object)
+    is_text = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+
+    # Numbers stored as numbers
+    numbers = pd.to_numeric(uniques.where(~is_text), errors='coerce')
+    numbers = np.floor(numbers.where((numbers >= 0) & (numbers <= MAX_AGE)))
+    low, high, age = numbers.copy(), numbers.copy(), numbers.copy()
+
+    # Text: lookup table first, then the numbers it contains
+    text = uniques[is_text]
+    looked_up = text.map(AGE_LOOKUP).fillna(text.str.strip().map(AGE_LOOKUP)).astype(float)
+    found = text.str.replace(AGE_FRACTION, '', regex=True).str.extractall(r'(\d+(?:\.\d+)?)')[0]
+    found = np.floor(found.astype(float))
+    found = found[found <= MAX_AGE].groupby(level=0)
+    found_low = found.min().reindex(text.index)
+    found_high = found.max().reindex(text.index)
+    age[text.index] = looked_up.fillna((found_low + found_high) // 2)
+
+    # Bounds only differ from the age for ranges (two numbers or more)
+    is_range = found.size().reindex(text.index, fill_value=0) >= 2
+    low[text.index] = found_low.where(is_range, age[text.index])
+    high[text.index] = found_high.where(is_range, age[text.index])
+
+    def scatter(values):
+        values = np.append(values.to_numpy(dtype=float), np.nan)
+        return pd.Series(values[codes], index=ages.index, name=ages.name).astype('Int8')
+
+    if not bounds:
+        return scatter(age)
+    return pd.DataFrame({'Age': scatter(age), 'Age_min': scatter(low), 'Age_max': scatter(high)})
+
+
+@instrument.step
 def clean_age(df): 
-    
-    df["Age"] = df["Age"].replace(['Middle Age', '(adult)', '"middle-age"', '50s', 'adult','Middle age'], 50)
-    df['Age'] = df["Age"].replace(['20/30','20s', '28 & 22',  "20's", '28 & 26', '28, 23 & 30', '21 & ?', '23 & 20','20?', 'mid-20s','21 or 26','18 to 22','? & 19','23 & 26','25 or 28','"young"','young','17 & 35','18 or 20'],25)
-    df["Age"] = df['Age'].replace(['40s', '45 and 15', '9 & 60', '46 & 34'], 45)
-    df["Age"] = df['Age'].replace(['teen', 'Teen','a minor','Teens','?    &   14', '13 or 14','7      &    31', '16 to 18','13 or 18', '12 or 13'], 15)
-    df["Age"] = df["Age"].replace('Both 11', 11)
-    df["Age"] = df['Age'].replace(['a minor', '18 months', '9 months'], 1)
-    df["Age"] = df['Age'].replace(['Elderly', '>50', "60's", '60s'], 65)
-    df["Age"] = df['Age'].replace(['9 or 10', '10 or 12', '7 or 8','9 & 60','8 or 10'], 10)
-    df["Age"] = df['Age'].replace(['mid-30s', '33 & 26', '31 or 33', '36 & 23','30 or 36','21, 34,24 & 35','Ca. 33','33 & 37','32 & 30','37, 67, 35, 27,  ? & 27','30 & 32','33 or 37'], 33)
-    
-    df['Age'] = df['Age'].str.split(" ").str[0].apply(pd.to_numeric, errors = "coerce")
-    
+    '''
+    Vectorized version of the former replace chain + .str.split(" ").str[0] + pd.to_numeric.
+
+    Gives the same values: only ages written as text are kept, parsed from their first word;
+    numbers stored as numbers and the texts of AGE_LOOKUP end up as NaN (the .str accessor
+    of the old chain turned every non-string into NaN). Use parse_ages to keep them.
+    '''
+    ages = pd.Series(df['Age'], dtype=object)
+    codes, uniques = pd.factorize(ages)
+    uniques = pd.Series(uniques, dtype=object)
+    kept = uniques.map(lambda value: isinstance(value, str) and value not in AGE_LOOKUP).astype(bool)
+
+    first_word = uniques[kept].str.extract(r'^([^ ]*)', expand=False)
+    values = np.full(len(uniques) + 1, np.nan)
+    values[np.flatnonzero(kept)] = pd.to_numeric(first_word, errors='coerce').to_numpy(dtype=float)
+
+    # Always float64 like the old chain, whatever the values: chunks of the column get the same dtype
+    df['Age'] = pd.Series(values[codes], index=df.index, name='Age')
     
     return df
 
@@ -254,116 +743,998 @@ def categorize_time(cleaned_time):
             return 'Night'
     except:
         return np.nan
+
+
+# Single-pass time of day classifier (same result as clean_time_format + categorize_time)
+
+TIME_CATEGORIES = ['Morning', 'Afternoon', 'Night']
+
+# (label, keywords searched in the lowercase text, keywords searched in the original text)
+# Checked in this order, the first label with a matching keyword wins
+_TIME_KEYWORDS = [
+    ('Unknown', ['not advised', 'not stated'], ['Not', '?']),
+    ('Morning',
+     ['early morning', 'morning', 'just before noon', 'am', 'a.m.', 'late morning', 'noon', 'mid morning', 'mid-morning'],
+     ['Sometime between 06h00 & 08hoo', 'Between 11h00 & 12h00', 'Before 10h30']),
+    ('Afternoon',
+     ['afternoon', '"midday"', 'early afternoon', 'after noon', 'mid afternoon', 'daytime', '"after lunch"', 'midday', 'before daybreak'],
+     ['>17h30', '17h00 Sunset', 'Shortly before 13h00']),
+    ('Night',
+     ['night', '"evening"', 'late afternoon', 'sunset', 'midnight', 'lunchtime', 'just before sundown', 'shortly after midnight',
+      'after dusk', 'dusk', '"night"', 'nightfall', 'just before dawn', 'dark', '"shortly before dusk"', 'after midnight'],
+     ['After 04h00', 'Ship aban-doned at 03h10', '30 minutes after 1992.07.08.a']),
+]
+
+
+def _build_time_classifier():
+    '''
+    Compile the keyword rules into one regex over "original\\x00lowercase".
+
+    Lowercase keywords may match anywhere (a match in the original text is also a match
+    in its lowercase copy), keywords for the original text only look before the \\x00.
+    '''
+    branches = [r'(?= ?\x00)(?P<Empty>)']  # '' and ' '
+    for label, lowercase, original in _TIME_KEYWORDS:
+        lookahead = [r'.*?(?:%s)' % '|'.join(map(re.escape, lowercase))]
+        lookahead.append(r'[^\x00]*?(?:%s)' % '|'.join(map(re.escape, original)))
+        branches.append(r'(?=%s)(?P<%s>)' % ('|'.join(lookahead), label))
+    return re.compile('|'.join(branches), flags=re.DOTALL)
+
+
+_TIME_CLASSIFIER = _build_time_classifier()
+
+
+def _hours_to_time_codes(hours):
+    '''
+    Map hours to codes in TIME_CATEGORIES (-1 when there is no hour).
+    '''
+    return np.select([hours.isna(), (hours >= 6) & (hours < 12), (hours >= 12) & (hours < 18)], [-1, 0, 1], default=2)
+
+
+@instrument.step
+def classify_time(times):
+    '''
+    Classify a raw 'Time' Series into Morning / Afternoon / Night.
+
+    Each distinct value is scanned once by the combined keyword regex; the ones without
+    a keyword get their hour extracted from 'HHhMM' / 'HHMM' forms with .str kernels.
+    Returns a categorical Series with the same values as cleaned_time.
+    '''
+    times = pd.Series(times)
+    codes, uniques = pd.factorize(times.astype(object), use_na_sentinel=False)
+
+    original = pd.Series([str(value) for value in uniques], dtype=object)
+    lowercase = original.str.lower()
+    matches = [_TIME_CLASSIFIER.match(key) for key in original + '\x00' + lowercase]
+    labels = pd.Series([match.lastgroup if match else None for match in matches], dtype=object)
+
+    # Values without keywords: keep digits and 'h', the hour is the leading 1 or 2 digits
+    numeric = lowercase[labels.isna()]
+    numeric = numeric.str.replace('hr', 'h', regex=False).str.replace('hoo', 'h', regex=False).str.replace('jh', 'h', regex=False)
+    numeric = numeric.str.replace(r'[^\dh]', '', regex=True).str.replace(r'^h', '', regex=True).str.replace(r'h+', 'h', regex=True)
+    hours = numeric.str.extract(r'^(\d{1,2})', expand=False).map(int, na_action='ignore').astype(float)
+
+    unique_codes = labels.map({'Morning': 0, 'Afternoon': 1, 'Night': 2}).fillna(-1).to_numpy(dtype=np.int8, copy=True)
+    unique_codes[labels.isna().to_numpy()] = _hours_to_time_codes(hours)
+
+    categories = pd.Categorical.from_codes(unique_codes[codes], categories=TIME_CATEGORIES)
+    return pd.Series(categories, index=times.index, name=times.name)
+
+
+@instrument.step
+def cleaned_time(df):
+
+    df['Time'] = classify_time(df['Time'])
+
+    return df
+
+
+def clean_location(location):
+    if pd.isna(location):
+        return None
     
+    # Strip leading and trailing whitespace
+    location = location.strip()
     
-def cleaned_time(df):
+    # Convert to title case
+    location = location.title()
     
-    df['Time'] = df['Time'].apply(clean_time_format)
-    df['Time'] = df['Time'].replace('', np.nan)
-    df['Time'] = df['Time'].apply(categorize_time)
+    # Remove special characters (except commas and periods)
+    location = re.sub(r'[^\w\s,\.]', '', location)
     
-    return df
+    return location
 
 
+@instrument.step
 def clean_location_column(df, column_name):
 
-    def clean_location(location):
-        if pd.isna(location):
-            return None
-        
-        # Strip leading and trailing whitespace
-        location = location.strip()
-        
-        # Convert to title case
-        location = location.title()
-        
-        # Remove special characters (except commas and periods)
-        location = re.sub(r'[^\w\s,\.]', '', location)
-        
-        return location
-    
-    df[column_name] = df[column_name].apply(clean_location)
+    df[column_name] = apply_on_uniques(df[column_name], clean_location, MEMO_CACHE_DIR)
     return df
 
+@instrument.step
 def location_cleaned(df):
     df['Country'] = df['Country'].str.lower()
     return df
 
 
 
+def clean_activity(activity):
+    if pd.isna(activity):
+        return None
+    
+    # Strip leading and trailing whitespace
+    activity = activity.strip()
+    
+    # Convert to title case
+    activity = activity.title()
+    
+    # Remove special characters (except commas and periods)
+    activity = re.sub(r'[^\w\s,\.]', '', activity)
+    
+    # Normalize common terms
+    activity = activity.replace('Snorkelling', 'Snorkeling')
+    activity = activity.replace('Boogie Boarding', 'Bodyboarding')
+    activity = activity.replace('Stand-Up Paddleboarding', 'Stand-Up Paddleboarding')
+    activity = activity.replace('Stand-Up Paddle Boarding', 'Stand-Up Paddleboarding')
+    activity = activity.replace('Scuba Diving', 'Scuba Diving')
+    activity = activity.replace('Free Diving', 'Freediving')
+    activity = activity.replace('Spearfishing', 'Spearfishing')
+    activity = activity.replace('Surfing', 'Surfing')
+    activity = activity.replace('Swimming', 'Swimming')
+    activity = activity.replace('Wading', 'Wading')
+    activity = activity.replace('Fishing', 'Fishing')
+    activity = activity.replace('Kayaking', 'Kayaking')
+    activity = activity.replace('Paddle Boarding', 'Paddleboarding')
+    activity = activity.replace('Body Boarding', 'Bodyboarding')
+    activity = activity.replace('SurfSkiing', 'Surf Skiing')
+    
+    return activity
+
+
+@instrument.step
 def clean_activity_column(df, column_name):
 
-    def clean_activity(activity):
-        if pd.isna(activity):
-            return None
-        
-        # Strip leading and trailing whitespace
-        activity = activity.strip()
-        
-        # Convert to title case
-        activity = activity.title()
-        
-        # Remove special characters (except commas and periods)
-        activity = re.sub(r'[^\w\s,\.]', '', activity)
-        
-        # Normalize common terms
-        activity = activity.replace('Snorkelling', 'Snorkeling')
-        activity = activity.replace('Boogie Boarding', 'Bodyboarding')
-        activity = activity.replace('Stand-Up Paddleboarding', 'Stand-Up Paddleboarding')
-        activity = activity.replace('Stand-Up Paddle Boarding', 'Stand-Up Paddleboarding')
-        activity = activity.replace('Scuba Diving', 'Scuba Diving')
-        activity = activity.replace('Free Diving', 'Freediving')
-        activity = activity.replace('Spearfishing', 'Spearfishing')
-        activity = activity.replace('Surfing', 'Surfing')
-        activity = activity.replace('Swimming', 'Swimming')
-        activity = activity.replace('Wading', 'Wading')
-        activity = activity.replace('Fishing', 'Fishing')
-        activity = activity.replace('Kayaking', 'Kayaking')
-        activity = activity.replace('Paddle Boarding', 'Paddleboarding')
-        activity = activity.replace('Body Boarding', 'Bodyboarding')
-        activity = activity.replace('SurfSkiing', 'Surf Skiing')
-        
-        return activity
-    
-    df[column_name] = df[column_name].apply(clean_activity)
+    df[column_name] = apply_on_uniques(df[column_name], clean_activity, MEMO_CACHE_DIR)
     return df
 
+@instrument.step
 def activity_cleaned(df):
     df['Activity'] = df['Activity'].str.lower()
     return df
 
 
 
-def clean_injury_column(df, column_name):
+def clean_injury(injury):
+    if pd.isna(injury):
+        return None
     
-    def clean_injury(injury):
-        if pd.isna(injury):
-            return None
-        
-        # Strip leading and trailing whitespace
-        injury = injury.strip()
-        
-        # Convert to sentence case
-        injury = injury.capitalize()
-        
-        # Remove special characters (except commas and periods)
-        injury = re.sub(r'[^\w\s,]', '', injury)
-        
-        # Remove text after a period
-        if '.' in injury:
-            injury = injury.split('.')[0]
-        
-        return injury.strip()
+    # Strip leading and trailing whitespace
+    injury = injury.strip()
     
-    df[column_name] = df[column_name].apply(clean_injury)
+    # Convert to sentence case
+    injury = injury.capitalize()
+    
+    # Remove special characters (except commas and periods)
+    injury = re.sub(r'[^\w\s,]', '', injury)
+    
+    # Remove text after a period
+    if '.' in injury:
+        injury = injury.split('.')[0]
+    
+    return injury.strip()
+
+
+@instrument.step
+def clean_injury_column(df, column_name):
+
+    df[column_name] = apply_on_uniques(df[column_name], clean_injury, MEMO_CACHE_DIR)
     return df
 
+@instrument.step
 def injury_cleaned(df):
     df['Injury'] = df['Injury'].str.lower()
     return df
 
 
 
+# Species normalization rules
+
+# Keyword -> species, the first keyword (in this order) found in the lowercase value wins
+SPECIES2_KEYWORDS = {
+    'white': 'White Shark',
+    'tiger': 'Tiger Shark',
+    'bull': 'Bull Shark',
+    'nurse': 'Nurse Shark',
+    'blacktip': 'Blacktip Shark',
+    'hammerhead': 'Hammerhead Shark',
+    'lemon': 'Lemon Shark',
+    'blue': 'Blue Shark',
+    'brown': 'Brown Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'bronze': 'Bronze Shark',
+    'caribbean': 'Caribbean Reef Shark',
+    'mako': 'Mako Shark',
+    'reportedly a great white': 'White Shark',
+    'shall shark': 'Shall Shark',
+    'sandbar': 'Sandbar Shark',
+    'carribean': 'Carribean Reef Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'broze': 'Bronze Shark',
+    'sevengill': 'Sevengill Shark',
+    'whitetip': 'White Shark',
+    'nurse': 'Nurse Shark',
+    'galapagos': 'Galapagos Shark',
+    'cookiecutter': 'Cookiecutter Shark',
+    'wfite': 'White Shark',
+    'wobbegong': 'Wobbegong Shark',
+    'horn': 'Horn Shark',
+    'mako': 'Mako Shark',
+    '"A small shark': 'Small Shark',
+    'epaulette': 'Epaulette Shark',
+    'spinner' : 'Spinner Shark',
+    'galapagos': 'Galapagos Shark',
+    'tope': 'Tope Shark',
+    '"Reef shark"': 'Reef Shark',
+    '"whitetip shark"': 'White Shark',
+    'broadnose': 'Broadnise Shark',
+    'reef': 'Reef Shark',
+    'sandtiger': 'Tiger Shark',
+    'spinner': 'Spinner Shark',
+    'stingray': 'Stringray Shark',
+    'toadfish': 'Toadfish Shark',
+    '"reef shark"': 'Reef Shark',
+    'blue': 'Blue Shark',
+    'salmon': 'Salmon Shark',
+    'wobbegong': 'Wobbegong Shark',
+    'porbeagle': 'Porbeagle Shark',
+    'seven-gill' : 'Gill Shark',
+    'dogfish': 'Dogfish Shark',
+    'silky': 'Silky Shark',
+    'hammerhead': 'Hammmerhead Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'goblin': 'Goblin Shark',
+    'angel': 'Angel Shark'
+}
+
+# Values removed by clean_and_normalize_species2
+SPECIES2_TO_NA = {
+    ' ' : 'NA',
+    'no shark involvement' : 'NA',
+    'no shark invovlement' : 'NA',
+    'no shark invovlement - it ws a publicity stunt' : 'NA',
+    'Invalid' : 'NA',
+    'Invalid incident' : 'NA',
+    'Questionable' :'NA',
+    'Questionable incident' :'NA',
+    'No shark involvement' : 'NA',
+    '1NAm NA] shark' : 'NA',
+    'Shark involvement prior to death was not confirmed' : 'NA',
+    'Shark involvement not confirmed ' : 'NA',
+    'NA shark ' : 'NA',
+    '1NAm shark' : 'NA',
+    "4' shark" : 'NA',
+    "6' shark" : 'NA',
+    "4' toNA shark" : 'NA',
+    "2NAm NA] shark" : 'NA',
+    "3' shark" : 'NA',
+    "5' shark" : 'NA',
+    "3' toNA shark" : 'NA',
+    "2 m shark" : 'NA',
+    "3 m NA'] shark": 'NA',
+    "3 m shark": 'NA',
+    "1NAm toNA5 m NA toNA] shark": 'NA',
+    "3NAm NA'] shark": 'NA',
+    "7' shark": 'NA',
+    "8' shark": 'NA',
+    "5' toNA shark": 'NA',
+    "2NAm shark": 'NA',
+    "2' toNA shark": 'NA',
+    "a small shark": 'NA',
+    "Shark involvement prior to death not confirmed": 'NA',
+    "1 m shark": 'NA',
+    "Shark involvement not confirmed": 'NA',
+    "Shark involvement prior to death unconfirmed": 'NA',
+    "NA shark": 'NA',
+}
+
+# Keyword -> species, the first keyword (in this order) found in the lowercase value wins
+SPECIES_KEYWORDS = {
+    'white': 'White Shark',
+    'tiger': 'Tiger Shark',
+    'bull': 'Bull Shark',
+    'nurse': 'Nurse Shark',
+    'blacktip': 'Blacktip Shark',
+    'hammerhead': 'Hammerhead Shark',
+    'lemon': 'Lemon Shark',
+    'blue': 'Blue Shark',
+    'brown': 'Brown Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'bronze': 'Bronze Shark',
+    'caribbean': 'Caribbean Reef Shark',
+    'mako': 'Mako Shark',
+    'reportedly a great white': 'White Shark',
+    'shall shark': 'Shall Shark',
+    'sandbar': 'Sandbar Shark',
+    'carribean': 'Carribean Reef Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'broze': 'Bronze Shark',
+    'sevengill': 'Sevengill Shark',
+    'whitetip': 'White Shark',
+    'nurse': 'Nurse Shark',
+    'galapagos': 'Galapagos Shark',
+    'cookiecutter': 'Cookiecutter Shark',
+    'wfite': 'White Shark',
+    'wobbegong': 'Wobbegong Shark',
+    'horn': 'Horn Shark',
+    'mako': 'Mako Shark',
+    '"A small shark': 'Small Shark',
+    'epaulette': 'Epaulette Shark',
+    'spinner' : 'Spinner Shark',
+    'galapagos': 'Galapagos Shark',
+    'tope': 'Tope Shark',
+    '"Reef shark"': 'Reef Shark',
+    '"whitetip shark"': 'White Shark',
+    'broadnose': 'Broadnise Shark',
+    'reef': 'Reef Shark',
+    'sandtiger': 'Tiger Shark',
+    'spinner': 'Spinner Shark',
+    'stingray': 'Stringray Shark',
+    'toadfish': 'Toadfish Shark',
+    '"reef shark"': 'Reef Shark',
+    'blue': 'Blue Shark',
+    'salmon': 'Salmon Shark',
+    'wobbegong': 'Wobbegong Shark',
+    'porbeagle': 'Porbeagle Shark',
+    'seven-gill' : 'Gill Shark',
+    'dogfish': 'Dogfish Shark',
+    'silky': 'Silky Shark',
+    'hammerhead': 'Hammmerhead Shark',
+    'raggedtooth': 'Raggedtooth Shark',
+    'goblin': 'Goblin Shark',
+    'angel': 'Angel Shark',
+    'zambesi': 'Zambesi Shark',
+    'spurdog': 'Spurdog Shark',
+    'smoothhound': 'Smoothhound Shark',
+    'basking': 'Basking Shark',
+    'sand': 'Sand Shark',
+    'silvertip': 'Silvertip Shark',
+    "on 8/13/2005 anglers from New Zealand":'Small Shark',
+    'copper': 'Copper Shark',
+    'dusky': 'Dusky Shark',
+    "grey-colored shark": 'Grey Shark',
+    'cow': 'Cow Shark',
+    'small': 'Small Shark',
+    'juvenile': 'Small Shark',
+    'authentificated': 'unconfirmed',
+    'whale': 'Whale Shark',
+    'unknown': 'unconfirmed',
+    '"red shark"': 'Red Shark',
+    'zambesi': 'Zambezi Shark',
+    'unconfirmed': 'unconfirmed',
+    'carpet': 'Carpet Shark',
+    '"spear-eye"': 'Spear-eye Shark',
+    'whale': 'Whale Shark',
+    'anglers from New Zealand': 'Large Shark',
+    '"black finned shark"': 'Finned Shark',
+    'soupfin': 'Soupfin Shark',
+    'leopard': 'Leopard Shark',
+    'grey': 'Grey Shark',
+    'gaffed': 'Gaffed Shark',
+    'shovelnose': 'Shovelnose Shark',
+    '"ground shark"': 'Ground Shark',
+    '>': 'Large Shark',
+    'zambezi': 'Zambezi Shark',
+    'albimarginatus': 'Albimarginatus Shark',
+    '<': 'Small Shark',
+    '500': 'Large Shark',
+    '136': 'Large Shark',
+    '193': 'Large Shark',
+    '"yellow belly"': 'Large Shark',
+    'rhizoprionodon': 'Gummy Shark',
+    '"banjo shark"': 'Banjo Shark',
+    'not a shark': 'not a shark',
+    'shark captured': 'Large Shark',
+    'sharks': 'Large Shark',
+    '"a very flat head”': 'Large Shark',
+    '"gummy”': 'Gummy Shark',
+    '2 m': 'Large Shark',
+    'larger': 'Large Shark',
+    'hull': 'Hull Shark',
+    '4.5  m': 'Large Shark',
+    'bite': 'not a shark',
+    'cocktail': 'Cocktail Shark',
+    'carcharhinid': 'Carcharhinid Shark',
+    'macrurus': 'C. Macrurus Shark',
+    '“spear-eye”': 'Spear-Eye Shark',
+    'bonita sharkk': 'Bonita Shark',
+    'anglers': 'Anglers Shark',
+    'tooth fragments': 'Large Shark',
+    'to involve a pinniped instead': 'not a shark',
+    'on turtle scraps': 'Small Shark',
+    'another shark nearby': 'Large Shark',
+    'dolphin': 'not a shark',
+    'shark known as': 'Old Tom Shark',
+    '13': 'Large Shark',
+    "7' to 8'": 'Large Shark',
+    'invovlement': 'not a shark',
+    'not confirmes': 'Small Shark',
+    "3.3 m [10'": 'Large Shark',
+    '60 cm': 'Small Shark',
+    "1.3 m [4'": 'Small Shark',
+    "1.8 m [6']": 'Large Shark'
+}
+
+# Exact descriptions -> species, for the values without a keyword
+SPECIES_BY_DESCRIPTION = {
+    '"small sharks"' : 'Small Shark',
+    '"a small shark"' : 'Small Shark',
+    'Large shark': 'Large Shark',
+    '2.5m shark': 'Large Shark',
+    "3' to 4' shark": 'Small Shark',
+    "8' shark": 'Large Shark',
+    "4' shark": 'Small Shark',
+    "3' shark": 'Small Shark',
+    '1m shark': 'Small Shark',
+    '5m to 6m shark': 'Large Shark',
+    "5'shark": 'Large Shark',
+    '3m shark': 'Large Shark',
+    "6' shark": 'Large Shark',
+    "9' shark": 'Large Shark',
+    "5' shark": 'Large Shark',
+    "2' to 3' shark": 'Small Shark',
+    "7' to 8' shark": 'Large Shark',
+    '8 ft shark': 'Large Shark',
+    '5.5 ft shark': 'Large Shark',
+    '1.3m shark': 'Small Shark',
+    "3' to 5' shark": 'Small Shark',
+    '8" shark' : 'Large Shark',
+    '4m shark': 'Large Shark',
+    "4' to 5' shark": 'Small Shark',
+    '2 m shark': 'Large Shark',
+    "5' to 6' shark": 'Large Shark',
+    "7' shark": 'Large Shark',
+    "1+ m shark": 'Small Shark',
+    "6' to 7' shark": 'Large Shark',
+    "2' shark": 'Small Shark',
+    "6.5' shark": 'Large Shark',
+    "10' to 12' shark": 'Large Shark',
+    "shark pup": 'White Shark',
+    "12' shark": 'Large Shark',
+    "2.5 m shark": 'Large Shark',
+    "Reported as shark attacks but injuries caused by toadfish": 'not a shark',
+    "Reported as shark bite but injury caused by stingray": 'not a shark',
+    "5' to 8' shark": 'Large Shark',
+    "3 m shark": 'Large Shark',
+    "2m shark": 'Large Shark',
+    "small shark": 'Small Shark',
+    "3m shark, probably a smooth hound": 'Large Shark',
+    'Shark involvement highly doubtful' : 'Small Shark',
+    'No shark invovlement - it ws a publicity stunt' : 'not a shark',
+    'Shark involvement prior to death not confirmed': 'Small Shark',
+    "10' shark": 'Large Shark',
+    'a small shark': 'Small Shark',
+    '3+ m shark': 'Large Shark',
+    "4' shark?": 'Small Shark',
+    '1m to 1.2 m shark': 'Small Shark',
+    '3- to 4-foot shark': 'Small Shark',
+    '3.5 to 4 m shark': 'Large Shark',
+    '2 m to  3 m shark': 'Large Shark',
+    '1.8 m shark': 'Large Shark',
+    '5 m shark': 'Large Shark',
+    '1.5 m shark': 'Small Shark',
+    '1 m shark': 'Small Shark',
+    "8' to 10' shark": 'Large Shark',
+    "4' to 6' shark" : 'Small Shark',
+    "4' tp 5' shark": 'Small Shark',
+    '1.8 metre shark': 'Large Shark',
+    "6' to 8' shark": 'Large Shark',
+    'shark involvement not confirmed': 'Small Shark',
+    '"small sharks"': 'Small Shark',
+    'no shark involvement' : 'not a shark',
+    'no shark invovlement' : 'not a shark',
+    'No shark involvement' : 'not a shark',
+    '1NAm NA] shark' : 'Large Shark',
+    "4' toNA shark" : 'Small Shark',
+    "4' shark" : 'Small Shark',
+    "6' shark" : 'Large Shark',
+    "4' toNA shark" : 'Small Shark',
+    "2NAm NA] shark" : 'Large Shark',
+    "3' shark" : 'Small Shark',
+    "5' shark" : 'Small Shark',
+    "3' toNA shark" : 'Small Shark',
+    "2 m shark" : 'Large Shark',
+    "3 m NA'] shark": 'Large Shark',
+    "3 m shark": 'Large Shark',
+    "1NAm toNA5 m NA toNA] shark": 'Large Shark',
+    "3NAm NA'] shark": 'Large Shark',
+    "7' shark": 'Large Shark',
+    "8' shark": 'Large Shark',
+    "5' toNA shark": 'Large Shark',
+    "2NAm shark": 'Small Shark',
+    "2' toNA shark": 'Small Shark',
+    "a small shark": 'Small Shark',
+    "Shark involvement prior to death not confirmed": 'Shark Small',
+    "1 m shark": 'Shark Small',
+    "Shark involvement not confirmed": 'Small Shark',
+    "Shark involvement prior to death unconfirmed": 'Small Shark',
+    "NA shark": 'Small Shark',
+    "3.5' to 4' shark": 'Small Shark',
+    "14' to 18'shark": 'Large Shark',
+    "15' shark": 'Large Shark',
+    "2 to 2.5 m shark": 'Large Shark',
+    "1' to 2' shark": 'Small Shark',
+    '20 to 30kg shark': 'Small Shark',
+    "14' shark": 'Large Shark',
+    '2 m to 3 m shark': 'Large Shark',
+    '80 kg shark': 'Large Shark',
+    '2.6 m shark': 'Large Shark',
+    "+3' shark" : 'Small Shark',
+    "2' to 3' juvenile shark": 'Small Shark',
+    "3'  shark": 'Small Shark',
+    "2'  shark": 'Small Shark',
+    "4.5 to 5' shark": 'Small Shark',
+    "1.5' to 2' shark" : 'Small Shark',
+    "2.5' shark": 'Small Shark',
+    '"a small shark"': 'Small Shark',
+    'Not a shark attack; it was a hoax': 'not a shark',
+    '"A small shark"': 'Small Shark',
+    'Authorities report injury caused bya barracuda': 'not a shark',
+    'No shark invovlement': 'not a shark',
+    'A small shark': 'Small Shark',
+    "7' to 8' shark": 'Large Shark',
+    'Injuries not caused by a shark': 'not a shark',
+    'Shark involvement unconfirmed but considered probable': 'Small Shark',
+    'Shovelnose "shark" which is a ray, not a shark)': 'not a shark',
+    'Juvenile shark': 'Small Shark',
+    'Injury most likely caused by barracuda, not a shark':'not a shark',
+    'Shark involvement questionable': 'Small Shark',
+    " 6' to 8' shark": 'Large Shark',
+    "Said to involve an 8' shark but more likely damage caused by debris": 'not a shark',
+    'juvenile shark': 'Small Shark',
+    "Thought to involve a 3' to 4' shark, but shark involvement not confirmed": 'Small Shark',
+    'Shark involvement not cofirmed' : 'unconfirmed',
+    'Shark involvement not confirmed & highly unlikely': 'not a shark',
+    '7-gill shark?': 'Large Shark',
+    '7-gill shark': 'Large Shark',
+    '4.5 m shark': 'Large Shark',
+    '18" to 24" shark': 'Large Shark',
+    'Port Jackson shark, 1m': 'Small Shark',
+    '4 m shark': 'Large Shark',
+    '3 m to 4 m shark': 'Large Shark',
+    'Shark involvement probable, but not confirmed': 'Small Shark',
+    'Reported by media as shark attack, but shark involvement prior to death was not confirmed': 'unconfirmed',
+    'Shark involvement not confirmed; thought to be a barracuda bite': 'not a shark',
+    '2.27 m shark': 'Large Shark',
+    '1.5 to 2 m shark': 'Small Shark',
+    "9.5' shark?": 'Large Shark',
+    "3' small spotted catshark, Scyliorhinus canicula": 'Small Shark',
+    'Questionable Incident': 'unconfirmed',
+    '2.4 m shark': 'Large Shark',
+    '24" to 30" shark': 'Large Shark',
+    '2.5 to 3 m shark': 'Large Shark',
+    '2 to 3 m shark': 'Large Shark',
+    "1' to 4' shark": 'Small Shark',
+    'small catsharks': 'Small Shark',
+    '3 m, 600-kg shark': 'Large Shark',
+    'Said to involve a 1.5 m shark': 'Small Shark',
+    "2 m [6.75'] shark, 200-kg shark T": 'Large Shark',
+    "[4.5' to 5'] shark": 'Small Shark',
+    "Unknown, but it was reported that a shark tooth was recovered from the wound": 'unconfirmed',
+    '"small shark"': 'Small Shark',
+    '18" to 36" shark': 'Large Shark',
+    "4 m [13'] shark": 'Large Shark',
+    "3 m [10'] shark": 'Large Shark',
+    "2.4 m [8'] shark": 'Large Shark',
+    "1.2 m [4'] shark": 'Small Shark',
+    "1.8 m [6'] shark": 'Small Shark',
+    "1.2 m to 1.5 m [4' to 5'] shark": 'Small Shark',
+    '2 sharks, 4.5 m & 3 m': 'Large Shark',
+    '"black tipped" shark': 'Tipped Shark',
+    "0.9 m to 1.5 m [3' to 5'] shark": 'Small Shark',
+    "2.4 m to 3.7 m [8' to 12'] shark": 'Large Shark',
+    'small sharks': 'Small Shark',
+    'Shark involvement doubtful': 'undefined',
+    'Unidentified species' : 'undefined',
+    "1.5 m to 1.8 m [5' to 6'] shark" : 'Small Shark',
+    "106 cm [3.5']  shark": 'Small Shark',
+    "3.7 m to 4.3 m [12' to 14'] shark": 'Large Shark',
+    "0.9 m to 1.2 m [3' to 4'] shark": 'Small Shark',
+    'A “small” shark': 'Small Shark',
+    "60 cm [2'] captive shark": 'Small Shark',
+    'Species unidentified': 'unconfirmed',
+    "3.5' to 4.5' shark": 'Large Shark',
+    '"A pack of sharks"': 'Large Shark',
+    'Unknown, but the shark was caught and put on exhibition': 'unconfirmed',
+    '"a large shark"': 'Large Shark',
+    "Questionable incident, said to involve a 6' shark" : 'Large Shark',
+    '3 sharks': 'Large Shark',
+    'Not specified': 'undefined',
+    '6 ft shark': 'Large Shark',
+    '6ft shark': 'Large Shark',
+    'Bu.ll': 'undefined',
+    "7' to 8' shark": 'Large Shark',
+    ' ': 'not a shark',
+    "3' to 3.5' shark": 'Small Shark',
+    "5' to 7' shark": 'Large Shark',
+    '2 sharks, 4.5 m & 3 m': 'Large Shark',
+    '15 cm to 20 cm [6" to 8"] bite diameter just below left knee': 'Small Shark',
+    "2.4 m to 3 m [8' to 10'] grey colored shark": 'Large Shark',
+    "3 m to 3.7 m [10' to 12'] shark": 'Large Shark',
+    "0.9 m  to 1.2 m [3' to 4'] shark": 'Small Shark',
+    "0.9 m to 1.2 m [3' to 4'] shark; Tooth fragment recovered from hand": 'Small Shark',
+    '1 m  shark': 'Small Shark',
+    "2.1 m to 2.4 m [7' to 8'] shark": 'Large Shark',
+    "0.9 m [3'] shark": 'Small Shark',
+    'Shark involvement prior to death unconfired': 'Small Shark',
+    'C. leucas tooth fragment recovered from kayak': 'uncorfirmed',
+    'Questionable incident - shark bite may have precipitated drowning': 'unconfirmed',
+    'Unidentified': 'unconfirmed',
+    "2' to 3.5' shark": 'Small Shark',
+    "1.5 m [5'] shark": 'Small Shark',
+    "0.9 m  [3'] shark": 'Small Shark',
+    "1.2 m to 1.5 m [4.5' to 5'] shark": 'Small Shark',
+    "1.2 m to 1.8 m [4' to 6'] shark": 'Small Shark',
+    "2.1 to 2.4 m [7' to 8'] shark": 'Large Shark',
+    "60 cm to 90 cm [2' to 3'] shark": 'Small Shark',
+    "A 2' shark was seen in the area by witnesses": 'Small Shark',
+    'Shark involvement  not confirmed': 'unconfirmed',
+    'Shark involvement  questionable': 'unconfirmed',
+    '1.3 to 1.6 m shark': 'Small Shark',
+    '200 to 300 kg shark': 'Large Shark',
+    "4.5' to 5' shark": 'Small Shark',
+    '1.7 m shark': 'Small Shark',
+    'Shark involvement prior to death suspected but not confirmed': 'unconfirmed',
+    "1.8 m to 2.1 m [6' to 7'] shark": 'Large Shark',
+    '"a young shark"': 'Small Shark',
+    "1.2 m to 1.5 m [4' to 5']   shark": 'Small Shark',
+    "1.5 to 1.8 m [5' to 6'] shark": 'Small Shark',
+    "Two 1.2 m to 1.5 m [4' to 5'] sharks":'Small Shark',
+    "2.1 m [7'] shark": 'Large Shark',
+    ">1.8 m [6'] shark": 'Large Shark',
+    "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark',
+    'Unidentified shark': 'unconfirmed',
+    '>2 m shark': 'Large Shark',
+    "5 m [16.5'] shark": 'Large Shark',
+    '1.8 m grey shark': 'Grey Shark',
+    "3 m [10'], 270- kg [595-lb] shark": 'Large Shark',
+    "7' female shark": 'Large Shark',
+    '"Shark had a very large girth"': 'Large Shark',
+    "1.8 m [6'] shark": 'Large Shark',
+    "1.8 m to 2.4 m [6' to 8'] shark": 'Large Shark',
+    '6 m, 600-kg shark':'Large Shark',
+    "Two sharks seen in vicinity: 2.4 m & 4.25 m  [8' & 14'] TL":'Large Shark',
+    '2 m to 2.5 m shark': 'Large Shark',
+    "1.5 m to 2 m [5' to 6.75'] shark": 'Large Shark',
+    '1 m "grey-colored" shark': 'Small Shark',
+    '"gray shark"': 'Grey Shark',
+    'a school of sharks': 'Large Shark',
+    '"Shark caught later"': 'Large Shark',
+    'Remains recovered from shark caught days later': 'unconfirmed',
+    '234-lb shark': 'Large Shark',
+    "Said to be a 7.6 m [25'] shark": 'Large Shark',
+    '"The fish was harpooned, dried, and presented to the sailor, who went round Europe exhibiting it  It was said to be 20 feet long.': 'Large Shark',
+    '70 kg shark': 'Small Shark',
+    '5m, 3500 kg female shark': 'Large Shark',
+    '"a school of sharks"': 'Large Shark',
+    '250-lb "dog shark"': 'Dog Shark',
+    '650-lb shark': 'Large Shark',
+    '2 days later a 600-lb shark was caught 100 yards from the site': 'Large Shark',
+    "7' to 8' shark": 'Large Shark',
+    "3' to 3.5' shark": 'Small Shark',
+    "5' to 7' shark": 'Small Shark',
+    "12' to 18' shark" : 'Large Shark',
+    '2 sharks, 4.5 m & 3 m': 'Large Shark',
+    '15 cm to 20 cm [6" to 8"] bite diameter just below left knee': 'Small Shark',
+    "2.4 m to 3 m [8' to 10'] grey colored shark": 'Grey Shark',
+    "3 m to 3.7 m [10' to 12'] shark": 'Large Shark',
+    "0.9 m  to 1.2 m [3' to 4'] shark": 'Small Shark',
+    "0.9 m to 1.2 m [3' to 4'] shark; Tooth fragment recovered from hand": "Small Shark",
+    "2 sharks": 'Large Shark',
+    'Identified as C. gangeticus by Dr. J. Fayrer': 'unconfirmed',
+    'Said to involve 2 sharks': 'Large Shark',
+    "Said to involve 2 sharks": 'Large Shark',
+    "4.7 m [15.5'] shark": 'Large Shark',
+    "16' shark": 'Large Shark',
+    "20' shark": 'Large Shark',
+    "1.8 m to 2.7 m [6' to 9'] shark": 'Large Shark',
+    "Fishermen recovered partial remains from shark a week later": 'unconfirmed',
+    'Remains recovered 5 days later': 'unconfirmed',
+    'Shark involvement probable': 'unconfirmed',
+    'Allegedly a 33-foot shark': 'Large Shark',
+    'Remains recovered from 3 sharks': 'Large Shark',
+    '18-foot shark': 'Large Shark',
+    "5.5' to 6' shark": 'Large Shark',
+    "Said to involve a 2.7 m [9'] shark": 'Large Shark',
+    "13' shark": 'Large Shark',
+    "3.7 m to 4.3 m [12' to 14']  shark": 'Large Shark',
+    "3.7 m [12'], 1200-lb shark. Shark caught & its jaw exhibited at the Carnegie Museum": 'Large Shark',
+    "15'": 'Large Shark',
+    '15* to 24" dog shark': 'Dog Shark',
+    "Comrades saw shark's tail appear about 5' away": 'Large Shark',
+    '"A pack of 6 sharks"': 'Large Shark',
+    "2.7 m [9'] shark later captured by Mitchell-Hedges": 'Large Shark',
+    '"a very large shark"': 'Large Shark',
+    "According to Carlsmith, the shark's mouth was 3' wide": 'Large Shark',
+    'Questionable, 2m shark suspected': 'Large Shark',
+    '"whiptail shark" (thresher shark?)': 'Whiptail Shark',
+    '"a dog shark"': 'Dog Shark',
+    '9-foot shark': 'Large Shark',
+    "7 shark's teeth found embedded in the woodwork of the boat": 'unconfirmed',
+    "16' 800-lb shark": 'Large Shark',
+    "4.3 m [14'] shark seen in area previous week": 'Large Shark',
+    '100-lb shark': 'Large Shark',
+    "4.3 m [14'] shark seen in vicinity": 'Large Shark',
+    "0.9 m [3']  shark": 'Large Shark',
+    "18' shark": 'Large Shark',
+    "6 m [20']  shark": 'Large Shark',
+    "1.5 m, 45-kg shar": 'Large Shark',
+    "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark',
+    "1.8 m [6'] shark": 'Large Shark',
+    "6 m shark": 'Large Shark',
+    "2 m [6.75'] shark": 'Large Shark',
+    '40 to 50 sharks attacked survivors in the water': 'Large Shark',
+    '4.3 m shark': 'Large Shark',
+    "6', 100-lb shark": 'Large Shark',
+    '30-kg [66-lb] shark': 'Small Shark',
+    'Shark involvement not confirmed; officials considered barracua': 'not a shark',
+    '.5 m shark': 'Small Shark',
+    "4.5' shark": 'Small Shark',
+    "3 m to 4 m [10' to 13'] shark": 'Large Shark',
+    'Questionable incident; reported as shark attack but thought to involve a pinniped instead':'not a shark',
+    'Reported as a shark attack, the story was a hoax': 'not a shack',
+    "1.8 m [6'] shark, species identity questionable": 'Large Shark',
+    "13', 400-lb thresher shark": 'Large Shark',
+    'C. maculpinnis or C. limbatus': 'Maculpinnis Shark',
+    "4' to 8' shark": 'Small Shark',
+    '2.2 m shark': 'Large Shark',
+    '270 kg shark': 'Large Shark',
+    "1.5 to 2 m [5' to 6.75'] shark": 'Large Shark',
+    "2.7 m  [9'] shark": 'Large Shark',
+    "12' to 14' shark": 'Large Shark',
+    "3.7 m [12'] sharks": 'Large Shark',
+    "2 m to 2.5 m [6.75'  to 8.25'] shark": 'Large Shark',
+    '1.5 m to 2 m shark': 'Large Shark',
+    '"Dog shark"': 'Dog Shark',
+    "7.5' shark": 'Large Shark',
+    'Considered a "Doubtful" incident': 'Unconfirmed',
+    "4m [13'] shark": 'Large Shark',
+    "1.5 m to 1.8m [5' to 6'] shark": 'Small Shark',
+    "3.7 m [12'] shark": 'Large Shark',
+    "A pack of 6 sharks": 'Large Sharks',
+    "1.5 m to 2.1 m  [5' to 7'] shark": 'Large Shark',
+    "4.6 m [15'] shark": 'Large Shark',
+    "1.8 m [6'], 180-lb shar": 'Large Shark',
+    '2 sharks involved': 'Large Shark',
+    '300-kg [662-lb] shark': 'Large Shark',
+    "1.8 m [6'], 136-kg [300-lb] shark": 'Large Shark',
+    "1.8 to 2.4 m [6' to 8'] shark": 'Large Shark',
+    "Less than 1.2 m [4']": 'Small Shark',
+    "1.7 m [5.5'] shark": 'Small Shark',
+    "2.1 m to 2.4 m  [7' to 8'] shark": 'Large Shark',
+    "1.8 m [6']  shark": 'Large Shark',
+    "4.3 m [14'], 1000-lb shark": 'Large Shark',
+    "500-lb shark": 'Large Shark',
+    "5.5 m [18'] shark": 'Large Shark',
+    "8 sharks": 'Large Shark',
+    "1.8 m to 2.4 m  [6' to 8'] shark": 'Large Shark',
+    "3.7 to 4.5 m [12' to 15'] shark seen in vicinity": 'Large Shark',
+    "Said to be 6.4 m [21'] shark": 'Large Shark',
+    '2 sharks, 4.5 m & 3 m': 'Large Shark',
+    "1.8 m [6'], 180-lb shark": 'Large Shark',
+    "2.7 m [9'] shark": 'Large Shark',
+    "2.5 m [8.25'] shark": 'Large Shark',
+    "4.3 m [14'] shark": 'Large Shark',
+    "3.5 m shark": 'Large Shark',
+    "2.7 m to 3 m [9' to 10'] sharks": 'Large Shark',
+    "4.9 m [16']shark": 'Large Shark',
+    "1.2 m  [4'] shark": 'Large Shark',
+    "Next morning a 3 m [10'] shark was caught that had Andrews' leg in its gut": 'Large Shark',
+    "Two shark's teeth recovered from canoe": 'unconfirmed',
+    "1.5 m to 1.8 m  [5' to 6'] shark": 'Small Shark',
+    '43" shark': 'Small Shark',
+    "2.4 m [8'], 600-lb shark": 'Large Shark',
+    '80-lb hooked shark': 'Small Shark',
+    '200-lb shark': 'Large Shark',
+    "7' to 8' shark": 'Large Shark',
+    'Injury believed caused by an eel, not a shark': 'not a shark',
+    "3.5 m [11.5']shark": 'Large Shark',
+    "[4' to 5']": 'Large Shark',
+    "2 sharks, 4.5 m & 3 m": 'Large Shark',
+    "6 m [20'] shark": 'Large Shark',
+    "3.7 m to 4.6 m [12' to 15'] shark seen in the vicinity": 'Large Shark',
+    "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark',
+    "1.8 m [6'] shark": 'Large Shark',
+    "150-lb shark": 'Large Shark',
+    "1.6 m shark": 'Small Shark',
+    'Questionable incident; reported as shark attack but thought to involve a pinniped instead': 'unconfirmed',
+    "1.5 m [5']  shark": 'Small Shark',
+    "1.2 m to 1.8 m [4' to 6'] shark observed in area": 'Small Shark',
+    '90-kg "blackfin" shark': 'Blackfin Shark',
+    '60 cm  shark': 'Small Shark',
+    '36"  shark': 'Small Shark',
+    "2.7 m [9']shark":'Large Shark',
+    "1.2 m [4'], possibly  larger shark": 'Small Shark',
+    "Two 2.1 m [7'] sharks": 'Large Shark',
+    "3.7 m to 4.6 m [12' to 15'] shark": 'Large Shark',
+    "2.7 m [9']  shark": 'Large Shark',
+    "3.5 m [11.5'] shark": 'Large Shark',
+    "3 m to 4.3 m [10' to 14'] shark": 'Large Shark',
+    "5.5' shark": 'Small Shark',
+    "20 kg shark": 'Small Shark',
+    "1.8 to 2.1 m [6' to 7'] shark": 'Large Shark',
+    "Bitten by several 1.8 m [6'] sharks": 'Large Shark',
+    'Injury believed caused by an eel, not a shark': 'not a shark',
+    '2 sharks, 4.5 m & 3 m': 'Large Shark',
+    "1.2 m [4'], possibly  larger shark": 'Large Shark',
+    "Two 2.1 m [7'] sharks": 'Large Shark',
+    'Shark involvement prior to deaths was not confirmed': 'Small Shark',
+    "3.5 m [11.5'] shark": 'Large Shark',
+    "6 m [20'] shark": 'Large Shark',
+    "20 kg shark": 'Small Shark',
+    "1.8 to 2.1 m [6' to 7'] shark": 'Large Shark',
+    "Said to involve 2 sharks: 5.2 m & 6 m [17' & 20']": 'Large Shark',
+    "Sharks averaged 1.8 m [6'] in length": 'Large Shark',
+    '8-lb shark': 'Small Shark',
+    "2.4 m [8']  shark": 'Large Shark',
+    "4 m [13'] shark x 6": 'Large Shark',
+    "Reported as  a shark bite but toothmarks appear to be those of a dolphin": 'not a shark',
+    "0.7 m [2.5'] shark": 'Small Shark',
+    "2.13 m shark": 'Large Shark',
+    "Possibly C. leucas": "C. leucas Shark",
+    "1.5 m, 45-kg shark": 'Small Shark',
+    "2.3 m [7'] shark": 'Large Shark',
+    "3.7 [12'] shark": 'Large Shark',
+    "3 m [10'] shark seen in vicinity": 'Large Shark',
+    "1,100-lb shark": 'Large Shark',
+    '1.5 m, 45-kg shark': 'Small Shark',
+    '60 cm  shark': 'Small Shark',
+    "1.4 m [4.5'] shark": 'Small Shark',
+    '5m shark': 'Large Shark',
+    "2.6 m [8.5'] shark landed 2 hours later": 'Large Shark',
+    "2.6 m [8.5'] shark": 'Large Shark',
+    "4.4 m [14'] shark": 'Large Shark',
+    '68" shark': 'Small Shark',
+    'Description of shark does not ring true': 'unconfirmed',
+    "1.8 m [6'] shark": 'Large Shark'
+}
+
+# Values removed by clean_and_normalize_species
+SPECIES_TO_NA = {
+    ' ' : 'NA',
+    'no shark involvement' : 'NA',
+    'no shark invovlement' : 'NA',
+    'no shark invovlement - it ws a publicity stunt' : 'NA',
+    'Invalid' : 'NA',
+    'Invalid incident' : 'NA',
+    'Questionable' :'NA',
+    'Questionable incident' :'NA',
+    'No shark involvement' : 'NA',
+    '1NAm NA] shark' : 'NA',
+    'Shark involvement prior to death was not confirmed' : 'NA',
+    'Shark involvement not confirmed ' : 'NA',
+    'NA shark ' : 'NA',
+    '1NAm shark' : 'NA',
+    "4' shark" : 'NA',
+    "6' shark" : 'NA',
+    "4' toNA shark" : 'NA',
+    "2NAm NA] shark" : 'NA',
+    "3' shark" : 'NA',
+    "5' shark" : 'NA',
+    "3' toNA shark" : 'NA',
+    "2 m shark" : 'NA',
+    "3 m NA'] shark": 'NA',
+    "3 m shark": 'NA',
+    "1NAm toNA5 m NA toNA] shark": 'NA',
+    "3NAm NA'] shark": 'NA',
+    "7' shark": 'NA',
+    "8' shark": 'NA',
+    "5' toNA shark": 'NA',
+    "2NAm shark": 'NA',
+    "2' toNA shark": 'NA',
+    "a small shark": 'NA',
+    "Shark involvement prior to death not confirmed": 'NA',
+    "1 m shark": 'NA',
+    "Shark involvement not confirmed": 'NA',
+    "Shark involvement prior to death unconfirmed": 'NA',
+    'Shark involvement prior to death could not be determined': 'NA',
+    'Shark involvement suspected but not confirmed': 'NA',
+    "NA shark": 'NA',
+}
+
+# Species values that remove the row in clean_and_normalize_species
+SPECIES_REJECTED = ['NA', 'Unconfirmed', 'undefined', 'Not authenticated', 'uncorfirmed', 'unconfirmed', 'not a shark', 'not a shack', ' ']
+
+
+def build_keyword_automaton(keywords):
+    '''
+    Build an Aho-Corasick automaton for a list of keywords.
+
+    Returns (transitions, failures, first): transitions[state] maps a character to the next
+    state, failures[state] is the state of its longest proper suffix and first[state] is the
+    lowest index of a keyword ending at that state (len(keywords) when there is none).
+    '''
+    transitions = [{}]
+    first = [len(keywords)]
+
+    for index, keyword in enumerate(keywords):
+        state = 0
+        for char in keyword:
+            if char not in transitions[state]:
+                transitions.append({})
+                first.append(len(keywords))
+                transitions[state][char] = len(transitions) - 1
+            state = transitions[state][char]
+        first[state] = min(first[state], index)
+
+    # Breadth first so the failure state is always finished before its children
+    failures = [0] * len(transitions)
+    queue = [0]
+    for state in queue:
+        for char, child in transitions[state].items():
+            if state:
+                failure = failures[state]
+                while failure and char not in transitions[failure]:
+                    failure = failures[failure]
+                failures[child] = transitions[failure].get(char, 0)
+                first[child] = min(first[child], first[failures[child]])
+            queue.append(child)
+
+    return transitions, failures, first
+
+
+def find_first_keyword(text, automaton):
+    '''
+    Return the lowest index of the keywords contained in text (len(keywords) when none is).
+    '''
+    transitions, failures, first = automaton
+    state = 0
+    found = first[0]
+
+    for char in text:
+        while state and char not in transitions[state]:
+            state = failures[state]
+        state = transitions[state].get(char, 0)
+        found = min(found, first[state])
+
+    return found
+
+
+def build_species_normalizer(keywords, *mappings):
+    '''
+    Compile the species rules into a single function for one value.
+
+    keywords: dict keyword -> species, first keyword found in the lowercase value wins.
+    mappings: dicts of exact values applied one after the other, like Series.replace.
+    '''
+    automaton = build_keyword_automaton(list(keywords))
+    species = list(keywords.values())
+
+    def normalize(value):
+        if pd.isna(value):
+            return value
+        index = find_first_keyword(value.lower(), automaton)
+        if index < len(species):
+            value = species[index]
+        for mapping in mappings:
+            value = mapping.get(value, value)
+        return value
+
+    return normalize
+
+
+_normalize_species2 = build_species_normalizer(SPECIES2_KEYWORDS, SPECIES2_TO_NA)
+_normalize_species = build_species_normalizer(SPECIES_KEYWORDS, SPECIES_BY_DESCRIPTION, SPECIES_TO_NA)
+
+
+@instrument.step
+def normalize_species(values, normalizer=_normalize_species):
+    '''
+    Apply a species normalizer to each distinct value of a Series only once.
+    '''
+    return apply_on_uniques(values, normalizer)
+
+
+@instrument.step
 def clean_and_normalize_species2(df, column_name):
     """
     Limpia y normaliza la columna de especies en el DataFrame.
@@ -375,243 +1746,18 @@ def clean_and_normalize_species2(df, column_name):
     Returns:
     pd.DataFrame: El DataFrame con la columna limpiada y normalizada.
     """
-    def replace_species(value, replacements):
-        if pd.notna(value):  # Check if value is not NaN
-            value_lower = value.lower()
-            for key, replacement in replacements.items():
-                if key in value_lower:
-                    return replacement
-        return value
-
-    # Diccionario de términos y sus sustituciones
-    replacements = {
-        'white': 'White Shark',
-        'tiger': 'Tiger Shark',
-        'bull': 'Bull Shark',
-        'nurse': 'Nurse Shark',
-        'blacktip': 'Blacktip Shark',
-        'hammerhead': 'Hammerhead Shark',
-        'lemon': 'Lemon Shark',
-        'blue': 'Blue Shark',
-        'brown': 'Brown Shark',
-        'raggedtooth': 'Raggedtooth Shark',
-        'bronze': 'Bronze Shark',
-        'caribbean': 'Caribbean Reef Shark',
-        'mako': 'Mako Shark', 
-        'reportedly a great white': 'White Shark', 
-        'shall shark': 'Shall Shark', 
-        'sandbar': 'Sandbar Shark', 
-        'carribean': 'Carribean Reef Shark', 
-        'raggedtooth': 'Raggedtooth Shark', 
-        'broze': 'Bronze Shark', 
-        'sevengill': 'Sevengill Shark', 
-        'whitetip': 'White Shark', 
-        'nurse': 'Nurse Shark', 
-        'galapagos': 'Galapagos Shark', 
-        'cookiecutter': 'Cookiecutter Shark', 
-        'wfite': 'White Shark', 
-        'wobbegong': 'Wobbegong Shark', 
-        'horn': 'Horn Shark', 
-        'mako': 'Mako Shark', 
-        '"A small shark': 'Small Shark', 
-        'epaulette': 'Epaulette Shark', 
-        'spinner' : 'Spinner Shark', 
-        'galapagos': 'Galapagos Shark', 
-        'tope': 'Tope Shark', 
-        '"Reef shark"': 'Reef Shark', 
-        '"whitetip shark"': 'White Shark', 
-        'broadnose': 'Broadnise Shark', 
-        'reef': 'Reef Shark', 
-        'sandtiger': 'Tiger Shark', 
-        'spinner': 'Spinner Shark', 
-        'stingray': 'Stringray Shark', 
-        'toadfish': 'Toadfish Shark', 
-        '"reef shark"': 'Reef Shark',
-        'blue': 'Blue Shark', 
-        'salmon': 'Salmon Shark', 
-        'wobbegong': 'Wobbegong Shark', 
-        'porbeagle': 'Porbeagle Shark', 
-        'seven-gill' : 'Gill Shark', 
-        'dogfish': 'Dogfish Shark', 
-        'silky': 'Silky Shark', 
-        'hammerhead': 'Hammmerhead Shark', 
-        'raggedtooth': 'Raggedtooth Shark', 
-        'goblin': 'Goblin Shark', 
-        'angel': 'Angel Shark'
-        
-       
-        
-    }
-
-    # Aplicar la función de sustitución a la columna 'Species'
-    df[column_name] = df[column_name].apply(replace_species, replacements=replacements)
-
-    
-    mapping2 = {
-        '"small sharks"' : 'Small Shark', 
-        '"a small shark"' : 'Small Shark',
-        'Large shark': 'Large Shark',
-        '2.5m shark': 'Large Shark',
-        "3' to 4' shark": 'Small Shark', 
-        "8' shark": 'Large Shark', 
-        "4' shark": 'Small Shark',
-        "3' shark": 'Small Shark', 
-        '1m shark': 'Small Shark', 
-        '5m to 6m shark': 'Large Shark', 
-        "5'shark": 'Large Shark', 
-        '3m shark': 'Large Shark', 
-        "6' shark": 'Large Shark', 
-        "9' shark": 'Large Shark', 
-        "5' shark": 'Large Shark', 
-        "2' to 3' shark": 'Small Shark', 
-        "7' to 8' shark": 'Large Shark', 
-        '8 ft shark': 'Large Shark', 
-        '5.5 ft shark': 'Large Shark', 
-        '1.3m shark': 'Small Shark', 
-        "3' to 5' shark": 'Small Shark', 
-        '8" shark' : 'Large Shark', 
-        '4m shark': 'Large Shark', 
-        "4' to 5' shark": 'Small Shark', 
-        '2 m shark': 'Large Shark', 
-        "5' to 6' shark": 'Large Shark', 
-        "7' shark": 'Large Shark', 
-        "1+ m shark": 'Small Shark', 
-        "6' to 7' shark": 'Large Shark',
-        "2' shark": 'Small Shark', 
-        "6.5' shark": 'Large Shark', 
-        "10' to 12' shark": 'Large Shark', 
-        "shark pup": 'White Shark', 
-        "12' shark": 'Large Shark',
-        "2.5 m shark": 'Large Shark', 
-        "Reported as shark attacks but injuries caused by toadfish": 'not a shark', 
-        "Reported as shark bite but injury caused by stingray": 'not a shark', 
-        "5' to 8' shark": 'Large Shark', 
-        "3 m shark": 'Large Shark', 
-        "2m shark": 'Large Shark',
-        "small shark": 'Small Shark', 
-        "3m shark, probably a smooth hound": 'Large Shark', 
-        'Shark involvement highly doubtful' : 'Small Shark', 
-        'No shark invovlement - it ws a publicity stunt' : 'not a shark', 
-        'Shark involvement prior to death not confirmed': 'Small Shark', 
-        "10' shark": 'Large Shark', 
-        'a small shark': 'Small Shark', 
-        '3+ m shark': 'Large Shark', 
-        "4' shark?": 'Small Shark', 
-        '1m to 1.2 m shark': 'Small Shark', 
-        '3- to 4-foot shark': 'Small Shark', 
-        '3.5 to 4 m shark': 'Large Shark', 
-        '2 m to  3 m shark': 'Large Shark', 
-        '1.8 m shark': 'Large Shark', 
-        '5 m shark': 'Large Shark', 
-        '1.5 m shark': 'Small Shark', 
-        '1 m shark': 'Small Shark', 
-        "8' to 10' shark": 'Large Shark', 
-        "4' to 6' shark" : 'Small Shark', 
-        "4' tp 5' shark": 'Small Shark', 
-        '1.8 metre shark': 'Large Shark',
-        "6' to 8' shark": 'Large Shark', 
-        'shark involvement not confirmed': 'Small Shark', 
-        '"small sharks"': 'Small Shark', 
-        'no shark involvement' : 'not a shark', 
-        'no shark invovlement' : 'not a shark', 
-        'No shark involvement' : 'not a shark',
-        '1NAm NA] shark' : 'Large Shark',
-        "4' toNA shark" : 'Small Shark',
-        "4' shark" : 'Small Shark',
-        "6' shark" : 'Large Shark',
-        "4' toNA shark" : 'Small Shark',
-        "2NAm NA] shark" : 'Large Shark',
-        "3' shark" : 'Small Shark',
-        "5' shark" : 'Small Shark', 
-        "3' toNA shark" : 'Small Shark',
-        "2 m shark" : 'Large Shark',
-        "3 m NA'] shark": 'Large Shark',
-        "3 m shark": 'Large Shark', 
-        "1NAm toNA5 m NA toNA] shark": 'Large Shark',
-        "3NAm NA'] shark": 'Large Shark',
-        "7' shark": 'Large Shark', 
-        "8' shark": 'Large Shark',
-        "5' toNA shark": 'Large Shark',
-        "2NAm shark": 'Small Shark',
-        "2' toNA shark": 'Small Shark',
-        "a small shark": 'Small Shark',
-        "Shark involvement prior to death not confirmed": 'Shark Small',
-        "1 m shark": 'Shark Small',   
-        "Shark involvement not confirmed": 'Small Shark',
-        "Shark involvement prior to death unconfirmed": 'Small Shark',
-        "NA shark": 'Small Shark', 
-        "3.5' to 4' shark": 'Small Shark',
-        "14' to 18'shark": 'Large Shark', 
-        "15' shark": 'Large Shark', 
-        "2 to 2.5 m shark": 'Large Shark', 
-        "1' to 2' shark": 'Small Shark', 
-        '20 to 30kg shark': 'Small Shark', 
-        "14' shark": 'Large Shark', 
-        '2 m to 3 m shark': 'Large Shark', 
-        '80 kg shark': 'Large Shark', 
-        '2.6 m shark': 'Large Shark', 
-        "+3' shark" : 'Small Shark', 
-        "2' to 3' juvenile shark": 'Small Shark', 
-        "3'  shark": 'Small Shark', 
-        "2'  shark": 'Small Shark', 
-        "4.5 to 5' shark": 'Small Shark', 
-        "1.5' to 2' shark" : 'Small Shark', 
-        "2.5' shark": 'Small Shark', 
-        '"a small shark"': 'Small Shark', 
-        'Not a shark attack; it was a hoax': 'not a shack' 
-        
-        
-        
-    }
-    # Reemplazar valores no deseados con 'NA'
-    mapping = {
-        ' ' : 'NA',
-        'no shark involvement' : 'NA',
-        'no shark invovlement' : 'NA',
-        'no shark invovlement - it ws a publicity stunt' : 'NA',
-        'Invalid' : 'NA',
-        'Invalid incident' : 'NA',
-        'Questionable' :'NA',
-        'Questionable incident' :'NA',
-        'No shark involvement' : 'NA',
-        '1NAm NA] shark' : 'NA',
-        'Shark involvement prior to death was not confirmed' : 'NA',
-        'Shark involvement not confirmed ' : 'NA',
-        'NA shark ' : 'NA',
-        '1NAm shark' : 'NA',
-        "4' shark" : 'NA',
-        "6' shark" : 'NA',
-        "4' toNA shark" : 'NA',
-        "2NAm NA] shark" : 'NA',
-        "3' shark" : 'NA',
-        "5' shark" : 'NA', 
-        "3' toNA shark" : 'NA',
-        "2 m shark" : 'NA',
-        "3 m NA'] shark": 'NA',
-        "3 m shark": 'NA', 
-        "1NAm toNA5 m NA toNA] shark": 'NA',
-        "3NAm NA'] shark": 'NA',
-        "7' shark": 'NA', 
-        "8' shark": 'NA',
-        "5' toNA shark": 'NA',
-        "2NAm shark": 'NA',
-        "2' toNA shark": 'NA',
-        "a small shark": 'NA',
-        "Shark involvement prior to death not confirmed": 'NA',
-        "1 m shark": 'NA',   
-        "Shark involvement not confirmed": 'NA',
-        "Shark involvement prior to death unconfirmed": 'NA',
-        "NA shark": 'NA',
-    }
-
-    # Reemplazar valores no deseados en la columna 'Species'
-    df[column_name] = df[column_name].replace(mapping)
+    # Sustituir por palabras clave y reemplazar valores no deseados con 'NA'
+    df[column_name] = normalize_species(df[column_name], _normalize_species2)
 
     # Eliminar filas con 'NA' en la columna 'Species'
-    df = df[df[column_name] != 'NA']
+    df, rejected = filter_rows(df, {column_name: ['NA']})
+    # filter_rows gives the same frame back when no row is rejected: the report goes on a copy
+    df = df.copy(deep=False)
+    df.attrs['rejected_rows'] = rejected
     
     return df
 
+@instrument.step
 def clean_and_normalize_species(df, column_name):
     """
     Limpia y normaliza la columna de especies en el DataFrame.
@@ -623,644 +1769,16 @@ def clean_and_normalize_species(df, column_name):
     Returns:
     pd.DataFrame: El DataFrame con la columna limpiada y normalizada.
     """
-    def replace_species(value, replacements):
-        if pd.notna(value):  # Check if value is not NaN
-            value_lower = value.lower()
-            for key, replacement in replacements.items():
-                if key in value_lower:
-                    return replacement
-        return value
-
-    # Diccionario de términos y sus sustituciones
-    replacements = {
-        'white': 'White Shark',
-        'tiger': 'Tiger Shark',
-        'bull': 'Bull Shark',
-        'nurse': 'Nurse Shark',
-        'blacktip': 'Blacktip Shark',
-        'hammerhead': 'Hammerhead Shark',
-        'lemon': 'Lemon Shark',
-        'blue': 'Blue Shark',
-        'brown': 'Brown Shark',
-        'raggedtooth': 'Raggedtooth Shark',
-        'bronze': 'Bronze Shark',
-        'caribbean': 'Caribbean Reef Shark',
-        'mako': 'Mako Shark', 
-        'reportedly a great white': 'White Shark', 
-        'shall shark': 'Shall Shark', 
-        'sandbar': 'Sandbar Shark', 
-        'carribean': 'Carribean Reef Shark', 
-        'raggedtooth': 'Raggedtooth Shark', 
-        'broze': 'Bronze Shark', 
-        'sevengill': 'Sevengill Shark', 
-        'whitetip': 'White Shark', 
-        'nurse': 'Nurse Shark', 
-        'galapagos': 'Galapagos Shark', 
-        'cookiecutter': 'Cookiecutter Shark', 
-        'wfite': 'White Shark', 
-        'wobbegong': 'Wobbegong Shark', 
-        'horn': 'Horn Shark', 
-        'mako': 'Mako Shark', 
-        '"A small shark': 'Small Shark', 
-        'epaulette': 'Epaulette Shark', 
-        'spinner' : 'Spinner Shark', 
-        'galapagos': 'Galapagos Shark', 
-        'tope': 'Tope Shark', 
-        '"Reef shark"': 'Reef Shark', 
-        '"whitetip shark"': 'White Shark', 
-        'broadnose': 'Broadnise Shark', 
-        'reef': 'Reef Shark', 
-        'sandtiger': 'Tiger Shark', 
-        'spinner': 'Spinner Shark', 
-        'stingray': 'Stringray Shark', 
-        'toadfish': 'Toadfish Shark', 
-        '"reef shark"': 'Reef Shark',
-        'blue': 'Blue Shark', 
-        'salmon': 'Salmon Shark', 
-        'wobbegong': 'Wobbegong Shark', 
-        'porbeagle': 'Porbeagle Shark', 
-        'seven-gill' : 'Gill Shark', 
-        'dogfish': 'Dogfish Shark', 
-        'silky': 'Silky Shark', 
-        'hammerhead': 'Hammmerhead Shark', 
-        'raggedtooth': 'Raggedtooth Shark', 
-        'goblin': 'Goblin Shark', 
-        'angel': 'Angel Shark', 
-        'zambesi': 'Zambesi Shark',
-        'spurdog': 'Spurdog Shark', 
-        'smoothhound': 'Smoothhound Shark', 
-        'basking': 'Basking Shark', 
-        'sand': 'Sand Shark', 
-        'silvertip': 'Silvertip Shark', 
-        "on 8/13/2005 anglers from New Zealand":'Small Shark', 
-        'copper': 'Copper Shark',
-        'dusky': 'Dusky Shark',
-        "grey-colored shark": 'Grey Shark',
-        'cow': 'Cow Shark', 
-        'small': 'Small Shark', 
-        'juvenile': 'Small Shark', 
-        'authentificated': 'unconfirmed',
-        'whale': 'Whale Shark', 
-        'unknown': 'unconfirmed', 
-        '"red shark"': 'Red Shark', 
-        'zambesi': 'Zambezi Shark', 
-        'unconfirmed': 'unconfirmed', 
-        'carpet': 'Carpet Shark', 
-        '"spear-eye"': 'Spear-eye Shark', 
-        'whale': 'Whale Shark', 
-        'anglers from New Zealand': 'Large Shark', 
-        '"black finned shark"': 'Finned Shark', 
-        'soupfin': 'Soupfin Shark', 
-        'leopard': 'Leopard Shark', 
-        'grey': 'Grey Shark', 
-        'gaffed': 'Gaffed Shark', 
-        'shovelnose': 'Shovelnose Shark', 
-        '"ground shark"': 'Ground Shark', 
-        '>': 'Large Shark', 
-        'zambezi': 'Zambezi Shark', 
-        'albimarginatus': 'Albimarginatus Shark', 
-        '<': 'Small Shark', 
-        '500': 'Large Shark', 
-        '136': 'Large Shark', 
-        '193': 'Large Shark', 
-        '"yellow belly"': 'Large Shark', 
-        'rhizoprionodon': 'Gummy Shark',
-        '"banjo shark"': 'Banjo Shark', 
-        'not a shark': 'not a shark', 
-        'shark captured': 'Large Shark', 
-        'sharks': 'Large Shark', 
-        '"a very flat head”': 'Large Shark', 
-        '"gummy”': 'Gummy Shark', 
-        '2 m': 'Large Shark', 
-        'larger': 'Large Shark', 
-        'hull': 'Hull Shark', 
-        '4.5  m': 'Large Shark', 
-        'bite': 'not a shark', 
-        'cocktail': 'Cocktail Shark', 
-        'carcharhinid': 'Carcharhinid Shark',
-        'macrurus': 'C. Macrurus Shark', 
-        '“spear-eye”': 'Spear-Eye Shark', 
-        'bonita sharkk': 'Bonita Shark', 
-        'anglers': 'Anglers Shark', 
-        'tooth fragments': 'Large Shark', 
-        'to involve a pinniped instead': 'not a shark', 
-        'on turtle scraps': 'Small Shark', 
-        'another shark nearby': 'Large Shark', 
-        'dolphin': 'not a shark', 
-        'shark known as': 'Old Tom Shark', 
-        '13': 'Large Shark', 
-        "7' to 8'": 'Large Shark', 
-        'invovlement': 'not a shark', 
-        'not confirmes': 'Small Shark', 
-        "3.3 m [10'": 'Large Shark', 
-        '60 cm': 'Small Shark', 
-        "1.3 m [4'": 'Small Shark',
-         "1.8 m [6']": 'Large Shark'
-       }
-
-    # Aplicar la función de sustitución a la columna 'Species'
-    df[column_name] = df[column_name].apply(replace_species, replacements=replacements)
-
-    
-    mapping2 = {
-        '"small sharks"' : 'Small Shark', 
-        '"a small shark"' : 'Small Shark',
-        'Large shark': 'Large Shark',
-        '2.5m shark': 'Large Shark',
-        "3' to 4' shark": 'Small Shark', 
-        "8' shark": 'Large Shark', 
-        "4' shark": 'Small Shark',
-        "3' shark": 'Small Shark', 
-        '1m shark': 'Small Shark', 
-        '5m to 6m shark': 'Large Shark', 
-        "5'shark": 'Large Shark', 
-        '3m shark': 'Large Shark', 
-        "6' shark": 'Large Shark', 
-        "9' shark": 'Large Shark', 
-        "5' shark": 'Large Shark', 
-        "2' to 3' shark": 'Small Shark', 
-        "7' to 8' shark": 'Large Shark', 
-        '8 ft shark': 'Large Shark', 
-        '5.5 ft shark': 'Large Shark', 
-        '1.3m shark': 'Small Shark', 
-        "3' to 5' shark": 'Small Shark', 
-        '8" shark' : 'Large Shark', 
-        '4m shark': 'Large Shark', 
-        "4' to 5' shark": 'Small Shark', 
-        '2 m shark': 'Large Shark', 
-        "5' to 6' shark": 'Large Shark', 
-        "7' shark": 'Large Shark', 
-        "1+ m shark": 'Small Shark', 
-        "6' to 7' shark": 'Large Shark',
-        "2' shark": 'Small Shark', 
-        "6.5' shark": 'Large Shark', 
-        "10' to 12' shark": 'Large Shark', 
-        "shark pup": 'White Shark', 
-        "12' shark": 'Large Shark',
-        "2.5 m shark": 'Large Shark', 
-        "Reported as shark attacks but injuries caused by toadfish": 'not a shark', 
-        "Reported as shark bite but injury caused by stingray": 'not a shark', 
-        "5' to 8' shark": 'Large Shark', 
-        "3 m shark": 'Large Shark', 
-        "2m shark": 'Large Shark',
-        "small shark": 'Small Shark', 
-        "3m shark, probably a smooth hound": 'Large Shark', 
-        'Shark involvement highly doubtful' : 'Small Shark', 
-        'No shark invovlement - it ws a publicity stunt' : 'not a shark', 
-        'Shark involvement prior to death not confirmed': 'Small Shark', 
-        "10' shark": 'Large Shark', 
-        'a small shark': 'Small Shark', 
-        '3+ m shark': 'Large Shark', 
-        "4' shark?": 'Small Shark', 
-        '1m to 1.2 m shark': 'Small Shark', 
-        '3- to 4-foot shark': 'Small Shark', 
-        '3.5 to 4 m shark': 'Large Shark', 
-        '2 m to  3 m shark': 'Large Shark', 
-        '1.8 m shark': 'Large Shark', 
-        '5 m shark': 'Large Shark', 
-        '1.5 m shark': 'Small Shark', 
-        '1 m shark': 'Small Shark', 
-        "8' to 10' shark": 'Large Shark', 
-        "4' to 6' shark" : 'Small Shark', 
-        "4' tp 5' shark": 'Small Shark', 
-        '1.8 metre shark': 'Large Shark',
-        "6' to 8' shark": 'Large Shark', 
-        'shark involvement not confirmed': 'Small Shark', 
-        '"small sharks"': 'Small Shark', 
-        'no shark involvement' : 'not a shark', 
-        'no shark invovlement' : 'not a shark', 
-        'No shark involvement' : 'not a shark',
-        '1NAm NA] shark' : 'Large Shark',
-        "4' toNA shark" : 'Small Shark',
-        "4' shark" : 'Small Shark',
-        "6' shark" : 'Large Shark',
-        "4' toNA shark" : 'Small Shark',
-        "2NAm NA] shark" : 'Large Shark',
-        "3' shark" : 'Small Shark',
-        "5' shark" : 'Small Shark', 
-        "3' toNA shark" : 'Small Shark',
-        "2 m shark" : 'Large Shark',
-        "3 m NA'] shark": 'Large Shark',
-        "3 m shark": 'Large Shark', 
-        "1NAm toNA5 m NA toNA] shark": 'Large Shark',
-        "3NAm NA'] shark": 'Large Shark',
-        "7' shark": 'Large Shark', 
-        "8' shark": 'Large Shark',
-        "5' toNA shark": 'Large Shark',
-        "2NAm shark": 'Small Shark',
-        "2' toNA shark": 'Small Shark',
-        "a small shark": 'Small Shark',
-        "Shark involvement prior to death not confirmed": 'Shark Small',
-        "1 m shark": 'Shark Small',   
-        "Shark involvement not confirmed": 'Small Shark',
-        "Shark involvement prior to death unconfirmed": 'Small Shark',
-        "NA shark": 'Small Shark', 
-        "3.5' to 4' shark": 'Small Shark',
-        "14' to 18'shark": 'Large Shark', 
-        "15' shark": 'Large Shark', 
-        "2 to 2.5 m shark": 'Large Shark', 
-        "1' to 2' shark": 'Small Shark', 
-        '20 to 30kg shark': 'Small Shark', 
-        "14' shark": 'Large Shark', 
-        '2 m to 3 m shark': 'Large Shark', 
-        '80 kg shark': 'Large Shark', 
-        '2.6 m shark': 'Large Shark', 
-        "+3' shark" : 'Small Shark', 
-        "2' to 3' juvenile shark": 'Small Shark', 
-        "3'  shark": 'Small Shark', 
-        "2'  shark": 'Small Shark', 
-        "4.5 to 5' shark": 'Small Shark', 
-        "1.5' to 2' shark" : 'Small Shark', 
-        "2.5' shark": 'Small Shark', 
-        '"a small shark"': 'Small Shark', 
-        'Not a shark attack; it was a hoax': 'not a shark', 
-        '"A small shark"': 'Small Shark', 
-        'Authorities report injury caused bya barracuda': 'not a shark', 
-        'No shark invovlement': 'not a shark', 
-        'A small shark': 'Small Shark', 
-        "7' to 8' shark": 'Large Shark', 
-        'Injuries not caused by a shark': 'not a shark', 
-        'Shark involvement unconfirmed but considered probable': 'Small Shark', 
-        'Shovelnose "shark" which is a ray, not a shark)': 'not a shark', 
-        'Juvenile shark': 'Small Shark', 
-        'Injury most likely caused by barracuda, not a shark':'not a shark', 
-        'Shark involvement questionable': 'Small Shark', 
-        " 6' to 8' shark": 'Large Shark', 
-        "Said to involve an 8' shark but more likely damage caused by debris": 'not a shark', 
-        'juvenile shark': 'Small Shark', 
-        "Thought to involve a 3' to 4' shark, but shark involvement not confirmed": 'Small Shark', 
-        'Shark involvement not cofirmed' : 'unconfirmed', 
-        'Shark involvement not confirmed & highly unlikely': 'not a shark', 
-        '7-gill shark?': 'Large Shark', 
-        '7-gill shark': 'Large Shark', 
-        '4.5 m shark': 'Large Shark', 
-        '18" to 24" shark': 'Large Shark', 
-        'Port Jackson shark, 1m': 'Small Shark', 
-        '4 m shark': 'Large Shark', 
-        '3 m to 4 m shark': 'Large Shark', 
-        'Shark involvement probable, but not confirmed': 'Small Shark',
-        'Reported by media as shark attack, but shark involvement prior to death was not confirmed': 'unconfirmed', 
-        'Shark involvement not confirmed; thought to be a barracuda bite': 'not a shark', 
-        '2.27 m shark': 'Large Shark', 
-        '1.5 to 2 m shark': 'Small Shark', 
-        "9.5' shark?": 'Large Shark', 
-        "3' small spotted catshark, Scyliorhinus canicula": 'Small Shark', 
-        'Questionable Incident': 'unconfirmed', 
-        '2.4 m shark': 'Large Shark', 
-        '24" to 30" shark': 'Large Shark', 
-        '2.5 to 3 m shark': 'Large Shark', 
-        '2 to 3 m shark': 'Large Shark', 
-        "1' to 4' shark": 'Small Shark', 
-         'small catsharks': 'Small Shark', 
-         '3 m, 600-kg shark': 'Large Shark', 
-         'Said to involve a 1.5 m shark': 'Small Shark', 
-         "2 m [6.75'] shark, 200-kg shark T": 'Large Shark', 
-         "[4.5' to 5'] shark": 'Small Shark', 
-         "Unknown, but it was reported that a shark tooth was recovered from the wound": 'unconfirmed', 
-         '"small shark"': 'Small Shark', 
-         '18" to 36" shark': 'Large Shark', 
-         "4 m [13'] shark": 'Large Shark', 
-         "3 m [10'] shark": 'Large Shark', 
-         "2.4 m [8'] shark": 'Large Shark', 
-         "1.2 m [4'] shark": 'Small Shark', 
-         "1.8 m [6'] shark": 'Small Shark', 
-         "1.2 m to 1.5 m [4' to 5'] shark": 'Small Shark', 
-         '2 sharks, 4.5 m & 3 m': 'Large Shark', 
-         '"black tipped" shark': 'Tipped Shark', 
-         "0.9 m to 1.5 m [3' to 5'] shark": 'Small Shark', 
-         "2.4 m to 3.7 m [8' to 12'] shark": 'Large Shark', 
-         'small sharks': 'Small Shark', 
-         'Shark involvement doubtful': 'undefined', 
-         'Unidentified species' : 'undefined', 
-         "1.5 m to 1.8 m [5' to 6'] shark" : 'Small Shark', 
-         "106 cm [3.5']  shark": 'Small Shark',
-         "3.7 m to 4.3 m [12' to 14'] shark": 'Large Shark', 
-         "0.9 m to 1.2 m [3' to 4'] shark": 'Small Shark', 
-         'A “small” shark': 'Small Shark', 
-         "60 cm [2'] captive shark": 'Small Shark', 
-         'Species unidentified': 'unconfirmed', 
-         "3.5' to 4.5' shark": 'Large Shark', 
-         '"A pack of sharks"': 'Large Shark', 
-         'Unknown, but the shark was caught and put on exhibition': 'unconfirmed', 
-         '"a large shark"': 'Large Shark', 
-        "Questionable incident, said to involve a 6' shark" : 'Large Shark', 
-        '3 sharks': 'Large Shark', 
-        'Not specified': 'undefined', 
-        '6 ft shark': 'Large Shark', 
-         '6ft shark': 'Large Shark', 
-         'Bu.ll': 'undefined', 
-         "7' to 8' shark": 'Large Shark', 
-         ' ': 'not a shark', 
-         "3' to 3.5' shark": 'Small Shark', 
-         "5' to 7' shark": 'Large Shark', 
-         '2 sharks, 4.5 m & 3 m': 'Large Shark', 
-         '15 cm to 20 cm [6" to 8"] bite diameter just below left knee': 'Small Shark', 
-         "2.4 m to 3 m [8' to 10'] grey colored shark": 'Large Shark', 
-         "3 m to 3.7 m [10' to 12'] shark": 'Large Shark', 
-         "0.9 m  to 1.2 m [3' to 4'] shark": 'Small Shark', 
-         "0.9 m to 1.2 m [3' to 4'] shark; Tooth fragment recovered from hand": 'Small Shark', 
-         '1 m  shark': 'Small Shark', 
-         "2.1 m to 2.4 m [7' to 8'] shark": 'Large Shark', 
-         "0.9 m [3'] shark": 'Small Shark', 
-         'Shark involvement prior to death unconfired': 'Small Shark', 
-         'C. leucas tooth fragment recovered from kayak': 'uncorfirmed', 
-         'Questionable incident - shark bite may have precipitated drowning': 'unconfirmed', 
-         'Unidentified': 'unconfirmed', 
-         "2' to 3.5' shark": 'Small Shark', 
-         "1.5 m [5'] shark": 'Small Shark', 
-         "0.9 m  [3'] shark": 'Small Shark', 
-         "1.2 m to 1.5 m [4.5' to 5'] shark": 'Small Shark', 
-         "1.2 m to 1.8 m [4' to 6'] shark": 'Small Shark', 
-         "2.1 to 2.4 m [7' to 8'] shark": 'Large Shark', 
-         "60 cm to 90 cm [2' to 3'] shark": 'Small Shark', 
-         "A 2' shark was seen in the area by witnesses": 'Small Shark', 
-         'Shark involvement  not confirmed': 'unconfirmed', 
-         'Shark involvement  questionable': 'unconfirmed', 
-         '1.3 to 1.6 m shark': 'Small Shark', 
-         '200 to 300 kg shark': 'Large Shark', 
-         "4.5' to 5' shark": 'Small Shark', 
-         '1.7 m shark': 'Small Shark', 
-         'Shark involvement prior to death suspected but not confirmed': 'unconfirmed', 
-         "1.8 m to 2.1 m [6' to 7'] shark": 'Large Shark', 
-         '"a young shark"': 'Small Shark',
-         "1.2 m to 1.5 m [4' to 5']   shark": 'Small Shark', 
-         "1.5 to 1.8 m [5' to 6'] shark": 'Small Shark', 
-         "Two 1.2 m to 1.5 m [4' to 5'] sharks":'Small Shark', 
-         "2.1 m [7'] shark": 'Large Shark', 
-         ">1.8 m [6'] shark": 'Large Shark', 
-         "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark', 
-         'Unidentified shark': 'unconfirmed', 
-         '>2 m shark': 'Large Shark', 
-         "5 m [16.5'] shark": 'Large Shark', 
-         '1.8 m grey shark': 'Grey Shark', 
-         "3 m [10'], 270- kg [595-lb] shark": 'Large Shark', 
-         "7' female shark": 'Large Shark', 
-         '"Shark had a very large girth"': 'Large Shark', 
-         "1.8 m [6'] shark": 'Large Shark', 
-         "1.8 m to 2.4 m [6' to 8'] shark": 'Large Shark', 
-         '6 m, 600-kg shark':'Large Shark', 
-         "Two sharks seen in vicinity: 2.4 m & 4.25 m  [8' & 14'] TL":'Large Shark', 
-        '2 m to 2.5 m shark': 'Large Shark', 
-        "1.5 m to 2 m [5' to 6.75'] shark": 'Large Shark', 
-        '1 m "grey-colored" shark': 'Small Shark', 
-        '"gray shark"': 'Grey Shark', 
-        'a school of sharks': 'Large Shark', 
-        '"Shark caught later"': 'Large Shark', 
-        'Remains recovered from shark caught days later': 'unconfirmed', 
-        '234-lb shark': 'Large Shark', 
-        "Said to be a 7.6 m [25'] shark": 'Large Shark', 
-        '"The fish was harpooned, dried, and presented to the sailor, who went round Europe exhibiting it  It was said to be 20 feet long.': 'Large Shark', 
-        '70 kg shark': 'Small Shark', 
-        '5m, 3500 kg female shark': 'Large Shark', 
-        '"a school of sharks"': 'Large Shark', 
-        '250-lb "dog shark"': 'Dog Shark', 
-        '650-lb shark': 'Large Shark', 
-        '2 days later a 600-lb shark was caught 100 yards from the site': 'Large Shark',
-        "7' to 8' shark": 'Large Shark', 
-        "3' to 3.5' shark": 'Small Shark', 
-        "5' to 7' shark": 'Small Shark', 
-        "12' to 18' shark" : 'Large Shark', 
-        '2 sharks, 4.5 m & 3 m': 'Large Shark', 
-        '15 cm to 20 cm [6" to 8"] bite diameter just below left knee': 'Small Shark', 
-        "2.4 m to 3 m [8' to 10'] grey colored shark": 'Grey Shark', 
-        "3 m to 3.7 m [10' to 12'] shark": 'Large Shark', 
-        "0.9 m  to 1.2 m [3' to 4'] shark": 'Small Shark', 
-        "0.9 m to 1.2 m [3' to 4'] shark; Tooth fragment recovered from hand": "Small Shark",
-         "2 sharks": 'Large Shark', 
-         'Identified as C. gangeticus by Dr. J. Fayrer': 'unconfirmed', 
-         'Said to involve 2 sharks': 'Large Shark', 
-         "Said to involve 2 sharks": 'Large Shark', 
-         "4.7 m [15.5'] shark": 'Large Shark', 
-         "16' shark": 'Large Shark', 
-         "20' shark": 'Large Shark', 
-         "1.8 m to 2.7 m [6' to 9'] shark": 'Large Shark', 
-         "Fishermen recovered partial remains from shark a week later": 'unconfirmed', 
-         'Remains recovered 5 days later': 'unconfirmed', 
-         'Shark involvement probable': 'unconfirmed', 
-         'Allegedly a 33-foot shark': 'Large Shark', 
-         'Remains recovered from 3 sharks': 'Large Shark', 
-         '18-foot shark': 'Large Shark', 
-         "5.5' to 6' shark": 'Large Shark', 
-         "Said to involve a 2.7 m [9'] shark": 'Large Shark', 
-         "13' shark": 'Large Shark', 
-         "3.7 m to 4.3 m [12' to 14']  shark": 'Large Shark', 
-         "3.7 m [12'], 1200-lb shark. Shark caught & its jaw exhibited at the Carnegie Museum": 'Large Shark', 
-         "15'": 'Large Shark', 
-         '15* to 24" dog shark': 'Dog Shark', 
-         "Comrades saw shark's tail appear about 5' away": 'Large Shark', 
-         '"A pack of 6 sharks"': 'Large Shark', 
-         "2.7 m [9'] shark later captured by Mitchell-Hedges": 'Large Shark', 
-         '"a very large shark"': 'Large Shark', 
-         "According to Carlsmith, the shark's mouth was 3' wide": 'Large Shark', 
-         'Questionable, 2m shark suspected': 'Large Shark', 
-         '"whiptail shark" (thresher shark?)': 'Whiptail Shark', 
-         '"a dog shark"': 'Dog Shark', 
-         '9-foot shark': 'Large Shark', 
-         "7 shark's teeth found embedded in the woodwork of the boat": 'unconfirmed',
-         "16' 800-lb shark": 'Large Shark', 
-         "4.3 m [14'] shark seen in area previous week": 'Large Shark', 
-         '100-lb shark': 'Large Shark', 
-         "4.3 m [14'] shark seen in vicinity": 'Large Shark', 
-         "0.9 m [3']  shark": 'Large Shark', 
-         "18' shark": 'Large Shark', 
-         "6 m [20']  shark": 'Large Shark', 
-         "1.5 m, 45-kg shar": 'Large Shark', 
-         "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark', 
-         "1.8 m [6'] shark": 'Large Shark', 
-         "6 m shark": 'Large Shark', 
-         "2 m [6.75'] shark": 'Large Shark', 
-         '40 to 50 sharks attacked survivors in the water': 'Large Shark', 
-         '4.3 m shark': 'Large Shark', 
-         "6', 100-lb shark": 'Large Shark', 
-         '30-kg [66-lb] shark': 'Small Shark', 
-         'Shark involvement not confirmed; officials considered barracua': 'not a shark', 
-         '.5 m shark': 'Small Shark', 
-         "4.5' shark": 'Small Shark', 
-         "3 m to 4 m [10' to 13'] shark": 'Large Shark', 
-         'Questionable incident; reported as shark attack but thought to involve a pinniped instead':'not a shark', 
-         'Reported as a shark attack, the story was a hoax': 'not a shack', 
-         "1.8 m [6'] shark, species identity questionable": 'Large Shark', 
-         "13', 400-lb thresher shark": 'Large Shark', 
-         'C. maculpinnis or C. limbatus': 'Maculpinnis Shark',
-         "4' to 8' shark": 'Small Shark', 
-         '2.2 m shark': 'Large Shark', 
-         '270 kg shark': 'Large Shark', 
-         "1.5 to 2 m [5' to 6.75'] shark": 'Large Shark', 
-         "2.7 m  [9'] shark": 'Large Shark', 
-         "12' to 14' shark": 'Large Shark', 
-         "3.7 m [12'] sharks": 'Large Shark', 
-         "2 m to 2.5 m [6.75'  to 8.25'] shark": 'Large Shark', 
-         '1.5 m to 2 m shark': 'Large Shark', 
-         '"Dog shark"': 'Dog Shark', 
-         "7.5' shark": 'Large Shark', 
-         'Considered a "Doubtful" incident': 'Unconfirmed', 
-         "4m [13'] shark": 'Large Shark', 
-         "1.5 m to 1.8m [5' to 6'] shark": 'Small Shark', 
-         "3.7 m [12'] shark": 'Large Shark', 
-         "A pack of 6 sharks": 'Large Sharks', 
-         "1.5 m to 2.1 m  [5' to 7'] shark": 'Large Shark', 
-         "4.6 m [15'] shark": 'Large Shark', 
-         "1.8 m [6'], 180-lb shar": 'Large Shark', 
-         '2 sharks involved': 'Large Shark', 
-         '300-kg [662-lb] shark': 'Large Shark', 
-         "1.8 m [6'], 136-kg [300-lb] shark": 'Large Shark', 
-         "1.8 to 2.4 m [6' to 8'] shark": 'Large Shark', 
-         "Less than 1.2 m [4']": 'Small Shark', 
-         "1.7 m [5.5'] shark": 'Small Shark', 
-         "2.1 m to 2.4 m  [7' to 8'] shark": 'Large Shark', 
-         "1.8 m [6']  shark": 'Large Shark', 
-         "4.3 m [14'], 1000-lb shark": 'Large Shark', 
-         "500-lb shark": 'Large Shark', 
-         "5.5 m [18'] shark": 'Large Shark', 
-         "8 sharks": 'Large Shark', 
-         "1.8 m to 2.4 m  [6' to 8'] shark": 'Large Shark', 
-         "3.7 to 4.5 m [12' to 15'] shark seen in vicinity": 'Large Shark', 
-         "Said to be 6.4 m [21'] shark": 'Large Shark', 
-         '2 sharks, 4.5 m & 3 m': 'Large Shark', 
-         "1.8 m [6'], 180-lb shark": 'Large Shark', 
-         "2.7 m [9'] shark": 'Large Shark', 
-         "2.5 m [8.25'] shark": 'Large Shark', 
-         "4.3 m [14'] shark": 'Large Shark', 
-         "3.5 m shark": 'Large Shark', 
-         "2.7 m to 3 m [9' to 10'] sharks": 'Large Shark', 
-         "4.9 m [16']shark": 'Large Shark', 
-         "1.2 m  [4'] shark": 'Large Shark', 
-         "Next morning a 3 m [10'] shark was caught that had Andrews' leg in its gut": 'Large Shark', 
-         "Two shark's teeth recovered from canoe": 'unconfirmed', 
-         "1.5 m to 1.8 m  [5' to 6'] shark": 'Small Shark', 
-         '43" shark': 'Small Shark', 
-         "2.4 m [8'], 600-lb shark": 'Large Shark', 
-         '80-lb hooked shark': 'Small Shark', 
-         '200-lb shark': 'Large Shark', 
-         "7' to 8' shark": 'Large Shark', 
-         'Injury believed caused by an eel, not a shark': 'not a shark',
-         "3.5 m [11.5']shark": 'Large Shark', 
-         "[4' to 5']": 'Large Shark', 
-         "2 sharks, 4.5 m & 3 m": 'Large Shark', 
-         "6 m [20'] shark": 'Large Shark', 
-         "3.7 m to 4.6 m [12' to 15'] shark seen in the vicinity": 'Large Shark', 
-         "1.8 m to 2.4 m [6' to 8'] shark, tooth fragments recovered": 'Large Shark', 
-         "1.8 m [6'] shark": 'Large Shark', 
-         "150-lb shark": 'Large Shark', 
-         "1.6 m shark": 'Small Shark', 
-         'Questionable incident; reported as shark attack but thought to involve a pinniped instead': 'unconfirmed', 
-         "1.5 m [5']  shark": 'Small Shark', 
-         "1.2 m to 1.8 m [4' to 6'] shark observed in area": 'Small Shark', 
-         '90-kg "blackfin" shark': 'Blackfin Shark', 
-         '60 cm  shark': 'Small Shark', 
-         '36"  shark': 'Small Shark', 
-         "2.7 m [9']shark":'Large Shark', 
-         "1.2 m [4'], possibly  larger shark": 'Small Shark', 
-         "Two 2.1 m [7'] sharks": 'Large Shark',
-         "3.7 m to 4.6 m [12' to 15'] shark": 'Large Shark', 
-         "2.7 m [9']  shark": 'Large Shark', 
-         "3.5 m [11.5'] shark": 'Large Shark', 
-         "3 m to 4.3 m [10' to 14'] shark": 'Large Shark', 
-         "5.5' shark": 'Small Shark', 
-         "20 kg shark": 'Small Shark', 
-         "1.8 to 2.1 m [6' to 7'] shark": 'Large Shark', 
-         "Bitten by several 1.8 m [6'] sharks": 'Large Shark', 
-         'Injury believed caused by an eel, not a shark': 'not a shark', 
-         '2 sharks, 4.5 m & 3 m': 'Large Shark', 
-         "1.2 m [4'], possibly  larger shark": 'Large Shark', 
-         "Two 2.1 m [7'] sharks": 'Large Shark', 
-         'Shark involvement prior to deaths was not confirmed': 'Small Shark', 
-         "3.5 m [11.5'] shark": 'Large Shark', 
-         "6 m [20'] shark": 'Large Shark', 
-         "20 kg shark": 'Small Shark', 
-         "1.8 to 2.1 m [6' to 7'] shark": 'Large Shark', 
-         "Said to involve 2 sharks: 5.2 m & 6 m [17' & 20']": 'Large Shark', 
-         "Sharks averaged 1.8 m [6'] in length": 'Large Shark', 
-         '8-lb shark': 'Small Shark', 
-         "2.4 m [8']  shark": 'Large Shark', 
-         "4 m [13'] shark x 6": 'Large Shark', 
-         "Reported as  a shark bite but toothmarks appear to be those of a dolphin": 'not a shark', 
-         "0.7 m [2.5'] shark": 'Small Shark', 
-         "2.13 m shark": 'Large Shark', 
-         "Possibly C. leucas": "C. leucas Shark", 
-         "1.5 m, 45-kg shark": 'Small Shark', 
-         "2.3 m [7'] shark": 'Large Shark', 
-         "3.7 [12'] shark": 'Large Shark', 
-         "3 m [10'] shark seen in vicinity": 'Large Shark', 
-         "1,100-lb shark": 'Large Shark', 
-         '1.5 m, 45-kg shark': 'Small Shark', 
-         '60 cm  shark': 'Small Shark', 
-         "1.4 m [4.5'] shark": 'Small Shark', 
-         '5m shark': 'Large Shark', 
-         "2.6 m [8.5'] shark landed 2 hours later": 'Large Shark', 
-         "2.6 m [8.5'] shark": 'Large Shark', 
-         "4.4 m [14'] shark": 'Large Shark', 
-         '68" shark': 'Small Shark', 
-         'Description of shark does not ring true': 'unconfirmed', 
-         "1.8 m [6'] shark": 'Large Shark'
-         
-         
-         
-         
-        
-        
-    }
-    
-    df[column_name] = df[column_name].replace(mapping2)
-    # Reemplazar valores no deseados con 'NA'
-    mapping = {
-        ' ' : 'NA',
-        'no shark involvement' : 'NA',
-        'no shark invovlement' : 'NA',
-        'no shark invovlement - it ws a publicity stunt' : 'NA',
-        'Invalid' : 'NA',
-        'Invalid incident' : 'NA',
-        'Questionable' :'NA',
-        'Questionable incident' :'NA',
-        'No shark involvement' : 'NA',
-        '1NAm NA] shark' : 'NA',
-        'Shark involvement prior to death was not confirmed' : 'NA',
-        'Shark involvement not confirmed ' : 'NA',
-        'NA shark ' : 'NA',
-        '1NAm shark' : 'NA',
-        "4' shark" : 'NA',
-        "6' shark" : 'NA',
-        "4' toNA shark" : 'NA',
-        "2NAm NA] shark" : 'NA',
-        "3' shark" : 'NA',
-        "5' shark" : 'NA', 
-        "3' toNA shark" : 'NA',
-        "2 m shark" : 'NA',
-        "3 m NA'] shark": 'NA',
-        "3 m shark": 'NA', 
-        "1NAm toNA5 m NA toNA] shark": 'NA',
-        "3NAm NA'] shark": 'NA',
-        "7' shark": 'NA', 
-        "8' shark": 'NA',
-        "5' toNA shark": 'NA',
-        "2NAm shark": 'NA',
-        "2' toNA shark": 'NA',
-        "a small shark": 'NA',
-        "Shark involvement prior to death not confirmed": 'NA',
-        "1 m shark": 'NA',   
-        "Shark involvement not confirmed": 'NA',
-        "Shark involvement prior to death unconfirmed": 'NA',
-        'Shark involvement prior to death could not be determined': 'NA',
-        'Shark involvement suspected but not confirmed': 'NA', 
-        "NA shark": 'NA',
-    }
+    # Sustituir por palabras clave, por descripción y reemplazar valores no deseados con 'NA'
+    df[column_name] = normalize_species(df[column_name])
 
-    # Reemplazar valores no deseados en la columna 'Species'
-    df[column_name] = df[column_name].replace(mapping)
-
-    # Eliminar filas con 'NA' en la columna 'Species'
-    df = df[df[column_name] != 'NA']
-    df = df[df[column_name] != 'Unconfirmed']
-    df = df[df[column_name] != 'undefined']
-    df = df[df[column_name] != 'Not authenticated']
-    df = df[df[column_name] != 'uncorfirmed']
-    df = df[df[column_name] != 'unconfirmed']
-    df = df[df[column_name] != 'not a shark']
-    df = df[df[column_name] != 'not a shack']
-    df = df[df[column_name] != ' ']
-    df = df.dropna(subset=[column_name])
+    # Eliminar filas con 'NA', sin confirmar o vacías en la columna 'Species' (una sola máscara)
+    df, rejected = filter_rows(df, {column_name: SPECIES_REJECTED}, dropna=[column_name])
+    df = df.copy(deep=False)
+    df.attrs['rejected_rows'] = rejected
     return df
 
+@instrument.step
 def add_oceans_column(df, country_column, new_column):
     """
     Añade una columna de océanos y mares al DataFrame basada en el país.
@@ -1273,134 +1791,129 @@ def add_oceans_column(df, country_column, new_column):
     Returns:
     pd.DataFrame: El DataFrame con la nueva columna añadida.
     """
-    countries_oceans = {
-        'morocco': 'Atlantic Ocean',
-        'jamaica': 'Caribbean Sea',
-        'belize': 'Caribbean Sea',
-        'australia': 'Indian Ocean and Pacific Ocean',
-        'usa': 'Atlantic Ocean and Pacific Ocean',
-        'maldive islands': 'Indian Ocean',
-        'turks and caicos': 'Atlantic Ocean',
-        'french polynesia': 'Pacific Ocean',
-        'tobago': 'Caribbean Sea',
-        'bahamas': 'Atlantic Ocean',
-        'india': 'Indian Ocean',
-        'trinidad': 'Caribbean Sea',
-        'south africa': 'Atlantic Ocean and Indian Ocean',
-        'mexico': 'Pacific Ocean and Gulf of Mexico',
-        'new zealand': 'Pacific Ocean',
-        'egypt': 'Red Sea',
-        'spain': 'Atlantic Ocean and Mediterranean Sea',
-        'portugal': 'Atlantic Ocean',
-        'samoa': 'Pacific Ocean',
-        'colombia': 'Pacific Ocean and Caribbean Sea',
-        'ecuador': 'Pacific Ocean',
-        'cuba': 'Caribbean Sea',
-        'brazil': 'Atlantic Ocean',
-        'seychelles': 'Indian Ocean',
-        'new caledonia': 'Pacific Ocean',
-        'argentina': 'Atlantic Ocean',
-        'fiji': 'Pacific Ocean',
-        'maldives': 'Indian Ocean',
-        'england': 'Atlantic Ocean',
-        'japan': 'Pacific Ocean',
-        'indonesia': 'Indian Ocean and Pacific Ocean',
-        'thailand': 'Indian Ocean and Andaman Sea',
-        'costa rica': 'Pacific Ocean and Caribbean Sea',
-        'canada': 'Atlantic Ocean, Pacific Ocean, and Arctic Ocean',
-        'jordan': 'Red Sea',
-        'papua new guinea': 'Pacific Ocean',
-        'reunion island': 'Indian Ocean',
-        'china': 'Pacific Ocean',
-        'ireland': 'Atlantic Ocean',
-        'italy': 'Mediterranean Sea',
-        'malaysia': 'Indian Ocean and South China Sea',
-        'mauritius': 'Indian Ocean',
-        'solomon islands': 'Pacific Ocean',
-        'united kingdom': 'Atlantic Ocean',
-        'united arab emirates': 'Persian Gulf',
-        'philippines': 'Pacific Ocean',
-        'cape verde': 'Atlantic Ocean',
-        'dominican republic': 'Caribbean Sea',
-        'cayman islands': 'Caribbean Sea',
-        'aruba': 'Caribbean Sea',
-        'mozambique': 'Indian Ocean',
-        'puerto rico': 'Caribbean Sea',
-        'greece': 'Mediterranean Sea',
-        'france': 'Atlantic Ocean and Mediterranean Sea',
-        'kiribati': 'Pacific Ocean',
-        'taiwan': 'Pacific Ocean',
-        'guam': 'Pacific Ocean',
-        'nigeria': 'Atlantic Ocean',
-        'tonga': 'Pacific Ocean',
-        'scotland': 'Atlantic Ocean',
-        'croatia': 'Adriatic Sea',
-        'saudi arabia': 'Red Sea and Persian Gulf',
-        'chile': 'Pacific Ocean',
-        'kenya': 'Indian Ocean',
-        'russia': 'Arctic Ocean and Pacific Ocean',
-        'south korea': 'Pacific Ocean',
-        'malta': 'Mediterranean Sea',
-        'vietnam': 'South China Sea',
-        'madagascar': 'Indian Ocean',
-        'panama': 'Pacific Ocean and Caribbean Sea',
-        'somalia': 'Indian Ocean',
-        'norway': 'Atlantic Ocean and Arctic Ocean',
-        'senegal': 'Atlantic Ocean',
-        'yemen': 'Red Sea and Gulf of Aden',
-        'sri lanka': 'Indian Ocean',
-        'uruguay': 'Atlantic Ocean',
-        'micronesia': 'Pacific Ocean',
-        'tanzania': 'Indian Ocean',
-        'marshall islands': 'Pacific Ocean',
-        'hong kong': 'Pacific Ocean',
-        'el salvador': 'Pacific Ocean',
-        'bermuda': 'Atlantic Ocean',
-        'montenegro': 'Adriatic Sea',
-        'iran': 'Persian Gulf and Caspian Sea',
-        'tunisia': 'Mediterranean Sea',
-        'namibia': 'Atlantic Ocean',
-        'bangladesh': 'Bay of Bengal',
-        'western samoa': 'Pacific Ocean',
-        'palau': 'Pacific Ocean',
-        'grenada': 'Caribbean Sea',
-        'turkey': 'Mediterranean Sea and Black Sea',
-        'singapore': 'Indian Ocean',
-        'sudan': 'Red Sea',
-        'nicaragua': 'Pacific Ocean and Caribbean Sea',
-        'american samoa': 'Pacific Ocean',
-        'guatemala': 'Pacific Ocean and Caribbean Sea',
-        'netherlands antilles': 'Caribbean Sea',
-        'iceland': 'Atlantic Ocean',
-        'barbados': 'Caribbean Sea',
-        'guyana': 'Atlantic Ocean',
-        'haiti': 'Caribbean Sea',
-        'kuwait': 'Persian Gulf',
-        'cyprus': 'Mediterranean Sea',
-        'lebanon': 'Mediterranean Sea',
-        'martinique': 'Caribbean Sea',
-        'paraguay': 'Landlocked',
-        'peru': 'Pacific Ocean',
-        'ghana': 'Atlantic Ocean',
-        'greenland': 'Atlantic Ocean and Arctic Ocean',
-        'sweden': 'Baltic Sea',
-        'djibouti': 'Red Sea and Gulf of Aden'
-    }
+    # Búsqueda en el índice geográfico (geo_index), construido una sola vez al importar
+    return geo_index.enrich(df, country_column, oceans_column=new_column, continent_column=None)
 
-    # Convertir los nombres de los países a minúsculas y eliminar espacios adicionales
-    df[country_column] = df[country_column].str.lower().str.strip()
-    
-    # Convertir las claves del diccionario a minúsculas y eliminar espacios adicionales
-    countries_oceans = {k.lower().strip(): v for k, v in countries_oceans.items()}
-    
-    # Imprimir algunos valores intermedios para depuración
-    print("Valores únicos de la columna de países después de convertir a minúsculas y eliminar espacios:")
-    print(df[country_column].unique())
-    
-    df[new_column] = df[country_column].map(countries_oceans)
+
+# Continents
+
+@instrument.step
+def add_continent_column(df, country_column, new_column):
+    """
+    Add a continent column to the DataFrame based on the country (normalized to lowercase).
     
-    # Imprimir algunos valores del DataFrame después de añadir la nueva columna
-    print("Valores del DataFrame después de añadir la columna de océanos y mares:")
-    print(df[[country_column, new_column]].head(20))
+    Args:
+    df (pd.DataFrame): The DataFrame with the country column.
+    country_column (str): Name of the country column.
+    new_column (str): Name of the new column.
     
-    return df
+    Returns:
+    pd.DataFrame: The DataFrame with the new column.
+    """
+    return geo_index.enrich(df, country_column, oceans_column=None, continent_column=new_column)
+
+
+# Cleaned data file
+
+# Column -> dtype of the cleaned data, in memory (compact_dtypes) and in cleaned_data.parquet:
+# categoricals for the dimensions, nullable small ints, Arrow-backed strings for free text
+CLEANED_SCHEMA = {
+    'Date': 'datetime64[us]',
+    'Year': 'Int16',
+    'Type': 'category',
+    'Country': 'category',
+    'State': 'category',
+    'Location': 'category',
+    'Activity': 'category',
+    'Name': 'string[pyarrow]',
+    'Sex': 'category',
+    'Age': 'Int8',
+    'Injury': 'string[pyarrow]',
+    'Time': 'category',
+    'Species': 'category',
+    'Source': 'string[pyarrow]',
+    'original order': 'string[pyarrow]',
+    'Month': 'Int8',
+    'Day': 'Int8',
+    'Ocean_Sea': 'category',
+    'Continent': 'category',
+}
+
+
+@instrument.step
+def compact_dtypes(df):
+    '''
+    Cast the columns of CLEANED_SCHEMA found in the DataFrame to their compact type
+    (Year, stored as text by the notebook, becomes a small int again). Ages outside 0..MAX_AGE,
+    which clean_age keeps as written, become missing and the others whole years, as in parse_ages.
+    '''
+    dtypes = {column: dtype for column, dtype in CLEANED_SCHEMA.items() if column in df.columns}
+    if 'Year' in dtypes and not pd.api.types.is_numeric_dtype(df['Year']):
+        df = df.assign(Year=pd.to_numeric(df['Year'], errors='coerce'))
+    if 'Age' in dtypes:
+        ages = pd.to_numeric(df['Age'], errors='coerce')
+        known = ages.dropna()
+        if not ((known % 1 == 0) & (known >= 0) & (known <= MAX_AGE)).all():
+            df = df.assign(Age=np.floor(ages.where((ages >= 0) & (ages <= MAX_AGE))))
+    return df.astype(dtypes)
+
+
+def memory_report(before, after=None):
+    '''
+    Bytes used by each column before and after compact_dtypes.
+
+    Args:
+    before (pd.DataFrame): The DataFrame to measure.
+    after (pd.DataFrame): Its compact version, defaults to compact_dtypes(before).
+
+    Returns:
+    pd.DataFrame: One row per column (and a 'Total' row) with the dtypes, bytes and reduction factor.
+    '''
+    after = compact_dtypes(before) if after is None else after
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'bytes_after': after.memory_usage(deep=True, index=False),
+    })
+    report.loc['Total'] = ['', '', report['bytes_before'].sum(), report['bytes_after'].sum()]
+    report['reduction'] = (report['bytes_before'] / report['bytes_after']).round(1)
+    return report
+
+
+@instrument.step
+def apply_cleaned_schema(df):
+    '''
+    Cast the cleaned columns to CLEANED_SCHEMA, in its column order.
+    '''
+    columns = [column for column in CLEANED_SCHEMA if column in df.columns]
+    return compact_dtypes(df[columns])
+
+
+@instrument.step
+def write_cleaned(df, path):
+    '''
+    Write the cleaned data to a Parquet file with the CLEANED_SCHEMA types.
+    '''
+    df = apply_cleaned_schema(df).reset_index(drop=True)
+    # attrs hold run reports that do not belong in the file metadata
+    df.attrs = {}
+    df.to_parquet(path, index=False)
+
+
+@instrument.step
+def load_cleaned(path, columns=None, memory_map=True):
+    '''
+    Load the cleaned Parquet file with its CLEANED_SCHEMA types.
+
+    Args:
+    path (str): The Parquet file written by write_cleaned.
+    columns (list): Columns to read, None for all.
+    memory_map (bool): Map the file in memory instead of reading it into a buffer.
+
+    Returns:
+    pd.DataFrame: The cleaned data.
+    '''
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
@@ -0,0 +1,270 @@
+# Geographic lookup index: country -> oceans/seas and continent
+#
+# Built once at import. Countries, oceans/seas and continents get integer codes; a country
+# with several oceans or seas ("Atlantic Ocean and Pacific Ocean") keeps them as a bitmask,
+# so enrichment is one join on the country code and plots do not re-split strings.
+
+import logging
+import re
+import types
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+# Oceans and seas by (lowercase) country, as labelled in the Ocean_Sea column
+COUNTRIES_OCEANS = {
+    'morocco': 'Atlantic Ocean',
+    'jamaica': 'Caribbean Sea',
+    'belize': 'Caribbean Sea',
+    'australia': 'Indian Ocean and Pacific Ocean',
+    'usa': 'Atlantic Ocean and Pacific Ocean',
+    'maldive islands': 'Indian Ocean',
+    'turks and caicos': 'Atlantic Ocean',
+    'french polynesia': 'Pacific Ocean',
+    'tobago': 'Caribbean Sea',
+    'bahamas': 'Atlantic Ocean',
+    'india': 'Indian Ocean',
+    'trinidad': 'Caribbean Sea',
+    'south africa': 'Atlantic Ocean and Indian Ocean',
+    'mexico': 'Pacific Ocean and Gulf of Mexico',
+    'new zealand': 'Pacific Ocean',
+    'egypt': 'Red Sea',
+    'spain': 'Atlantic Ocean and Mediterranean Sea',
+    'portugal': 'Atlantic Ocean',
+    'samoa': 'Pacific Ocean',
+    'colombia': 'Pacific Ocean and Caribbean Sea',
+    'ecuador': 'Pacific Ocean',
+    'cuba': 'Caribbean Sea',
+    'brazil': 'Atlantic Ocean',
+    'seychelles': 'Indian Ocean',
+    'new caledonia': 'Pacific Ocean',
+    'argentina': 'Atlantic Ocean',
+    'fiji': 'Pacific Ocean',
+    'maldives': 'Indian Ocean',
+    'england': 'Atlantic Ocean',
+    'japan': 'Pacific Ocean',
+    'indonesia': 'Indian Ocean and Pacific Ocean',
+    'thailand': 'Indian Ocean and Andaman Sea',
+    'costa rica': 'Pacific Ocean and Caribbean Sea',
+    'canada': 'Atlantic Ocean, Pacific Ocean, and Arctic Ocean',
+    'jordan': 'Red Sea',
+    'papua new guinea': 'Pacific Ocean',
+    'reunion island': 'Indian Ocean',
+    'china': 'Pacific Ocean',
+    'ireland': 'Atlantic Ocean',
+    'italy': 'Mediterranean Sea',
+    'malaysia': 'Indian Ocean and South China Sea',
+    'mauritius': 'Indian Ocean',
+    'solomon islands': 'Pacific Ocean',
+    'united kingdom': 'Atlantic Ocean',
+    'united arab emirates': 'Persian Gulf',
+    'philippines': 'Pacific Ocean',
+    'cape verde': 'Atlantic Ocean',
+    'dominican republic': 'Caribbean Sea',
+    'cayman islands': 'Caribbean Sea',
+    'aruba': 'Caribbean Sea',
+    'mozambique': 'Indian Ocean',
+    'puerto rico': 'Caribbean Sea',
+    'greece': 'Mediterranean Sea',
+    'france': 'Atlantic Ocean and Mediterranean Sea',
+    'kiribati': 'Pacific Ocean',
+    'taiwan': 'Pacific Ocean',
+    'guam': 'Pacific Ocean',
+    'nigeria': 'Atlantic Ocean',
+    'tonga': 'Pacific Ocean',
+    'scotland': 'Atlantic Ocean',
+    'croatia': 'Adriatic Sea',
+    'saudi arabia': 'Red Sea and Persian Gulf',
+    'chile': 'Pacific Ocean',
+    'kenya': 'Indian Ocean',
+    'russia': 'Arctic Ocean and Pacific Ocean',
+    'south korea': 'Pacific Ocean',
+    'malta': 'Mediterranean Sea',
+    'vietnam': 'South China Sea',
+    'madagascar': 'Indian Ocean',
+    'panama': 'Pacific Ocean and Caribbean Sea',
+    'somalia': 'Indian Ocean',
+    'norway': 'Atlantic Ocean and Arctic Ocean',
+    'senegal': 'Atlantic Ocean',
+    'yemen': 'Red Sea and Gulf of Aden',
+    'sri lanka': 'Indian Ocean',
+    'uruguay': 'Atlantic Ocean',
+    'micronesia': 'Pacific Ocean',
+    'tanzania': 'Indian Ocean',
+    'marshall islands': 'Pacific Ocean',
+    'hong kong': 'Pacific Ocean',
+    'el salvador': 'Pacific Ocean',
+    'bermuda': 'Atlantic Ocean',
+    'montenegro': 'Adriatic Sea',
+    'iran': 'Persian Gulf and Caspian Sea',
+    'tunisia': 'Mediterranean Sea',
+    'namibia': 'Atlantic Ocean',
+    'bangladesh': 'Bay of Bengal',
+    'western samoa': 'Pacific Ocean',
+    'palau': 'Pacific Ocean',
+    'grenada': 'Caribbean Sea',
+    'turkey': 'Mediterranean Sea and Black Sea',
+    'singapore': 'Indian Ocean',
+    'sudan': 'Red Sea',
+    'nicaragua': 'Pacific Ocean and Caribbean Sea',
+    'american samoa': 'Pacific Ocean',
+    'guatemala': 'Pacific Ocean and Caribbean Sea',
+    'netherlands antilles': 'Caribbean Sea',
+    'iceland': 'Atlantic Ocean',
+    'barbados': 'Caribbean Sea',
+    'guyana': 'Atlantic Ocean',
+    'haiti': 'Caribbean Sea',
+    'kuwait': 'Persian Gulf',
+    'cyprus': 'Mediterranean Sea',
+    'lebanon': 'Mediterranean Sea',
+    'martinique': 'Caribbean Sea',
+    'paraguay': 'Landlocked',
+    'peru': 'Pacific Ocean',
+    'ghana': 'Atlantic Ocean',
+    'greenland': 'Atlantic Ocean and Arctic Ocean',
+    'sweden': 'Baltic Sea',
+    'djibouti': 'Red Sea and Gulf of Aden'
+}
+
+
+# Continent -> (lowercase) countries
+CONTINENTS_COUNTRIES = {
+    "Africa": [
+        "morocco", "south africa", "egypt", "seychelles", "mauritius", "mozambique", 
+        "nigeria", "kenya", "madagascar", "somalia", "tanzania", "senegal", 
+        "tunisia", "namibia", "sudan", "ghana"
+    ],
+    "North America": [
+        "jamaica", "belize", "usa", "turks and caicos", "tobago", "bahamas", 
+        "trinidad", "mexico", "canada", "dominican republic", "aruba", 
+        "puerto rico", "cuba", "barbados", "haiti", "bermuda"
+    ],
+    "South America": [
+        "colombia", "ecuador", "brazil", "argentina", "chile", "uruguay", 
+        "peru", "guyana"
+    ],
+    "Asia": [
+        "india", "maldives", "japan", "indonesia", "thailand", "jordan", 
+        "china", "malaysia", "united arab emirates", "philippines", "taiwan", 
+        "saudi arabia", "south korea", "vietnam", "iran", "singapore", 
+        "palau", "yemen", "sri lanka", "kuwait", "lebanon"
+    ],
+    "Europe": [
+        "spain", "portugal", "england", "ireland", "italy", "united kingdom", 
+        "france", "scotland", "russia", "croatia", "norway", "montenegro", 
+        "greece", "malta", "iceland", "sweden"
+    ],
+    "Oceania": [
+        "australia", "new zealand", "french polynesia", "new caledonia", 
+        "fiji", "papua new guinea", "solomon islands", "kiribati", "tonga", 
+        "micronesia", "marshall islands", "western samoa", "american samoa"
+    ]
+}
+
+
+def normalize_country(countries):
+    '''
+    Lowercase and strip a country column, the form used as key of the index.
+    '''
+    return countries.str.lower().str.strip()
+
+
+def _split_label(label):
+    # "Atlantic Ocean, Pacific Ocean, and Arctic Ocean" -> ['Atlantic Ocean', 'Pacific Ocean', 'Arctic Ocean']
+    return [part for part in re.split(r',? and |, ', label) if part]
+
+
+def _frozen(values):
+    array = np.asarray(values)
+    array.setflags(write=False)
+    return array
+
+
+def _build_index():
+    countries = pd.Index(sorted(set(COUNTRIES_OCEANS) | {country for names in CONTINENTS_COUNTRIES.values() for country in names}))
+    labels = pd.Index(sorted(set(COUNTRIES_OCEANS.values())))
+    bodies = pd.Index(sorted({body for label in labels for body in _split_label(label)}))
+    continents = pd.Index(sorted(CONTINENTS_COUNTRIES))
+    country_continent = {country: continent for continent, names in CONTINENTS_COUNTRIES.items() for country in names}
+
+    label_codes = np.full(len(countries), -1, dtype=np.int16)
+    ocean_bits = np.zeros(len(countries), dtype=np.uint32)
+    continent_codes = np.full(len(countries), -1, dtype=np.int8)
+    for code, country in enumerate(countries):
+        if country in COUNTRIES_OCEANS:
+            label = COUNTRIES_OCEANS[country]
+            label_codes[code] = labels.get_loc(label)
+            for body in _split_label(label):
+                ocean_bits[code] |= 1 << bodies.get_loc(body)
+        if country in country_continent:
+            continent_codes[code] = continents.get_loc(country_continent[country])
+
+    return types.SimpleNamespace(
+        countries=countries,
+        labels=labels,
+        bodies=bodies,
+        continents=continents,
+        label_codes=_frozen(label_codes),
+        ocean_bits=_frozen(ocean_bits),
+        continent_codes=_frozen(continent_codes),
+    )
+
+
+INDEX = _build_index()
+
+
+def country_codes(countries):
+    '''
+    Code of each (already normalized) country in INDEX.countries, -1 when it is not in the index.
+    '''
+    return INDEX.countries.get_indexer(countries)
+
+
+def _lookup(codes, table, categories):
+    values = np.where(codes >= 0, table[codes], -1)
+    return pd.Categorical.from_codes(values, categories=categories)
+
+
+def enrich(df, country_column='Country', oceans_column='Ocean_Sea', continent_column='Continent'):
+    '''
+    Normalize the country column and add the ocean/sea and continent columns with a single lookup.
+
+    Args:
+    df (pd.DataFrame): The DataFrame with the country column.
+    country_column (str): Name of the country column.
+    oceans_column (str): Name of the ocean/sea column to add (None to skip it).
+    continent_column (str): Name of the continent column to add (None to skip it).
+
+    Returns:
+    pd.DataFrame: The DataFrame with the normalized country and the new categorical columns.
+    '''
+    df[country_column] = normalize_country(df[country_column])
+    codes = country_codes(df[country_column])
+
+    if oceans_column:
+        df[oceans_column] = pd.Series(_lookup(codes, INDEX.label_codes, INDEX.labels), index=df.index)
+    if continent_column:
+        df[continent_column] = pd.Series(_lookup(codes, INDEX.continent_codes, INDEX.continents), index=df.index)
+
+    unknown = df.loc[codes < 0, country_column]
+    logger.info('Geo lookup: %d rows, %d countries not in the index', len(df), unknown.nunique())
+    logger.debug('Countries not in the index: %s', sorted(unknown.dropna().unique()))
+    return df
+
+
+def ocean_bridge(df, country_column='Country', column='Ocean_Sea'):
+    '''
+    One row per (incident, ocean or sea): the rows of df repeated for each body of water of their
+    country, with a single categorical value in column. Rows without a known country are left out.
+    '''
+    codes = country_codes(normalize_country(df[country_column]))
+    bits = np.where(codes >= 0, INDEX.ocean_bits[codes], 0)
+    rows, bodies = np.nonzero((bits[:, None] >> np.arange(len(INDEX.bodies), dtype=np.uint32)) & 1)
+
+    bridge = df.iloc[rows].copy()
+    bridge[column] = pd.Categorical.from_codes(bodies, categories=INDEX.bodies)
+    return bridge
@@ -0,0 +1,273 @@
+# Opt-in instrumentation of the cleaning steps
+#
+# The steps of functions.py are decorated with @instrument.step. While instrumentation is off (the
+# default) the decorator only checks a flag before calling the step. Once enabled, every call records
+# its wall time, CPU time, rows in and out and the peak memory allocated during the call (tracemalloc),
+# and the run can be saved as a JSON report and as a Prometheus textfile:
+#
+#   with instrument.recording() as run:
+#       df = pipeline.run_pipeline('GSAF5.xls')
+#   instrument.write_json(run, 'cleaning_run.json')
+#   instrument.write_prometheus(run, 'shark_cleaning.prom')
+#
+# or from the command line: python pipeline.py GSAF5.xls --report cleaning_run.json --metrics shark_cleaning.prom
+
+import contextlib
+import datetime
+import functools
+import json
+import logging
+import os
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+
+logger = logging.getLogger(__name__)
+
+# Run being recorded, None while instrumentation is off
+RUN = None
+
+# Calls in progress, outermost first
+_open = []
+
+# Prometheus metric -> (step record field, help text)
+METRICS = {
+    'shark_cleaning_step_calls': (None, 'Number of calls of the step.'),
+    'shark_cleaning_step_wall_seconds': ('wall_seconds', 'Wall time spent in the step.'),
+    'shark_cleaning_step_cpu_seconds': ('cpu_seconds', 'CPU time of the process spent in the step.'),
+    'shark_cleaning_step_rows_in': ('rows_in', 'Rows received by the step.'),
+    'shark_cleaning_step_rows_out': ('rows_out', 'Rows returned by the step.'),
+    'shark_cleaning_step_rows_dropped': ('rows_dropped', 'Rows dropped by the step.'),
+    'shark_cleaning_step_peak_bytes': ('peak_bytes', 'Peak memory allocated during one call of the step.'),
+}
+
+
+def enable():
+    '''
+    Start recording the steps (and tracing allocations if tracemalloc is not already on).
+
+    Returns:
+    SimpleNamespace: The run: started (ISO time), steps (one dict per call, in order of completion).
+    '''
+    global RUN
+    if RUN is None:
+        RUN = SimpleNamespace(started=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                              finished=None, steps=[], traces=not tracemalloc.is_tracing())
+        if RUN.traces:
+            tracemalloc.start()
+    return RUN
+
+
+def disable():
+    '''
+    Stop recording and return the run (None if it was not enabled).
+    '''
+    global RUN
+    run, RUN = RUN, None
+    if run is not None:
+        run.finished = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        if run.traces:
+            tracemalloc.stop()
+    return run
+
+
+@contextlib.contextmanager
+def recording():
+    '''
+    Context that records the steps run inside it. Nested in an enabled run, it records into that run.
+    '''
+    owner = RUN is None
+    run = enable()
+    try:
+        yield run
+    finally:
+        if owner:
+            disable()
+
+
+def _rows(data):
+    # Rows of a DataFrame, Series or array (first item of a tuple result), None for anything else
+    if isinstance(data, tuple) and data:
+        data = data[0]
+    return len(data) if hasattr(data, 'shape') and getattr(data, 'ndim', 0) > 0 else None
+
+
+@contextlib.contextmanager
+def measure(name, data=None, kind='step'):
+    '''
+    Record one step of the current run. Set .output of the yielded object to the result of the step
+    to count its rows. Does nothing while instrumentation is off.
+
+    Args:
+    name (str): Name of the step.
+    data: Input of the step (rows are counted for a DataFrame, Series or array).
+    kind (str): 'step' for functions.py, 'stage' for pipeline stages.
+    '''
+    run = RUN
+    call = SimpleNamespace(output=None)
+    if run is None:
+        yield call
+        return
+
+    # A nested call resets the peak: the peak seen so far is kept by every open call first
+    current, peak = tracemalloc.get_traced_memory()
+    for other in _open:
+        other.peak = max(other.peak, peak)
+    tracemalloc.reset_peak()
+    call.base = call.peak = current
+    _open.append(call)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield call
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        _open.pop()
+        peak = tracemalloc.get_traced_memory()[1]
+        for other in _open:
+            other.peak = max(other.peak, peak)
+
+    _record(run, name, kind, len(_open), wall, cpu, _rows(data), _rows(call.output), max(call.peak, peak) - call.base)
+
+
+def _record(run, name, kind, depth, wall, cpu, rows_in, rows_out, peak_bytes):
+    record = {
+        'step': name,
+        'kind': kind,
+        'depth': depth,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rows_dropped': rows_in - rows_out if rows_in is not None and rows_out is not None else None,
+        'peak_bytes': peak_bytes,
+    }
+    run.steps.append(record)
+    logger.debug('%s: %.3fs wall, %.3fs CPU, %s -> %s rows, %d KiB peak', name, wall, cpu, rows_in, rows_out,
+                 peak_bytes // 1024)
+
+
+def step(function):
+    '''
+    Decorator recording each call of a step while instrumentation is on. The first argument is taken
+    as the input rows and the return value (or its first item) as the output rows.
+    '''
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if RUN is None:
+            return function(*args, **kwargs)
+        with measure(function.__name__, args[0] if args else None) as call:
+            call.output = function(*args, **kwargs)
+        return call.output
+    return wrapper
+
+
+def call_recorded(function, *args):
+    '''
+    Run function(*args) in a worker process of a parallel run with a recording of its own.
+
+    Returns:
+    tuple: The result and the records of the call (its own record, of kind 'call', last), to pass
+    to merge_records in the parent process.
+    '''
+    global RUN
+    # A forked worker starts with a copy of the run of the parent
+    RUN = None
+    _open.clear()
+    with recording() as run:
+        with measure(function.__name__, args[0] if args else None, kind='call') as call:
+            call.output = function(*args)
+    return call.output, run.steps
+
+
+def merge_records(name, data, output, wall, records):
+    '''
+    Add to the current run a stage run by worker processes: the records of the steps of its calls
+    (from call_recorded) and one stage record with the wall time from the submission of the calls to
+    the last result, the CPU time of all the calls and the peak memory of the largest one.
+
+    Args:
+    name (str): Name of the stage.
+    data: Input of the stage.
+    output: Output of the stage, its calls put together.
+    wall (float): Seconds from the submission of the calls to the last result.
+    records (list): Records returned by call_recorded, one list per call.
+    '''
+    run = RUN
+    if run is None:
+        return
+    calls = []
+    for call_records in records:
+        for record in call_records:
+            if record['kind'] == 'call':
+                calls.append(record)
+            else:
+                run.steps.append({**record, 'depth': record['depth'] + len(_open)})
+    _record(run, name, 'stage', len(_open), wall, sum(call['cpu_seconds'] for call in calls), _rows(data), _rows(output),
+            max((call['peak_bytes'] for call in calls), default=0))
+
+
+def summary(run):
+    '''
+    Totals per step of a run: calls, times and rows summed, peak memory of the largest call.
+
+    Returns:
+    dict: (kind, step) -> totals, in order of first completion.
+    '''
+    totals = {}
+    for record in run.steps:
+        total = totals.setdefault((record['kind'], record['step']), {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': None, 'rows_out': None, 'rows_dropped': None,
+            'peak_bytes': 0})
+        total['calls'] += 1
+        total['wall_seconds'] += record['wall_seconds']
+        total['cpu_seconds'] += record['cpu_seconds']
+        # Row counts stay None for the steps that never take or return rows
+        for field in ['rows_in', 'rows_out', 'rows_dropped']:
+            if record[field] is not None:
+                total[field] = (total[field] or 0) + record[field]
+        total['peak_bytes'] = max(total['peak_bytes'], record['peak_bytes'])
+    return totals
+
+
+def write_json(run, path):
+    '''
+    Save the run report: start and end time, every call and the totals per step.
+    '''
+    report = {
+        'started': run.started,
+        'finished': run.finished,
+        'steps': run.steps,
+        'totals': [{'kind': kind, 'step': name, **total} for (kind, name), total in summary(run).items()],
+    }
+    with open(path + '.tmp', 'w') as file:
+        json.dump(report, file, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def prometheus_text(run):
+    '''
+    The totals per step of a run in the Prometheus text exposition format.
+    '''
+    totals = summary(run)
+    lines = []
+    for metric, (field, help_text) in METRICS.items():
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+        for (kind, name), total in totals.items():
+            if total[field or 'calls'] is not None:
+                lines.append(f'{metric}{{kind="{kind}",step="{name}"}} {total[field or "calls"]}')
+    finished = datetime.datetime.fromisoformat(run.finished) if run.finished else datetime.datetime.now(datetime.timezone.utc)
+    lines += ['# HELP shark_cleaning_last_run_timestamp_seconds End of the instrumented run.',
+              '# TYPE shark_cleaning_last_run_timestamp_seconds gauge',
+              f'shark_cleaning_last_run_timestamp_seconds {finished.timestamp():.0f}']
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(run, path):
+    '''
+    Save the run as a Prometheus textfile (for the node exporter textfile collector). The file is
+    written to a temporary name first so the collector never reads it half written.
+    '''
+    with open(path + '.tmp', 'w') as file:
+        file.write(prometheus_text(run))
+    os.replace(path + '.tmp', path)
@@ -0,0 +1,598 @@
+# Cleaning pipeline: the steps of data_cleaning.ipynb as a DAG of cached stages
+#
+# Run from the notebooks folder:
+#   python pipeline.py                              (downloads GSAF5.xls, writes cleaned_data.parquet and cleaned_cube.parquet)
+#   python pipeline.py GSAF5.xls --csv cleaned_data.csv
+#
+# Every stage output is cached under CACHE_DIR with a key made of the hashes of its inputs
+# and of the source code of the stage (plus the functions and rules it uses from functions.py),
+# so editing one cleaner only re-runs that stage and the stages downstream of it.
+# With --incremental only the new and changed rows of the spreadsheet are cleaned. With --workers N the
+# independent stages (one per column) run at the same time in N processes, each getting only its column,
+# and the regex-heavy ones are split in chunks of rows.
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import inspect
+import io
+import logging
+import os
+import pickle
+import time
+import types
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+import cube
+import functions as f
+import geo_index
+import instrument
+
+
+# URL of the Excel file containing shark attack data
+SOURCE_URL = 'https://www.sharkattackfile.net/spreadsheets/GSAF5.xls'
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, '.pipeline_cache')
+OUTPUT = os.path.join(HERE, 'cleaned_data.parquet')
+CUBE_OUTPUT = os.path.join(HERE, 'cleaned_cube.parquet')
+
+# A stage reads the outputs of the stages in inputs ('source' is the raw file) and returns a DataFrame or Series.
+# Stages with a reads column set only need those columns of their input and can run in a worker process
+# on them; writes are the columns of their output; chunked stages are row-local and can be split in row chunks.
+Stage = collections.namedtuple('Stage', ['name', 'function', 'inputs', 'reads', 'writes', 'chunked'],
+                               defaults=[None, None, False])
+
+
+# Stages
+
+def load_raw(source):
+    return pd.read_excel(io.BytesIO(source))
+
+
+def drop_useless(df):
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = f.drop_columns(df)
+    df = df.drop_duplicates(keep='first').reset_index(drop=True)
+    return df
+
+
+def fill_undefined(values):
+    '''
+    The notebook replaced every NaN with 'undefined' before cleaning these columns.
+    '''
+    return values.fillna('undefined')
+
+
+def clean_dates(df):
+    return f.date_clean(df[['Date']].copy())['Date']
+
+
+def clean_type(df):
+    return f.type_column(df[['Type']].copy())['Type']
+
+
+def clean_countries(df):
+    return f.country_cleaned(df[['Country']].copy())['Country']
+
+
+def clean_states(df):
+    return f.state_cleaned(df[['State']].copy())['State']
+
+
+def clean_locations(df):
+    return f.clean_location_column(df[['Location']].copy(), 'Location')['Location']
+
+
+def clean_activities(df):
+    activities = f.activity_cleaned(df[['Activity']].copy())
+    return f.clean_activity_column(activities, 'Activity')['Activity']
+
+
+def clean_sex(df):
+    return fill_undefined(f.sex_clean(df[['Sex']].copy())['Sex'])
+
+
+def clean_ages(df):
+    return f.clean_age(fill_undefined(df[['Age']]))['Age']
+
+
+def clean_injuries(df):
+    injuries = f.injury_cleaned(fill_undefined(df[['Injury']]))
+    return f.clean_injury_column(injuries, 'Injury')['Injury']
+
+
+def clean_species(df):
+    return f.normalize_species(fill_undefined(df['Species']))
+
+
+def clean_times(df):
+    return f.classify_time(fill_undefined(df['Time']))
+
+
+def assemble(df, *columns):
+    '''
+    Put the cleaned columns back in place of the raw ones.
+    '''
+    df = df.copy()
+    for column in columns:
+        df[column.name] = column
+    return df
+
+
+def date_parts(df, date_format=None):
+    '''
+    Parse the cleaned dates, drop the rows without one and add the Year (as text, like the notebook), Month and Day.
+    Without a date_format, pandas uses the format of the first date for the whole column.
+    '''
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format=date_format)
+    df = df.dropna(subset=['Date'])
+    df['Year'] = df['Date'].dt.year
+    df['Month'] = df['Date'].dt.month
+    df['Day'] = df['Date'].dt.day
+    df['Year'] = df['Year'].astype(str)
+    return df
+
+
+def impute(df):
+    '''
+    Row filters and imputations, in the order of the notebook (each mode depends on the rows kept so far).
+    '''
+    df = date_parts(df)
+
+    # The five modes are counted on the same rows (filling one column does not change the others)
+    df, imputed = f.impute(df, ['Type', 'Country', 'State', 'Location', 'Activity'])
+    df = f.location_cleaned(df)
+
+    cleaned = ['Sex', 'Age', 'Injury', 'Species', 'Time']
+    others = df.columns.difference(cleaned)
+    df[others] = df[others].fillna('undefined')
+    df = df[df['Sex'] != 'undefined'].copy()
+
+    df['Age'] = df['Age'].fillna(df['Age'].mean().astype(int)).astype(int)
+
+    df, rejected = f.filter_rows(df, {'Species': f.SPECIES_REJECTED}, dropna=['Species'])
+    df.attrs['rejected_rows'] = rejected
+    df.attrs['imputed_cells'] = imputed
+    return df
+
+
+def add_geography(df):
+    df = geo_index.enrich(df.copy(), 'Country', 'Ocean_Sea', 'Continent')
+    df = df.dropna(subset=['Ocean_Sea'])
+    df, _ = f.impute(df, ['Time'])
+    return df.dropna(subset=['Continent'])
+
+
+# One column each: independent of each other, the regex-heavy ones are split in row chunks
+COLUMN_STAGES = [
+    Stage('date', clean_dates, ['columns'], ['Date'], ['Date'], True),
+    Stage('type', clean_type, ['columns'], ['Type'], ['Type']),
+    Stage('country', clean_countries, ['columns'], ['Country'], ['Country']),
+    Stage('state', clean_states, ['columns'], ['State'], ['State']),
+    Stage('location', clean_locations, ['columns'], ['Location'], ['Location'], True),
+    Stage('activity', clean_activities, ['columns'], ['Activity'], ['Activity'], True),
+    Stage('sex', clean_sex, ['columns'], ['Sex'], ['Sex']),
+    Stage('age', clean_ages, ['columns'], ['Age'], ['Age']),
+    Stage('injury', clean_injuries, ['columns'], ['Injury'], ['Injury'], True),
+    Stage('species', clean_species, ['columns'], ['Species'], ['Species'], True),
+    Stage('time', clean_times, ['columns'], ['Time'], ['Time'], True),
+]
+
+STAGES = [
+    Stage('raw', load_raw, ['source']),
+    Stage('columns', drop_useless, ['raw']),
+    *COLUMN_STAGES,
+    Stage('assemble', assemble, ['columns'] + [stage.name for stage in COLUMN_STAGES]),
+    Stage('impute', impute, ['assemble']),
+    Stage('geography', add_geography, ['impute']),
+    Stage('compact', f.compact_dtypes, ['geography']),
+    Stage('cube', cube.build_cube, ['compact']),
+]
+
+# Stage whose output is the cleaned data
+CLEANED = 'compact'
+
+
+# Hashing
+
+def read_source(source):
+    '''
+    Return the bytes of a local file or URL.
+    '''
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source) as response:
+            return response.read()
+    with open(source, 'rb') as file:
+        return file.read()
+
+
+def hash_data(data):
+    '''
+    Content hash of bytes, a Series or a DataFrame (values, index, column names and dtypes).
+    '''
+    digest = hashlib.sha256()
+    if isinstance(data, bytes):
+        digest.update(data)
+        return digest.hexdigest()
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in frame.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _local_modules(function):
+    return [value for value in function.__globals__.values()
+            if isinstance(value, types.ModuleType) and os.path.dirname(getattr(value, '__file__', '') or '') == HERE]
+
+
+def source_fingerprint(obj, seen=None):
+    '''
+    Hash of the source of a function, of the project functions it calls and of the rule tables
+    (dicts, lists...) it reads, followed through closures and default arguments.
+    '''
+    seen = set() if seen is None else seen
+    if isinstance(obj, types.FunctionType):
+        # Steps decorated by instrument.step are hashed through the function they wrap
+        obj = inspect.unwrap(obj)
+        if id(obj) in seen:
+            return ''
+        seen.add(id(obj))
+
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return repr(obj)
+    if isinstance(obj, dict):
+        return repr([(source_fingerprint(key, seen), source_fingerprint(value, seen)) for key, value in obj.items()])
+    if isinstance(obj, (list, tuple)):
+        return repr([source_fingerprint(value, seen) for value in obj])
+    if isinstance(obj, (set, frozenset)):
+        return repr(sorted(source_fingerprint(value, seen) for value in obj))
+    if isinstance(obj, (np.ndarray, pd.Index)):
+        return repr(obj.tolist())
+    if isinstance(obj, types.SimpleNamespace):
+        return source_fingerprint(vars(obj), seen)
+    if not isinstance(obj, types.FunctionType):
+        return ''
+
+    try:
+        parts = [inspect.getsource(obj)]
+    except (OSError, TypeError):
+        parts = [obj.__code__.co_code.hex()]
+
+    modules = _local_modules(obj)
+    for name in sorted(_code_names(obj.__code__)):
+        if name in obj.__globals__:
+            parts.append(source_fingerprint(obj.__globals__[name], seen))
+        else:
+            parts.extend(source_fingerprint(getattr(module, name), seen) for module in modules if hasattr(module, name))
+    for value in (obj.__defaults__ or ()):
+        parts.append(source_fingerprint(value, seen))
+    for cell in (obj.__closure__ or ()):
+        parts.append(source_fingerprint(cell.cell_contents, seen))
+
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+
+# Runner
+
+def save_outputs(outputs, output=None, csv=None, cube_output=None):
+    '''
+    Write the cleaned data to Parquet (the typed file read by the notebooks and the app), optionally
+    export it to CSV, and write the aggregation cube.
+    '''
+    df = outputs[CLEANED]
+    if output:
+        f.write_cleaned(df, output)
+    if csv:
+        df.to_csv(csv, index=False)
+    if cube_output and 'cube' in outputs:
+        cube.save_cube(outputs['cube'], cube_output)
+
+
+def stage_key(stage, input_hashes):
+    key = '\n'.join([stage.name, source_fingerprint(stage.function)] + input_hashes)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+# Parallel runs
+
+# Rows per chunk of the chunked stages when they run in a process pool
+CHUNK_ROWS = 20_000
+
+
+def stage_waves(stages):
+    '''
+    Group the stages in waves of independent stages: a stage goes in the wave after the last of its
+    inputs, or later if a stage of that wave already writes one of its columns.
+
+    Returns:
+    list: Lists of stages, in order of execution.
+    '''
+    level = {'source': -1}
+    written = collections.defaultdict(set)
+    for stage in stages:
+        wave = 1 + max(level[name] for name in stage.inputs)
+        while written[wave] & set(stage.writes or ()):
+            wave += 1
+        level[stage.name] = wave
+        written[wave] |= set(stage.writes or ())
+    waves = collections.defaultdict(list)
+    for stage in stages:
+        waves[level[stage.name]].append(stage)
+    return [waves[wave] for wave in sorted(waves)]
+
+
+def row_chunks(df, chunk_rows):
+    return [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)] or [df]
+
+
+def run_stages(stages, outputs, pool=None, chunk_rows=CHUNK_ROWS):
+    '''
+    Run independent stages (one wave of stage_waves). With a process pool, the stages that declare
+    their reads get only those columns of their input and a chunked stage is split in chunks of
+    chunk_rows rows whose outputs are concatenated; the other stages run here meanwhile.
+
+    Args:
+    stages (list): The stages to run.
+    outputs (dict): Outputs of the stages run so far, by name.
+    pool (concurrent.futures.Executor): Pool of worker processes, None runs every stage here in order.
+    chunk_rows (int): Rows per chunk of the chunked stages.
+
+    Returns:
+    dict: Stage name -> (output, seconds until it was ready).
+    '''
+    start = time.perf_counter()
+    # While instrumentation is on, the workers record the steps of their calls and send them back
+    recorded = instrument.RUN is not None
+    jobs = {}
+    for stage in stages:
+        if pool is not None and stage.reads is not None:
+            df = outputs[stage.inputs[0]][stage.reads]
+            parts = row_chunks(df, chunk_rows) if stage.chunked else [df]
+            if recorded:
+                jobs[stage.name] = (df, [pool.submit(instrument.call_recorded, stage.function, part) for part in parts])
+            else:
+                jobs[stage.name] = (df, [pool.submit(stage.function, part) for part in parts])
+
+    results = {}
+    for stage in stages:
+        if stage.name not in jobs:
+            begin = time.perf_counter()
+            inputs = [outputs[name] for name in stage.inputs]
+            with instrument.measure(stage.name, inputs[0], kind='stage') as call:
+                call.output = stage.function(*inputs)
+            results[stage.name] = (call.output, time.perf_counter() - begin)
+    for stage in stages:
+        if stage.name in jobs:
+            df, futures = jobs[stage.name]
+            parts = [future.result() for future in futures]
+            if recorded:
+                parts, records = zip(*parts)
+            output = parts[0] if len(parts) == 1 else pd.concat(parts)
+            # A chunk without any value left gets a float dtype: the concatenation is then typed as a whole
+            if len({str(part.dtypes) for part in parts}) > 1:
+                output = output.infer_objects()
+            results[stage.name] = (output, time.perf_counter() - start)
+            if recorded:
+                instrument.merge_records(stage.name, df, output, results[stage.name][1], records)
+    return results
+
+
+def worker_pool(workers):
+    '''
+    Process pool of the parallel runs, or an empty context (giving None) for a single worker.
+    '''
+    if workers and workers > 1:
+        return concurrent.futures.ProcessPoolExecutor(workers)
+    return contextlib.nullcontext()
+
+
+def run_pipeline(source=SOURCE_URL, output=OUTPUT, cache_dir=CACHE_DIR, stages=STAGES, force=(), verbose=True, csv=None,
+                 cube_output=CUBE_OUTPUT, workers=1, chunk_rows=CHUNK_ROWS):
+    '''
+    Run the cleaning stages, reusing every cached stage whose inputs and code did not change.
+
+    Args:
+    source (str): Path or URL of the GSAF spreadsheet.
+    output (str): Parquet file to write the cleaned data to (None to skip).
+    cache_dir (str): Folder of the stage cache (None to disable it).
+    stages (list): Stages in dependency order.
+    force (iterable): Names of stages to re-run even if cached.
+    verbose (bool): Print one line per stage.
+    csv (str): Also export the cleaned data to this CSV file.
+    cube_output (str): Parquet file to write the aggregation cube to (None to skip).
+    workers (int): Processes running the independent stages of a wave at the same time (1 runs them in order).
+    chunk_rows (int): Rows per chunk of the chunked stages when workers > 1.
+
+    Returns:
+    pd.DataFrame: The cleaned data. Its attrs['stages'] tells, per stage, whether it ran and for how long.
+    '''
+    data = read_source(source)
+    outputs = {'source': data}
+    hashes = {'source': hash_data(data)}
+    report = {}
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    with worker_pool(workers) as pool:
+        for wave in stage_waves(stages):
+            paths = {}
+            for stage in wave:
+                start = time.perf_counter()
+                key = stage_key(stage, [hashes[name] for name in stage.inputs])
+                paths[stage.name] = path = os.path.join(cache_dir, f'{stage.name}-{key}.pkl') if cache_dir else None
+                if path and stage.name not in force and os.path.exists(path):
+                    with open(path, 'rb') as file:
+                        hashes[stage.name], outputs[stage.name] = pickle.load(file)
+                    report[stage.name] = {'status': 'cached', 'seconds': time.perf_counter() - start}
+
+            results = run_stages([stage for stage in wave if stage.name not in report], outputs, pool, chunk_rows)
+            for stage in wave:
+                if stage.name in results:
+                    outputs[stage.name], seconds = results[stage.name]
+                    hashes[stage.name] = hash_data(outputs[stage.name])
+                    path = paths[stage.name]
+                    if path:
+                        with open(path + '.tmp', 'wb') as file:
+                            pickle.dump((hashes[stage.name], outputs[stage.name]), file)
+                        os.replace(path + '.tmp', path)
+                    report[stage.name] = {'status': 'ran', 'seconds': seconds}
+                if verbose:
+                    print(f"{stage.name:<10} {report[stage.name]['status']:<6} {report[stage.name]['seconds']:.3f}s")
+
+    save_outputs(outputs, output, csv, cube_output)
+    df = outputs[CLEANED]
+    df.attrs['stages'] = report
+    return df
+
+
+# Incremental runs
+
+# Per-row cleaned data of the last run, indexed by row hash
+STORE = os.path.join(CACHE_DIR, 'cleaned_rows.pkl')
+ROW_KEY = 'original order'
+
+
+def clean_rows(df, pool=None, chunk_rows=CHUNK_ROWS):
+    '''
+    Run the per-row stages (COLUMN_STAGES and assemble) on some rows of the deduplicated frame,
+    in a process pool when one is given.
+    '''
+    results = run_stages(COLUMN_STAGES, {'columns': df}, pool, chunk_rows)
+    return assemble(df, *[results[stage.name][0] for stage in COLUMN_STAGES])
+
+
+def row_hashes(df):
+    '''
+    Content hash of every row. Cells are hashed through repr so that 5 and '5' differ.
+    '''
+    return pd.util.hash_pandas_object(df.map(repr), index=False).to_numpy()
+
+
+def rows_version():
+    '''
+    Fingerprint of the code that produces the stored rows: a change throws the store away.
+    '''
+    return hashlib.sha256((source_fingerprint(drop_useless) + source_fingerprint(clean_rows)).encode()).hexdigest()
+
+
+def run_incremental(source=SOURCE_URL, output=OUTPUT, store=STORE, stages=STAGES, verbose=True, csv=None,
+                    cube_output=CUBE_OUTPUT, workers=1, chunk_rows=CHUNK_ROWS):
+    '''
+    Clean only the rows that are new or changed since the last run (by ROW_KEY and row hash),
+    merge them with the stored rows and run the global stages (imputations, filters) on the result.
+    The output is the same as run_pipeline on the same source.
+
+    Args:
+    source (str): Path or URL of the GSAF spreadsheet.
+    output (str): Parquet file to write the cleaned data to (None to skip).
+    store (str): Pickle file with the cleaned rows of the last run.
+    stages (list): Stages in dependency order, the ones after 'assemble' are run on the merged rows.
+    verbose (bool): Print the size of the delta.
+    csv (str): Also export the cleaned data to this CSV file.
+    cube_output (str): Parquet file to write the aggregation cube to (None to skip).
+    workers (int): Processes cleaning the columns of the new and changed rows (1 cleans them in order).
+    chunk_rows (int): Rows per chunk of the chunked stages when workers > 1.
+
+    Returns:
+    pd.DataFrame: The cleaned data. Its attrs['delta'] counts the new, changed, removed and reused rows.
+    '''
+    by_name = {stage.name: stage for stage in stages}
+    df = by_name['columns'].function(by_name['raw'].function(read_source(source)))
+    hashes = row_hashes(df)
+    version = rows_version()
+
+    stored = None
+    if os.path.exists(store):
+        with open(store, 'rb') as file:
+            stored_version, stored = pickle.load(file)
+        if stored_version != version:
+            stored = None
+
+    known = np.isin(hashes, stored.index) if stored is not None else np.zeros(len(df), dtype=bool)
+    delta = df[~known]
+    is_new = ~delta[ROW_KEY].isin(stored[ROW_KEY]) if stored is not None else pd.Series(True, index=delta.index)
+
+    parts = [] if stored is None else [stored]
+    if len(delta):
+        with worker_pool(workers) as pool:
+            parts.append(clean_rows(delta, pool, chunk_rows).set_axis(hashes[~known]))
+    rows = pd.concat(parts) if len(parts) > 1 else parts[0]
+    rows = rows.loc[hashes]
+
+    os.makedirs(os.path.dirname(store), exist_ok=True)
+    with open(store + '.tmp', 'wb') as file:
+        pickle.dump((version, rows), file)
+    os.replace(store + '.tmp', store)
+
+    report = {
+        'new': int(is_new.sum()),
+        'changed': int((~is_new).sum()),
+        'removed': 0 if stored is None else int((~stored.index.isin(hashes)).sum() - (~is_new).sum()),
+        'reused': int(known.sum()),
+    }
+    if verbose:
+        print(', '.join(f'{count} {kind}' for kind, count in report.items()) + ' rows')
+
+    outputs = {'assemble': rows.set_axis(df.index)}
+    for stage in stages[stages.index(by_name['assemble']) + 1:]:
+        inputs = [outputs[name] for name in stage.inputs]
+        with instrument.measure(stage.name, inputs[0], kind='stage') as call:
+            outputs[stage.name] = call.output = stage.function(*inputs)
+
+    save_outputs(outputs, output, csv, cube_output)
+    df = outputs[CLEANED]
+    df.attrs['delta'] = report
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the GSAF shark attack spreadsheet.')
+    parser.add_argument('source', nargs='?', default=SOURCE_URL, help='path or URL of GSAF5.xls')
+    parser.add_argument('-o', '--output', default=OUTPUT, help='cleaned Parquet file')
+    parser.add_argument('--csv', help='also export the cleaned data to this CSV file')
+    parser.add_argument('--cube', default=CUBE_OUTPUT, help='aggregation cube Parquet file')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='stage cache folder')
+    parser.add_argument('--no-cache', action='store_true', help='run every stage without the cache')
+    parser.add_argument('--force', nargs='*', default=[], metavar='STAGE', help='stages to re-run')
+    parser.add_argument('--incremental', action='store_true', help='only clean the new and changed rows')
+    parser.add_argument('--workers', type=int, default=1, help='processes running independent stages at the same time')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='rows per chunk of the regex-heavy stages')
+    parser.add_argument('--report', help='record the cleaning steps and save a JSON run report to this file')
+    parser.add_argument('--metrics', help='record the cleaning steps and save them as a Prometheus textfile')
+    parser.add_argument('--log-level', default='WARNING', help='logging level (INFO, DEBUG for one line per step)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(name)s %(levelname)s %(message)s')
+    if args.report or args.metrics:
+        instrument.enable()
+
+    if args.incremental:
+        run_incremental(args.source, args.output, os.path.join(args.cache_dir, 'cleaned_rows.pkl'), csv=args.csv, cube_output=args.cube,
+                        workers=args.workers, chunk_rows=args.chunk_rows)
+    else:
+        run_pipeline(args.source, args.output, None if args.no_cache else args.cache_dir, force=args.force, csv=args.csv,
+                     cube_output=args.cube, workers=args.workers, chunk_rows=args.chunk_rows)
+
+    run = instrument.disable()
+    if run is not None and args.report:
+        instrument.write_json(run, args.report)
+    if run is not None and args.metrics:
+        instrument.write_prometheus(run, args.metrics)
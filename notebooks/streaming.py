@@ -0,0 +1,312 @@
+# Streaming mode of the cleaning pipeline, for raw extracts that do not fit in memory
+#
+# Run from the notebooks folder:
+#   python streaming.py extract.parquet              (or .csv, with the columns of GSAF5.xls)
+#   python streaming.py extract.csv --chunk-size 200000 --workers 8
+#
+# The raw rows are read chunk by chunk through a chain of generators: duplicated rows are dropped
+# against the hashes of the rows already seen, the per-column stages of pipeline.py clean the chunk
+# and the row filters of the impute stage are applied. The imputations need every row, so they take
+# two passes: the first one counts the values of the columns filled with their mode (and sums the ages
+# for the mean) while it spills the cleaned chunks to a temporary folder, the second one fills them,
+# adds the geography and appends them to the Parquet output and to the cube. Memory is bounded by the
+# chunk size, plus 8 bytes per distinct row and the counts of the distinct values of the mode columns.
+#
+# The date cells of a CSV export of the spreadsheet (ISO timestamps) are read back as the datetimes
+# read_excel gives. A CSV cannot tell the ages stored as numbers, which clean_age leaves empty, from the
+# ones written as text: they are all read as text.
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.tseries.api import guess_datetime_format
+
+import cube
+import functions as f
+import geo_index
+import pipeline
+
+
+CHUNK_ROWS = 100_000
+
+# Columns filled with their mode by pipeline.impute, before the Sex and Species filters
+MODE_COLUMNS = ['Type', 'Country', 'State', 'Location', 'Activity']
+
+# Columns of the raw extract that are not text
+NUMERIC_COLUMNS = ['Year', 'original order']
+
+# Date cells of the spreadsheet as an export writes them ('2002-03-25 00:00:00')
+ISO_DATE = r'^\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2})?$'
+
+
+def excel_dates(dates):
+    '''
+    Turn the ISO timestamp texts of a raw 'Date' column back into the datetimes read_excel gives for
+    those cells: clean_date reads the datetimes but not their ISO text.
+    '''
+    is_iso = dates.map(lambda value: isinstance(value, str)).astype(bool)
+    is_iso[is_iso] = dates[is_iso].str.match(ISO_DATE)
+    if not is_iso.any():
+        return dates
+    dates = dates.astype(object)
+    dates[is_iso] = list(pd.to_datetime(dates[is_iso], format='ISO8601').dt.to_pydatetime())
+    return dates
+
+
+def read_chunks(source, chunk_rows=CHUNK_ROWS):
+    '''
+    Rows of a raw Parquet or CSV extract, chunk by chunk, indexed by their position in the file,
+    with the dates of the spreadsheet cells as read_excel returns them.
+    '''
+    if source.endswith('.parquet'):
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows))
+    else:
+        # Read as text so that every chunk gets the same types
+        chunks = pd.read_csv(source, chunksize=chunk_rows, dtype=str)
+
+    start = 0
+    for chunk in chunks:
+        numeric = [column for column in NUMERIC_COLUMNS if column in chunk.columns and not source.endswith('.parquet')]
+        chunk = chunk.assign(**{column: pd.to_numeric(chunk[column], errors='coerce') for column in numeric})
+        if 'Date' in chunk.columns:
+            chunk = chunk.assign(Date=excel_dates(chunk['Date']))
+        yield chunk.set_axis(pd.RangeIndex(start, start + len(chunk)))
+        start += len(chunk)
+
+
+def unique_rows(chunks, stats):
+    '''
+    Drop the useless columns and the duplicated rows of pipeline.drop_useless across the chunks: a row
+    is kept the first time its 64-bit hash is seen. The hashes seen are kept as a sorted array.
+    '''
+    seen = np.empty(0, dtype=np.uint64)
+    for chunk in chunks:
+        chunk = f.drop_columns(chunk.rename(columns=str.strip))
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        known = np.zeros(len(hashes), dtype=bool)
+        if len(seen):
+            known = seen[np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)] == hashes
+        keep = ~known & ~pd.Series(hashes).duplicated().to_numpy()
+        seen = np.union1d(seen, hashes[keep])
+        stats.rows_read += len(chunk)
+        stats.duplicates += int((~keep).sum())
+        yield chunk[keep]
+
+
+def date_format(dates):
+    '''
+    Format pd.to_datetime infers for a whole column: the one of its first date ('mixed', parsing each date
+    on its own, when it has no recognizable format). None if the column has no date.
+    '''
+    dates = dates.dropna()
+    if dates.empty or not isinstance(dates.iloc[0], str):
+        return None
+    return guess_datetime_format(dates.iloc[0]) or 'mixed'
+
+
+def clean_chunks(chunks, pool=None):
+    '''
+    Run the per-column stages on each chunk and parse its dates (rows without a date are dropped)
+    with the format of the first date of the whole extract.
+    '''
+    dates = None
+    for chunk in chunks:
+        chunk = pipeline.clean_rows(chunk, pool)
+        dates = dates or date_format(chunk['Date'])
+        yield pipeline.date_parts(chunk, dates)
+
+
+def add_counts(total, counts):
+    return counts if total is None else total.add(counts, fill_value=0).astype(np.int64)
+
+
+def first_pass(chunks, spill_dir, stats):
+    '''
+    Count what the imputations need, apply the row filters of pipeline.impute and spill the chunks.
+
+    Args:
+    chunks (iterable): Cleaned chunks from clean_chunks.
+    spill_dir (str): Folder for the filtered chunks.
+    stats (SimpleNamespace): Counts of the run, updated with the value counts of MODE_COLUMNS, the sum and
+        number of the ages kept by the Sex filter and the Time values per Country of the rows left.
+
+    Returns:
+    list: Paths of the spilled chunks, in order.
+    '''
+    paths = []
+    for chunk in chunks:
+        for column in MODE_COLUMNS:
+            stats.counts[column] = add_counts(stats.counts.get(column), chunk[column].value_counts())
+
+        chunk = chunk[chunk['Sex'] != 'undefined']
+        ages = pd.to_numeric(chunk['Age'], errors='coerce')
+        stats.age_sum += float(ages.sum())
+        stats.age_count += int(ages.count())
+
+        chunk, rejected = f.filter_rows(chunk, {'Species': f.SPECIES_REJECTED}, dropna=['Species'])
+        for column, counts in rejected.items():
+            for value, rows in counts.items():
+                total = stats.rejected.setdefault(column, {})
+                total[value] = total.get(value, 0) + rows
+
+        # Time is filled after the rows without an ocean are dropped, which depends on the filled Country
+        times = chunk.dropna(subset=['Time']).groupby(['Country', 'Time'], dropna=False).size()
+        stats.times = add_counts(stats.times, times)
+
+        path = os.path.join(spill_dir, f'{len(paths):06d}.pkl')
+        with open(path, 'wb') as file:
+            pickle.dump(chunk, file, protocol=pickle.HIGHEST_PROTOCOL)
+        paths.append(path)
+    return paths
+
+
+def mode_of(counts):
+    '''
+    Most frequent value of value counts, ties broken like Series.mode()[0]. None without values.
+    '''
+    if counts is None or counts.empty:
+        return None
+    tied = counts[counts == counts.max()].index
+    return pd.Series(tied).mode()[0]
+
+
+def fill_values(stats):
+    '''
+    Values of the imputations of pipeline.impute and pipeline.add_geography, from the first pass counts.
+    '''
+    fills = {column: mode_of(stats.counts.get(column)) for column in MODE_COLUMNS}
+    fills['Age'] = int(stats.age_sum / stats.age_count) if stats.age_count else None
+
+    times = stats.times if stats.times is not None else pd.Series(dtype=np.int64)
+    countries = pd.DataFrame({'Country': times.index.get_level_values(0) if len(times) else []}, dtype=object)
+    countries = f.location_cleaned(countries.fillna({'Country': fills['Country']}))
+    has_ocean = geo_index.enrich(countries, 'Country', 'Ocean_Sea', None)['Ocean_Sea'].notna().to_numpy()
+    fills['Time'] = mode_of(times[has_ocean].groupby(level='Time').sum()) if len(times) else None
+    return fills
+
+
+def fill_chunk(chunk, fills):
+    '''
+    The imputations and the geography of a filtered chunk, with the fill values of the whole data.
+    '''
+    def fill(df, columns):
+        values = {column: fills[column] for column in columns if fills[column] is not None}
+        return df.fillna(values) if values else df
+
+    df = fill(chunk, ['Type', 'Country', 'State'])
+    df = f.location_cleaned(df)
+    df = fill(df, ['Location', 'Activity'])
+
+    cleaned = ['Sex', 'Age', 'Injury', 'Species', 'Time']
+    others = df.columns.difference(cleaned)
+    df[others] = df[others].fillna('undefined')
+    if fills['Age'] is not None:
+        df['Age'] = df['Age'].fillna(fills['Age']).astype(int)
+
+    df = geo_index.enrich(df, 'Country', 'Ocean_Sea', 'Continent')
+    df = df.dropna(subset=['Ocean_Sea'])
+    df = fill(df, ['Time'])
+    return f.compact_dtypes(df.dropna(subset=['Continent']))
+
+
+def load_spilled(paths):
+    for path in paths:
+        with open(path, 'rb') as file:
+            yield pickle.load(file)
+        os.remove(path)
+
+
+def output_schema(table):
+    '''
+    Schema of the first chunk with every categorical as a dictionary of 32-bit codes, which fits the
+    categories of any chunk.
+    '''
+    fields = [field.with_type(pa.dictionary(pa.int32(), pa.large_string())) if pa.types.is_dictionary(field.type) else field
+              for field in table.schema]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def write_chunks(chunks, output, cube_output=None):
+    '''
+    Append the cleaned chunks to a Parquet file with the CLEANED_SCHEMA types, and sum their cubes.
+
+    Returns:
+    int: Number of rows written.
+    '''
+    written = 0
+    writer = None
+    total = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(f.apply_cleaned_schema(chunk).reset_index(drop=True), preserve_index=False)
+            if writer is None:
+                schema = output_schema(table)
+                writer = pq.ParquetWriter(output + '.tmp', schema)
+            writer.write_table(table.cast(schema))
+            if cube_output:
+                total = cube.build_cube(chunk) if total is None else cube.combine_cubes([total, cube.build_cube(chunk)])
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(output + '.tmp', output)
+    if total is not None:
+        cube.save_cube(total, cube_output)
+    return written
+
+
+def run_streaming(source, output=pipeline.OUTPUT, cube_output=pipeline.CUBE_OUTPUT, chunk_rows=CHUNK_ROWS, workers=1,
+                  spill_dir=None, verbose=True):
+    '''
+    Clean a raw extract chunk by chunk, with the same result as run_pipeline on the whole extract.
+
+    Args:
+    source (str): Raw Parquet or CSV file with the columns of GSAF5.xls.
+    output (str): Parquet file to write the cleaned data to.
+    cube_output (str): Parquet file to write the aggregation cube to (None to skip).
+    chunk_rows (int): Rows read at a time.
+    workers (int): Processes cleaning the columns of a chunk at the same time.
+    spill_dir (str): Folder for the temporary chunks between the passes, defaults to the system one.
+    verbose (bool): Print the counts of the run.
+
+    Returns:
+    SimpleNamespace: Rows read, duplicates, rows written, rows rejected by the Species filter and fill values.
+    '''
+    start = time.perf_counter()
+    stats = SimpleNamespace(rows_read=0, duplicates=0, counts={}, age_sum=0.0, age_count=0, times=None, rejected={})
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=spill_dir) as spill, pipeline.worker_pool(workers) as pool:
+        chunks = clean_chunks(unique_rows(read_chunks(source, chunk_rows), stats), pool)
+        paths = first_pass(chunks, spill, stats)
+        fills = fill_values(stats)
+        written = write_chunks((fill_chunk(chunk, fills) for chunk in load_spilled(paths)), output, cube_output)
+
+    report = SimpleNamespace(rows_read=stats.rows_read, duplicates=stats.duplicates, rows_written=written,
+                             rejected=stats.rejected, fills=fills)
+    if verbose:
+        print(f'{report.rows_read} rows read, {report.duplicates} duplicates, {report.rows_written} rows written '
+              f'in {time.perf_counter() - start:.1f}s')
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean a raw extract larger than memory chunk by chunk.')
+    parser.add_argument('source', help='raw Parquet or CSV file with the columns of GSAF5.xls')
+    parser.add_argument('-o', '--output', default=pipeline.OUTPUT, help='cleaned Parquet file')
+    parser.add_argument('--cube', default=pipeline.CUBE_OUTPUT, help='aggregation cube Parquet file')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_ROWS, help='rows read at a time')
+    parser.add_argument('--workers', type=int, default=1, help='processes cleaning the columns of a chunk')
+    parser.add_argument('--spill-dir', help='folder for the temporary chunks')
+    args = parser.parse_args()
+
+    run_streaming(args.source, args.output, args.cube, args.chunk_size, args.workers, args.spill_dir)
@@ -0,0 +1,353 @@
+# Seeded generator of messy GSAF-style raw data for load tests
+#
+# Run from the notebooks folder:
+#   python synthetic.py 5000000 synthetic.parquet      (or .csv)
+#
+# Rows are sampled from the cleaned data, so the joint distribution of year, month, country,
+# activity, sex, age, time of day and species is the real one. Each value is then written back in
+# one of the raw forms the cleaners of functions.py handle: the date forms of clean_date, the age
+# texts of AGE_TEXT, the time phrases of clean_time_format, the species keywords and descriptions,
+# and the country names of geo_index, plus empty cells and rows the pipeline drops. The output has
+# the columns of the raw GSAF5.xls spreadsheet and is written chunk by chunk.
+
+import argparse
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+import functions as f
+import geo_index
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLEANED = os.path.join(HERE, 'cleaned_data.parquet')
+
+RAW_COLUMNS = ['Date', 'Year', 'Type', 'Country', 'State', 'Location', 'Activity', 'Name', 'Sex', 'Age', 'Injury',
+               'Unnamed: 11', 'Time', 'Species ', 'Source', 'pdf', 'href formula', 'href', 'Case Number',
+               'Case Number.1', 'original order', 'Unnamed: 21', 'Unnamed: 22']
+
+# Approximate share of empty cells per column in the raw spreadsheet. The pipeline fills the empty
+# cells of some columns with their mode (the mean for Age): those are only emptied in rows holding
+# the mode, and no more than keeps it the mode, so the cleaned output keeps the real distribution. Rows with an empty Sex or Species are
+# dropped by the pipeline, so any row can lose them. Cells the pipeline set to 'undefined' are empty.
+MISSING = {'Type': 0.005, 'State': 0.07, 'Location': 0.08, 'Activity': 0.08, 'Age': 0.43, 'Time': 0.5,
+           'Sex': 0.08, 'Species': 0.45}
+FILLED_WITH_MODE = ['Type', 'State', 'Location', 'Activity', 'Age', 'Time']
+
+# Share of values written in a messy form (text ages, keyword times, odd spacing...) instead of the plain one
+NOISE = 0.1
+
+# Share of rows the pipeline drops: no usable date, unknown country or undefined sex
+UNDATED = 0.02
+UNKNOWN_COUNTRY = 0.01
+UNDEFINED_SEX = 0.005
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+               'October', 'November', 'December']
+
+# (weight, form) of the dates; 'excel' is a datetime as read_excel returns it, written as EXCEL_TEXT
+# in the CSV and Parquet files (their ISO text, '2002-03-25 00:00:00', is not a form clean_date reads)
+DATE_FORMS = [
+    (0.35, 'excel'),
+    (0.30, '{day:02d} {mon} {year}'),
+    (0.08, '{day:02d}-{mon}-{year}'),
+    (0.05, '{day:02d} {mon}-{year}'),
+    (0.04, '{day:02d}-{mon}-{yy:02d}'),
+    (0.03, '{mon}-{day:02d}-{year}'),
+    (0.05, 'Reported {day:02d} {mon} {year}'),
+    (0.04, '{month_name} {year}'),
+    (0.03, '{year}'),
+    (0.03, 'Ca. {year}'),
+]
+EXCEL_TEXT = '%d-%b-%Y'
+UNDATED_VALUES = ['No date', 'World War II', 'During the war', 'Before the war', 'Said to be 1880s', 'Late 1960s']
+
+UNCONFIRMED_TYPES = ['Questionable', 'Invalid', 'Unverified', 'Under investigation']
+UNDEFINED_SEXES = ['lli', 'N', '.']
+
+# Hours of each time of day (categorize_time boundaries) and the written forms of an hour
+TIME_HOURS = {'Morning': range(6, 12), 'Afternoon': range(12, 18), 'Night': list(range(18, 24)) + list(range(0, 6))}
+TIME_FORMS = ['{hour:02d}h{minute:02d}', '{hour:02d}h{minute:02d}', '{hour:02d}{minute:02d}hr', '{hour}h', '{hour:02d}h00']
+UNKNOWN_TIMES = ['Not stated', 'Not advised', '?']
+
+
+def _chooser(rng, rows):
+    # Boolean mask of rows chosen with a probability
+    return lambda share: rng.random(rows) < share
+
+
+def _time_phrases():
+    # Keyword phrases of each time of day, written as in the spreadsheet
+    phrases = {}
+    for label, lower, original in f._TIME_KEYWORDS:
+        if label in TIME_HOURS:
+            candidates = [phrase.capitalize() for phrase in lower] + original
+            classified = f.classify_time(pd.Series(candidates, dtype=object))
+            phrases[label] = [phrase for phrase, got in zip(candidates, classified) if got == label]
+    return phrases
+
+
+def _species_forms():
+    # Raw descriptions of each species: '<keyword> shark' and the exact descriptions, kept only
+    # when normalize_species gives the species back
+    candidates = {}
+    for keyword, species in f.SPECIES_KEYWORDS.items():
+        if keyword.isalpha():
+            candidates.setdefault(species, []).append(f'{keyword.capitalize()} shark')
+    for description, species in f.SPECIES_BY_DESCRIPTION.items():
+        candidates.setdefault(species, []).append(description)
+    forms = {}
+    for species, values in candidates.items():
+        normalized = f.normalize_species(pd.Series(values, dtype=object))
+        forms[species] = [value for value, got in zip(values, normalized) if got == species]
+    return {species: values for species, values in forms.items() if values}
+
+
+def load_vocabulary(path=CLEANED):
+    '''
+    Cleaned rows to sample from and the raw vocabularies of functions.py.
+    '''
+    clean = f.load_cleaned(path, ['Date', 'Type', 'Country', 'State', 'Location', 'Activity', 'Name', 'Sex', 'Age',
+                                  'Injury', 'Time', 'Species', 'Source'])
+    modes = {}
+    for column in FILLED_WITH_MODE:
+        shares = clean[column].value_counts(normalize=True)
+        modes[column] = (shares.index[0], shares.iloc[0], shares.iloc[1] if len(shares) > 1 else 0)
+    return {
+        'clean': clean,
+        'modes': modes,
+        'age_texts': list(f.AGE_LOOKUP),
+        'time_phrases': _time_phrases(),
+        'species_forms': _species_forms(),
+        'species_rejected': [value for value in f.SPECIES_TO_NA if value.strip()],
+        'countries': sorted(geo_index.COUNTRIES_OCEANS),
+    }
+
+
+def _dates(dates, rng, choose):
+    weights = np.array([weight for weight, _ in DATE_FORMS])
+    forms = rng.choice(len(DATE_FORMS), len(dates), p=weights / weights.sum())
+    values = []
+    for date, form in zip(dates, forms):
+        form = DATE_FORMS[form][1]
+        if form == 'excel':
+            values.append(date.to_pydatetime())
+            continue
+        if '{yy' in form and date.year < 2000:
+            form = '{day:02d} {mon} {year}'
+        values.append(form.format(day=date.day, mon=MONTHS[date.month - 1], month_name=MONTH_NAMES[date.month - 1],
+                                  year=date.year, yy=date.year % 100))
+    values = pd.Series(values, dtype=object)
+    undated = choose(UNDATED)
+    values[undated] = rng.choice(UNDATED_VALUES, undated.sum())
+    return values
+
+
+def _types(types, rng, choose):
+    values = types.astype(object).copy()
+    unconfirmed = (values == 'Unconfirmed').to_numpy() & ~choose(0.1)
+    values[unconfirmed] = rng.choice(UNCONFIRMED_TYPES, unconfirmed.sum())
+    spaced = (values == 'Provoked').to_numpy() & choose(NOISE)
+    values[spaced] = ' Provoked'
+    values[choose(0.003)] = '?'
+    return values
+
+
+def _countries(countries, vocabulary, rng, choose):
+    values = countries.astype(str).str.upper().astype(object)
+    messy = choose(NOISE)
+    values[messy] = values[messy] + rng.choice([' ', '?', ''], messy.sum())
+    other = choose(0.01)
+    values[other] = [country.upper() for country in rng.choice(vocabulary['countries'], other.sum())]
+    unknown = choose(UNKNOWN_COUNTRY)
+    values[unknown] = rng.choice(['AT SEA', 'OCEAN', 'Between PORTUGAL & INDIA', 'DIEGO GARCIA?'], unknown.sum())
+    return values
+
+
+def _sexes(sexes, rng, choose):
+    values = sexes.astype(object).copy()
+    messy = (values == 'M').to_numpy() & choose(0.01)
+    values[messy] = rng.choice([' M', 'M ', 'M x 2'], messy.sum())
+    undefined = choose(UNDEFINED_SEX)
+    values[undefined] = rng.choice(UNDEFINED_SEXES, undefined.sum())
+    return values
+
+
+def _ages(ages, vocabulary, rng, choose):
+    # clean_age only reads ages written as plain numeric text; numbers stored as numbers, text ages and
+    # padded numbers are filled with the mean like empty cells, so they only replace the mode
+    ages = ages.to_numpy(dtype=np.int64)
+    values = pd.Series(ages.astype(str), dtype=object)
+    unreadable = np.flatnonzero((ages == vocabulary['modes']['Age'][0]) & choose(0.2))
+    forms = rng.integers(0, 3, len(unreadable))
+    numbers = rng.integers(5, 70, len(unreadable))
+    texts = rng.choice(vocabulary['age_texts'], len(unreadable))
+    values[unreadable] = [int(number) if form == 0 else text if form == 1 else f' {number}'
+                          for form, number, text in zip(forms, numbers, texts)]
+    return values
+
+
+def _times(times, vocabulary, rng, choose):
+    labels = times.astype(str).to_numpy()
+    values = pd.Series(np.nan, index=range(len(labels)), dtype=object)
+    minutes = rng.integers(0, 60, len(labels))
+    forms = rng.integers(0, len(TIME_FORMS), len(labels))
+    phrase = choose(2 * NOISE)
+    for label, hours in TIME_HOURS.items():
+        rows = np.flatnonzero(labels == label)
+        drawn = rng.choice(np.array(hours), len(rows))
+        values[rows] = [TIME_FORMS[form].format(hour=hour, minute=minute)
+                        for hour, minute, form in zip(drawn, minutes[rows], forms[rows])]
+        phrases = np.flatnonzero(phrase & (labels == label))
+        values[phrases] = rng.choice(vocabulary['time_phrases'][label], len(phrases))
+    unknown = choose(0.05)
+    values[unknown] = rng.choice(UNKNOWN_TIMES, unknown.sum())
+    return values
+
+
+def _species(species, vocabulary, rng, choose):
+    names = species.astype(str).to_numpy()
+    values = pd.Series(names, dtype=object)
+    for name, forms in vocabulary['species_forms'].items():
+        rows = np.flatnonzero(names == name)
+        values[rows] = rng.choice(forms, len(rows))
+    # Some keyword forms get a length, e.g. '4m white shark'
+    sized = np.flatnonzero(values.str.endswith(' shark').to_numpy(dtype=bool) & choose(0.3))
+    values[sized] = [f'{length}m {value.lower()}' for length, value in zip(rng.integers(1, 6, len(sized)), values[sized])]
+    rejected = choose(0.03)
+    values[rejected] = rng.choice(vocabulary['species_rejected'], rejected.sum())
+    return values
+
+
+def generate_chunk(vocabulary, rows, rng, start=0):
+    '''
+    Generate rows of raw data.
+
+    Args:
+    vocabulary (dict): From load_vocabulary.
+    rows (int): Number of rows.
+    rng (np.random.Generator): Source of randomness.
+    start (int): Number of the first row (the 'original order' column).
+
+    Returns:
+    pd.DataFrame: The rows with RAW_COLUMNS.
+    '''
+    clean = vocabulary['clean']
+    sample = clean.iloc[rng.integers(0, len(clean), rows)].reset_index(drop=True)
+    choose = _chooser(rng, rows)
+
+    raw = pd.DataFrame({
+        'Date': _dates(sample['Date'], rng, choose),
+        'Year': sample['Date'].dt.year.astype(float),
+        'Type': _types(sample['Type'], rng, choose),
+        'Country': _countries(sample['Country'], vocabulary, rng, choose),
+        'State': sample['State'].astype(object),
+        'Location': sample['Location'].astype(object),
+        'Activity': sample['Activity'].astype(object),
+        'Name': sample['Name'].astype(object),
+        'Sex': _sexes(sample['Sex'], rng, choose),
+        'Age': _ages(sample['Age'], vocabulary, rng, choose),
+        'Injury': sample['Injury'].astype(object),
+        'Time': _times(sample['Time'], vocabulary, rng, choose),
+        'Species': _species(sample['Species'], vocabulary, rng, choose),
+        'Source': sample['Source'].astype(object),
+    })
+    raw['Unnamed: 11'] = np.where(raw['Injury'].str.contains('fatal', case=False, na=False), 'Y', 'N')
+
+    for column, share in MISSING.items():
+        if column in FILLED_WITH_MODE:
+            mode, mode_share, second_share = vocabulary['modes'][column]
+            share = min(share, 0.9 * (mode_share - second_share))
+            empty = (sample[column] == mode).to_numpy(dtype=bool) & choose(share / mode_share)
+        else:
+            empty = choose(share)
+        raw.loc[empty, column] = np.nan
+    for column in ['State', 'Location', 'Activity', 'Name', 'Injury', 'Source']:
+        raw.loc[(sample[column] == 'undefined').to_numpy(dtype=bool), column] = np.nan
+    messy = choose(NOISE)
+    raw.loc[messy, 'Activity'] = raw.loc[messy, 'Activity'].str.lower()
+
+    case = pd.Series([f'{date.year}.{date.month:02d}.{date.day:02d}' for date in sample['Date']], dtype=object)
+    raw['Case Number'] = case
+    raw['Case Number.1'] = case
+    raw['pdf'] = case + '-' + sample['Name'].astype(str).str.replace(' ', '', regex=False) + '.pdf'
+    raw['href formula'] = 'http://sharkattackfile.net/spreadsheets/pdf_directory/' + raw['pdf']
+    raw['href'] = raw['href formula']
+    raw['original order'] = np.arange(start + 1, start + rows + 1, dtype=float)
+    raw['Unnamed: 21'] = np.nan
+    raw['Unnamed: 22'] = np.nan
+    return raw.rename(columns={'Species': 'Species '})[RAW_COLUMNS]
+
+
+def generate(rows, chunk_size=100_000, seed=0, path=CLEANED):
+    '''
+    Yield rows of raw data chunk by chunk. Chunk i is drawn from the seed (seed, i), so the output
+    only depends on the seed, the number of rows and the chunk size.
+    '''
+    vocabulary = load_vocabulary(path)
+    for number, start in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng([seed, number])
+        yield generate_chunk(vocabulary, min(chunk_size, rows - start), rng, start)
+
+
+def with_text_dates(chunk):
+    '''
+    Chunk with the datetimes of the Date column written as EXCEL_TEXT.
+    '''
+    dates = chunk['Date']
+    is_datetime = dates.map(lambda value: isinstance(value, datetime.datetime)).astype(bool)
+    return chunk.assign(Date=dates.where(~is_datetime, dates[is_datetime].map(lambda value: value.strftime(EXCEL_TEXT))))
+
+
+def to_text(chunk):
+    '''
+    Chunk with every column except Year and original order as text, the schema of the Parquet output.
+    '''
+    chunk = with_text_dates(chunk)
+    for column in RAW_COLUMNS:
+        if column not in ('Year', 'original order'):
+            values = chunk[column]
+            chunk[column] = values.where(values.isna(), values.astype(str)).astype('string[pyarrow]')
+    return chunk
+
+
+def write(path, rows, chunk_size=100_000, seed=0, source=CLEANED):
+    '''
+    Stream generated rows to a CSV or Parquet file (by extension) without holding them in memory.
+
+    Returns:
+    int: Number of rows written.
+    '''
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = 0
+    writer = None
+    try:
+        for chunk in generate(rows, chunk_size, seed, source):
+            if path.endswith('.parquet'):
+                table = pa.Table.from_pandas(to_text(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                with_text_dates(chunk).to_csv(path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate messy GSAF-style raw data.')
+    parser.add_argument('rows', type=int, help='number of rows')
+    parser.add_argument('output', help='output .csv or .parquet file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(write(args.output, args.rows, args.chunk_size, args.seed), 'rows written to', args.output)
@@ -0,0 +1,180 @@
+# Prefix-sum index of the incidents over time
+#
+# Cumulative counts per Year and per Year x Month (optionally split by the values of one dimension),
+# so the number of incidents of any year range, month range or window is the difference of two
+# entries: O(1) per query whatever the size of the data.
+#
+#   index = time_index.build_time_index(df_cleaned)
+#   time_index.count_years(index, 2014, 2023)
+#   time_index.seasonality(index, 2000, 2024)
+#   time_index.add_incidents(index, new_rows)
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+
+def _prefix(counts, axis=-1):
+    # Cumulative sums with a leading 0, so the count of [a, b) is prefix[b] - prefix[a]
+    shape = list(counts.shape)
+    shape[axis] = 1
+    return np.concatenate([np.zeros(shape, dtype=np.int64), np.cumsum(counts, axis=axis, dtype=np.int64)], axis=axis)
+
+
+def _counts(years, months, codes, first_year, n_years, n_values):
+    # Incidents per (value, year, month) in one bincount
+    flat = (codes * n_years + (years - first_year)) * 12 + (months - 1)
+    return np.bincount(flat, minlength=n_values * n_years * 12).reshape(n_values, n_years, 12)
+
+
+def _columns(df, by, values=None):
+    # Years, months and dimension codes of the rows; unseen values of the dimension are appended to values
+    keep = df['Year'].notna() & df['Month'].notna()
+    years = df.loc[keep, 'Year'].to_numpy(dtype=np.int64)
+    months = df.loc[keep, 'Month'].to_numpy(dtype=np.int64)
+    if by is None:
+        return years, months, np.zeros(len(years), dtype=np.int64), values
+    column = df.loc[keep, by].astype(str)
+    unseen = sorted(set(column.unique()) - set([] if values is None else values))
+    values = pd.Index(unseen) if values is None else values.append(pd.Index(unseen))
+    return years, months, values.get_indexer(column), values
+
+
+def _index(counts, first_year, by, values):
+    # counts: (values, years, months) -> every prefix sum used by the queries
+    index = SimpleNamespace(first_year=first_year, by=by, values=values, counts=counts)
+    index.last_year = first_year + counts.shape[1] - 1
+    index.years = _prefix(counts.sum(axis=2))
+    index.months = _prefix(counts.reshape(counts.shape[0], -1))
+    index.seasons = _prefix(counts, axis=1)
+    return index
+
+
+def build_time_index(df, by=None):
+    '''
+    Build the prefix sums of the incidents per Year and Year x Month.
+
+    Args:
+    df (pd.DataFrame): The cleaned data (numeric Year and Month columns).
+    by (str): Optional column to also split the counts by its values.
+
+    Returns:
+    SimpleNamespace: first_year, last_year, values of by and the prefix sums.
+    '''
+    years, months, codes, values = _columns(df, by)
+    first_year, last_year = int(years.min()), int(years.max())
+    n_values = 1 if values is None else len(values)
+    counts = _counts(years, months, codes, first_year, last_year - first_year + 1, n_values)
+    return _index(counts, first_year, by, values)
+
+
+def add_incidents(index, df):
+    '''
+    Add new incidents to an index. When they fit in its years and values, the counts are updated in place
+    and only the prefix sums from the first year of the new rows on are recomputed; otherwise the index
+    grows to cover them.
+
+    Returns:
+    SimpleNamespace: The updated index.
+    '''
+    years, months, codes, values = _columns(df, index.by, index.values)
+    if len(years) == 0:
+        return index
+
+    before = max(index.first_year - int(years.min()), 0)
+    after = max(int(years.max()) - index.last_year, 0)
+    new_values = 0 if values is None else len(values) - len(index.values)
+    first_year = index.first_year - before
+    n_values, n_years = index.counts.shape[0] + new_values, index.counts.shape[1] + before + after
+    added = _counts(years, months, codes, first_year, n_years, n_values)
+    if before or after or new_values:
+        counts = np.pad(index.counts, ((0, new_values), (before, after), (0, 0))) + added
+        return _index(counts, first_year, index.by, values)
+
+    counts = index.counts
+    counts += added
+    start = int(years.min()) - first_year
+    index.years[:, start + 1:] = index.years[:, start:start + 1] + np.cumsum(counts[:, start:].sum(axis=2), axis=1)
+    flat = counts.reshape(n_values, -1)
+    index.months[:, start * 12 + 1:] = index.months[:, start * 12:start * 12 + 1] + np.cumsum(flat[:, start * 12:], axis=1)
+    index.seasons[:, start + 1:] = index.seasons[:, start:start + 1] + np.cumsum(counts[:, start:], axis=1)
+    return index
+
+
+def _row(index, value):
+    if value is None:
+        return slice(None)
+    return index.values.get_loc(str(value))
+
+
+def _year_position(index, year):
+    return min(max(year - index.first_year, 0), index.last_year - index.first_year + 1)
+
+
+def count_years(index, first, last, value=None):
+    '''
+    Number of incidents from year first to year last (both included), for one value of the
+    dimension or in total.
+    '''
+    start, stop = _year_position(index, first), _year_position(index, last + 1)
+    total = index.years[_row(index, value), max(stop, start)] - index.years[_row(index, value), start]
+    return int(np.sum(total))
+
+
+def count_months(index, first, last, value=None):
+    '''
+    Number of incidents from (year, month) first to (year, month) last, both included.
+    '''
+    def position(year, month):
+        return min(max((year - index.first_year) * 12 + month - 1, 0), index.months.shape[1] - 1)
+
+    start, stop = position(*first), position(last[0], last[1] + 1)
+    total = index.months[_row(index, value), max(stop, start)] - index.months[_row(index, value), start]
+    return int(np.sum(total))
+
+
+def year_counts(index, first=None, last=None, value=None):
+    '''
+    Incidents per year of a range (the whole index by default) as a Series.
+    '''
+    first = index.first_year if first is None else first
+    last = index.last_year if last is None else last
+    prefix = index.years[_row(index, value)]
+    prefix = prefix.sum(axis=0) if prefix.ndim > 1 else prefix
+    positions = [_year_position(index, year) for year in range(first, last + 2)]
+    return pd.Series(np.diff(prefix[positions]), index=pd.RangeIndex(first, last + 1, name='Year'), name='count')
+
+
+def sliding_windows(index, size, value=None):
+    '''
+    Incidents of every window of size consecutive years, indexed by the last year of the window.
+    '''
+    prefix = index.years[_row(index, value)]
+    prefix = prefix.sum(axis=0) if prefix.ndim > 1 else prefix
+    return pd.Series(prefix[size:] - prefix[:-size],
+                     index=pd.RangeIndex(index.first_year + size - 1, index.last_year + 1, name='Year'), name='count')
+
+
+def trend(index, last, size=10, value=None):
+    '''
+    Incidents of the size years ending in last against the size years before them.
+
+    Returns:
+    tuple: (current window, previous window, relative change or None if the previous window is empty).
+    '''
+    current = count_years(index, last - size + 1, last, value)
+    previous = count_years(index, last - 2 * size + 1, last - size, value)
+    return current, previous, (current - previous) / previous if previous else None
+
+
+def seasonality(index, first=None, last=None, value=None):
+    '''
+    Incidents per month of the year over a year range (the whole index by default).
+    '''
+    first = index.first_year if first is None else first
+    last = index.last_year if last is None else last
+    start, stop = _year_position(index, first), _year_position(index, last + 1)
+    seasons = index.seasons[_row(index, value), max(stop, start)] - index.seasons[_row(index, value), start]
+    seasons = seasons.sum(axis=0) if seasons.ndim > 1 else seasons
+    return pd.Series(seasons, index=pd.RangeIndex(1, 13, name='Month'), name='count')
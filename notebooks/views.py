@@ -0,0 +1,132 @@
+# Read-only Arrow table of the cleaned data and filtered views over it
+#
+# The table is loaded once per process (the Streamlit app keeps it in a resource cache shared by
+# every session). It is sorted by Year, so a year range is a zero-copy slice; the other filters give
+# an array of row numbers into that slice (resolved with a bitmap_index of the table when one is given).
+# Only the rows shown on screen are ever materialized.
+
+from collections import namedtuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import bitmap_index
+
+
+# Rows of a view: a slice of the table (zero-copy) and the row numbers selected in it (None for all)
+View = namedtuple('View', ['rows', 'selected'])
+
+
+def load_table(path, columns=None):
+    '''
+    Read the cleaned Parquet file into an Arrow table sorted by Year.
+
+    Args:
+    path (str): The Parquet file written by functions.write_cleaned.
+    columns (list): Columns to read, None for all.
+
+    Returns:
+    pa.Table: The table, to be shared read-only.
+    '''
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.sort_by([('Year', 'ascending')]).combine_chunks()
+
+
+def year_bounds(table, years=None):
+    '''
+    First and past-the-end rows of a year range (both years included) in the table.
+    '''
+    if years is None:
+        return 0, table.num_rows
+    year = table.column('Year').chunk(0).to_numpy(zero_copy_only=False)
+    start, stop = np.searchsorted(year, [years[0], years[1] + 1])
+    return int(start), int(stop)
+
+
+def year_slice(table, years=None):
+    '''
+    Zero-copy slice of the table with the rows of a year range, both years included.
+    '''
+    start, stop = year_bounds(table, years)
+    return table.slice(start, stop - start)
+
+
+def load_index(table):
+    '''
+    Bitmap index of the categorical columns of a table from load_table.
+    '''
+    columns = [column for column in bitmap_index.BITMAP_COLUMNS if column != 'Ocean_Sea'] + ['Country']
+    return bitmap_index.build_index(table.select(list(dict.fromkeys(columns))).to_pandas())
+
+
+def column_matches(column, values):
+    '''
+    Boolean mask of the rows of a column with one of the values. Categorical columns are matched
+    on their dictionary and compared by code, so the strings of the column are never read.
+    '''
+    column = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    if pa.types.is_dictionary(column.type):
+        wanted = pc.is_in(column.dictionary, value_set=pa.array(values, column.dictionary.type))
+        codes = np.flatnonzero(wanted.to_numpy(zero_copy_only=False))
+        return np.isin(column.indices.to_numpy(zero_copy_only=False), codes) & column.is_valid().to_numpy(zero_copy_only=False)
+    return pc.is_in(column, value_set=pa.array(values, column.type)).to_numpy(zero_copy_only=False)
+
+
+def filter_view(table, years=None, index=None, **selections):
+    '''
+    Rows of the table inside a year range and matching the selected values, without copying the table.
+
+    Args:
+    table (pa.Table): The table from load_table.
+    years (tuple): (first, last) year, both included. None keeps every year.
+    index (SimpleNamespace): Bitmap index from load_index, used for the columns it covers.
+    selections: Column -> list of values to keep, an empty list or None keeps every value.
+
+    Returns:
+    View: The year slice and the selected row numbers in it.
+    '''
+    start, stop = year_bounds(table, years)
+    rows = table.slice(start, stop - start)
+    if index is not None and any(selections.values()):
+        indexed = {column: values for column, values in selections.items() if column in index.bitmaps}
+        selected = bitmap_index.rows(bitmap_index.select(index, **indexed), index.rows)
+        selected = selected[(selected >= start) & (selected < stop)] - start
+        mask = np.zeros(rows.num_rows, dtype=bool)
+        mask[selected] = True
+        for column, values in selections.items():
+            if values and column not in index.bitmaps:
+                mask &= column_matches(rows.column(column), values)
+        return View(rows, np.flatnonzero(mask))
+    mask = None
+    for column, values in selections.items():
+        if values:
+            matches = column_matches(rows.column(column), values)
+            mask = matches if mask is None else mask & matches
+    if mask is None:
+        return View(rows, None)
+    return View(rows, np.flatnonzero(mask))
+
+
+def view_count(view):
+    return view.rows.num_rows if view.selected is None else len(view.selected)
+
+
+def view_page(view, start=0, size=100, columns=None):
+    '''
+    Materialize some rows of a view as a DataFrame.
+
+    Args:
+    view (View): The view from filter_view.
+    start (int): First row of the page.
+    size (int): Number of rows.
+    columns (list): Columns to include, None for all.
+
+    Returns:
+    pd.DataFrame: The rows of the page.
+    '''
+    rows = view.rows if columns is None else view.rows.select(columns)
+    if view.selected is None:
+        return rows.slice(start, size).to_pandas()
+    return rows.take(view.selected[start:start + size]).to_pandas()
@@ -1,38 +1,90 @@
 import streamlit as st
-import pandas as pd
 import os
+import sys
+import time
 
-# Load data
-@st.cache_data
-def load_data():
-    # Use a relative path
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'notebooks', 'cleaned_data.csv')
-    return pd.read_csv(file_path)
+# Modules of the notebooks folder (aggregation cube)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'notebooks'))
+
+# pandas and the notebooks modules are imported by the data-driven sections the first time they are
+# opened, so a cold start of the static sections only pays for Streamlit
 
-df_cleaned = load_data()
+# Load data: one read-only Arrow table per process, shared by every session (filtered views never copy it)
+@st.cache_resource
+def load_dataset():
+    import views
+    # Use a relative path
+    file_path = os.path.join(os.path.dirname(__file__), '..', 'notebooks', 'cleaned_data.parquet')
+    return views.load_table(file_path)
+
+# Bitmap index of the categorical columns of the dataset, also shared by every session
+@st.cache_resource
+def load_bitmaps():
+    import views
+    return views.load_index(load_dataset())
+
+# Aggregation cube written by notebooks/pipeline.py, loaded once per process and shared by every session
+@st.cache_resource
+def load_cube():
+    import cube as cube_module
+    file_path = os.path.join(os.path.dirname(__file__), '..', 'notebooks', 'cleaned_cube.parquet')
+    return cube_module.load_cube(file_path)
+
+# Rows and columns of the incidents table of the Visualizations section
+INCIDENTS_SHOWN = 100
+INCIDENT_COLUMNS = ['Date', 'Country', 'Location', 'Activity', 'Sex', 'Age', 'Species', 'Injury']
+
+# Widths of the pre-downscaled images (twice the width of the page and of the sidebar, for high-density screens)
+MAIN_WIDTH = 1408
+SIDEBAR_WIDTH = 600
+
+def downscale(data, width):
+    from PIL import Image
+    import io
+    image = Image.open(io.BytesIO(data))
+    if image.width <= width:
+        return data
+    image_format = image.format
+    image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **({'quality': 85} if image_format == 'JPEG' else {}))
+    return min(data, buffer.getvalue(), key=len)
+
+# Bytes of the images and the video (None if the file is missing), read once per process and
+# shared by every session and rerun. With a width, images wider than it are downscaled once.
+@st.cache_resource
+def load_asset(name, width=None):
+    path = os.path.join(os.path.dirname(__file__), 'images', name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        data = file.read()
+    if width:
+        data = downscale(data, width)
+    return data
 
 # Application title
 st.title('Shark Data Analysis')
 
 
 # Add image to the main page
-main_image_path = os.path.join(os.path.dirname(__file__), 'images', 'nemo.jpg')
-if os.path.exists(main_image_path):
-    st.image(main_image_path, caption='Shark Data Analysis')
+main_image = load_asset('nemo.jpg', MAIN_WIDTH)
+if main_image is not None:
+    st.image(main_image, caption='Shark Data Analysis')
 
 # Navigation menu
 st.sidebar.title('Navigation Menu')
 
 # Add image to the sidebar
-sidebar_image_path = os.path.join(os.path.dirname(__file__), 'images', 'nemo.png')
-if os.path.exists(sidebar_image_path):
-    st.sidebar.image(sidebar_image_path, caption='Navigation Menu')
+sidebar_image = load_asset('nemo.png', SIDEBAR_WIDTH)
+if sidebar_image is not None:
+    st.sidebar.image(sidebar_image, caption='Navigation Menu')
 
 # Button to go to the GitHub repository
 if st.sidebar.button('Go to GitHub Repository'):
     st.sidebar.markdown("[GitHub Repository](https://github.com/Jotis86/Shark-Analysis-Project)")
 
-menu = st.sidebar.radio('Select a section:', ['Project Objectives', 'Development Process', 'Visualizations', 'Power BI', 'Final Conclusions', 'Recommendations'])
+menu = st.sidebar.radio('Select a section:', ['Project Objectives', 'Development Process', 'Visualizations', 'Power BI', 'Final Conclusions', 'Recommendations'], key='menu')
 
 if menu == 'Project Objectives':
     st.header('Project Objectives 🎯')
@@ -89,29 +141,64 @@ elif menu == 'Development Process':
 
 elif menu == 'Visualizations':
     st.header('Visualizations 📊')
-    st.write("Select a chart from the menu on the left to view it.")
-    
-    # Chart selection menu
-    options = {
-        'Age Range Distribution': 'age.png',
-        'Gender Distribution': 'sex.png',
-        'Top 5 Activities with Most Attacks': 'activities.png',
-        'Top 10 Most Common Shark Types': 'sharks.png',
-        'Frequency of Oceans and Seas': 'ocean.png',
-        'Time Distribution': 'time.png',
-        'Monthly Attack Distribution': 'month.png',
-        'Number of Attacks in the Last 10 Years': 'years.png',
-        'Continent Attack Distribution': 'continent.png'
-    }
-
-    selected_option = st.sidebar.radio('Select a chart', list(options.keys()))
-
-    if selected_option:
-        image_path = os.path.join(os.path.dirname(__file__), 'images', options[selected_option])
-        if os.path.exists(image_path):
-            st.image(image_path, caption=selected_option)
+    st.write("Select a chart and filter the incidents below.")
+
+    # The charts and their filters are a fragment: changing them only reruns this function,
+    # not the rest of the page
+    @st.fragment
+    def visualizations():
+        import cube as cube_module
+        cube = load_cube()
+
+        # Chart selection menu: (dimension, number of top values or None for all, static image)
+        options = {
+            'Age Range Distribution': ('AgeRange', None, 'age.png'),
+            'Gender Distribution': ('Sex', None, 'sex.png'),
+            'Top 5 Activities with Most Attacks': ('Activity', 5, 'activities.png'),
+            'Top 10 Most Common Shark Types': ('Species', 10, 'sharks.png'),
+            'Frequency of Oceans and Seas': ('Ocean_Sea', None, 'ocean.png'),
+            'Time Distribution': ('Time', None, 'time.png'),
+            'Monthly Attack Distribution': ('Month', None, 'month.png'),
+            'Number of Attacks per Year': ('Year', None, 'years.png'),
+            'Top 10 Countries with Most Attacks': ('Country', 10, None),
+            'Continent Attack Distribution': ('Continent', None, 'continent.png')
+        }
+
+        selected_option = st.selectbox('Select a chart', list(options.keys()))
+
+        # Filters
+        first_year, last_year = int(cube['Year'].min()), int(cube['Year'].max())
+        years = st.slider('Years', first_year, last_year, (max(first_year, last_year - 9), last_year))
+        continent_column, sex_column, time_column = st.columns(3)
+        continents = continent_column.multiselect('Continent', list(cube['Continent'].cat.categories))
+        sexes = sex_column.multiselect('Sex', list(cube['Sex'].cat.categories))
+        times = time_column.multiselect('Time', list(cube['Time'].cat.categories))
+
+        start = time.perf_counter()
+        selection = cube_module.filter_cube(cube, years=years, Continent=continents, Sex=sexes, Time=times)
+        dimension, top, image = options[selected_option]
+        if dimension == 'Ocean_Sea':
+            counts = cube_module.ocean_counts(selection)
         else:
-            st.error(f"Could not find the image: {image_path}")
+            counts = cube_module.counts_by(selection, dimension, top)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        st.subheader(selected_option)
+        st.bar_chart(counts.rename('Number of Attacks'), horizontal=top is not None)
+        st.caption(f"{int(selection['count'].sum())} incidents, computed in {elapsed:.1f} ms")
+
+        # Incidents behind the chart: a view of the shared table, only the shown rows are materialized
+        import views
+        view = views.filter_view(load_dataset(), years=years, index=load_bitmaps(), Continent=continents, Sex=sexes, Time=times)
+        with st.expander(f'Matching incidents ({views.view_count(view)})'):
+            st.dataframe(views.view_page(view, size=INCIDENTS_SHOWN, columns=INCIDENT_COLUMNS), hide_index=True)
+
+        static_chart = load_asset(image) if image else None
+        if static_chart is not None:
+            with st.expander('Static chart of the full dataset'):
+                st.image(static_chart, caption=selected_option)
+
+    visualizations()
 
 elif menu == 'Power BI':
     st.header('Power BI 📊')
@@ -130,24 +217,24 @@ elif menu == 'Power BI':
     """)
     
     # Add Power BI images
-    power_bi_image1_path = os.path.join(os.path.dirname(__file__), 'images', 'picture_1.png')
-    power_bi_image2_path = os.path.join(os.path.dirname(__file__), 'images', 'picture_2.png')
+    power_bi_image1 = load_asset('picture_1.png', MAIN_WIDTH)
+    power_bi_image2 = load_asset('picture_2.png', MAIN_WIDTH)
     
-    if os.path.exists(power_bi_image1_path):
-        st.image(power_bi_image1_path, caption='Power BI Visualization 1')
+    if power_bi_image1 is not None:
+        st.image(power_bi_image1, caption='Power BI Visualization 1')
     else:
-        st.error(f"Could not find the image: {power_bi_image1_path}")
+        st.error("Could not find the image: picture_1.png")
     
-    if os.path.exists(power_bi_image2_path):
-        st.image(power_bi_image2_path, caption='Power BI Visualization 2')
+    if power_bi_image2 is not None:
+        st.image(power_bi_image2, caption='Power BI Visualization 2')
     else:
-        st.error(f"Could not find the image: {power_bi_image2_path}")
+        st.error("Could not find the image: picture_2.png")
     
     # Add Power BI video
-    power_bi_video_path = os.path.join(os.path.dirname(__file__), 'images', 'clip.mp4') 
-    if os.path.exists(power_bi_video_path): 
-        st.video(power_bi_video_path) 
-    else: st.error(f"Could not find the video: {power_bi_video_path}")
+    power_bi_video = load_asset('clip.mp4') 
+    if power_bi_video is not None: 
+        st.video(power_bi_video, format='video/mp4') 
+    else: st.error("Could not find the video: clip.mp4")
 
 
 elif menu == 'Final Conclusions':
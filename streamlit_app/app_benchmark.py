@@ -0,0 +1,190 @@
+# Benchmarks of the Streamlit app
+#
+# Run from the repository root:
+#   python streamlit_app/app_benchmark.py [repeats]
+#
+# Startup: every measurement opens one section in a fresh Python process (a cold replica): the time
+# covers the first run of app.py with that section selected, and the heavy modules it imported are listed.
+# Reruns: a scripted sequence of clicks in one session, timing the rerun that follows each click.
+# Sessions: N simulated sessions of the Visualizations section, reporting the memory each session adds
+# on top of the shared dataset and the p95 render time.
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+HEAVY_MODULES = ['pandas', 'pyarrow', 'numpy', 'matplotlib']
+
+
+def first_render(section):
+    '''
+    Run the app once with a section selected, in the current process.
+
+    Returns:
+    dict: Milliseconds of the first run, exceptions shown by the app and heavy modules imported by it.
+    '''
+    from streamlit.testing.v1 import AppTest
+
+    before = set(sys.modules)
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.session_state['menu'] = section
+    start = time.perf_counter()
+    app.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    imported = [module for module in HEAVY_MODULES if module in sys.modules and module not in before]
+    return {'ms': elapsed, 'exceptions': len(app.exception), 'imported': imported}
+
+
+def sections():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP, default_timeout=60).run()
+    return list(app.sidebar.radio(key='menu').options)
+
+
+def benchmark_startup(repeats=3):
+    '''
+    Median time to first render of every menu entry, each run in a new process.
+    '''
+    results = {}
+    for section in sections():
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, __file__, '--section', section],
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        results[section] = {
+            'median_ms': round(statistics.median(run['ms'] for run in runs), 1),
+            'exceptions': max(run['exceptions'] for run in runs),
+            'imported': ', '.join(runs[0]['imported']) or '-',
+        }
+    return results
+
+
+def click_sequence(app):
+    '''
+    Scripted clicks: every menu entry, then every chart and some filters of the Visualizations section.
+    '''
+    for section in app.sidebar.radio(key='menu').options:
+        yield 'menu', lambda section=section: app.sidebar.radio(key='menu').set_value(section)
+    yield 'menu', lambda: app.sidebar.radio(key='menu').set_value('Visualizations')
+    for chart in app.selectbox[0].options:
+        yield 'chart', lambda chart=chart: app.selectbox[0].set_value(chart)
+    yield 'filter', lambda: app.slider[0].set_range(1950, 2023)
+    yield 'filter', lambda: app.multiselect[0].select('Oceania')
+    yield 'filter', lambda: app.multiselect[1].select('F')
+    yield 'filter', lambda: app.multiselect[0].unselect('Oceania')
+
+
+def benchmark_reruns(rounds=3):
+    '''
+    Rerun latency of the click sequence in a warm session (the first round fills the caches and is discarded).
+
+    Returns:
+    dict: Kind of click -> number of reruns, median and p95 milliseconds.
+    '''
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP, default_timeout=60).run()
+    timings = {}
+    for round_number in range(rounds + 1):
+        app.sidebar.radio(key='menu').set_value('Project Objectives').run()
+        # The widgets of a step only exist once the previous rerun rendered them, so the sequence is lazy
+        for kind, click in click_sequence(app):
+            click()
+            start = time.perf_counter()
+            app.run()
+            if round_number:
+                timings.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+            assert not app.exception, app.exception
+    return {kind: {'reruns': len(values), 'median_ms': round(statistics.median(values), 1),
+                   'p95_ms': round(statistics.quantiles(values, n=20)[-1], 1)}
+            for kind, values in timings.items()}
+
+
+def drive_sessions(sessions, clicks):
+    '''
+    Open the Visualizations section in several sessions and switch each one through some charts.
+
+    Returns:
+    tuple: The sessions (kept alive) and the milliseconds of every render.
+    '''
+    from streamlit.testing.v1 import AppTest
+
+    apps, timings = [], []
+    for _ in range(sessions):
+        app = AppTest.from_file(APP, default_timeout=60)
+        app.session_state['menu'] = 'Visualizations'
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        apps.append(app)
+    for click in range(clicks):
+        for number, app in enumerate(apps):
+            charts = app.selectbox[0].options
+            app.selectbox[0].set_value(charts[(number + click + 1) % len(charts)])
+            start = time.perf_counter()
+            app.run()
+            timings.append((time.perf_counter() - start) * 1000)
+            assert not app.exception, app.exception
+    return apps, timings
+
+
+def benchmark_sessions(sessions=20, clicks=5):
+    '''
+    Load test of N sessions in one process. Timings and memory come from two separate runs
+    because tracemalloc slows the renders down.
+
+    Returns:
+    dict: Renders, median and p95 milliseconds, size of the shared table and the Python and Arrow
+    memory added per session.
+    '''
+    import gc
+    import tracemalloc
+    import pyarrow as pa
+    sys.path.append(os.path.join(os.path.dirname(APP), '..', 'notebooks'))
+    import views
+
+    # Warm-up: fills the process-wide resource caches (dataset, cube, images)
+    drive_sessions(1, 1)
+    apps, timings = drive_sessions(sessions, clicks)
+    del apps
+    gc.collect()
+
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    python_before = tracemalloc.get_traced_memory()[0]
+    apps, _ = drive_sessions(sessions, clicks)
+    gc.collect()
+    python_added = tracemalloc.get_traced_memory()[0] - python_before
+    tracemalloc.stop()
+    arrow_added = pa.total_allocated_bytes() - arrow_before
+
+    table = views.load_table(os.path.join(os.path.dirname(APP), '..', 'notebooks', 'cleaned_data.parquet'))
+    return {
+        'sessions': sessions,
+        'renders': len(timings),
+        'median_ms': round(statistics.median(timings), 1),
+        'p95_ms': round(statistics.quantiles(timings, n=20)[-1], 1),
+        'table_kb': round(table.nbytes / 1024, 1),
+        'python_kb_per_session': round(python_added / sessions / 1024, 1),
+        'arrow_kb_per_session': round(arrow_added / sessions / 1024, 1),
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--section':
+        print(json.dumps(first_render(sys.argv[2])))
+    else:
+        repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+        for section, result in benchmark_startup(repeats).items():
+            print(f"{section:<22} {result['median_ms']:>8.1f} ms  exceptions: {result['exceptions']}  imports: {result['imported']}")
+        print()
+        for kind, result in benchmark_reruns(repeats).items():
+            print(f"{kind:<8} {result['reruns']:>4} reruns  median {result['median_ms']:>7.1f} ms  p95 {result['p95_ms']:>7.1f} ms")
+        print()
+        print(benchmark_sessions())
@@ -0,0 +1,25 @@
+# The modules of the notebooks folder import each other by name, as when run from that folder
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'notebooks'))
+
+import pandas as pd
+import pytest
+
+import synthetic
+
+
+@pytest.fixture(scope='session')
+def spreadsheet(tmp_path_factory):
+    '''
+    Folder with a synthetic GSAF5.xlsx of 3000 rows and its CSV export GSAF5.csv.
+    '''
+    folder = tmp_path_factory.mktemp('raw')
+    raw = next(synthetic.generate(3000, chunk_size=3000, seed=0))
+    # A CSV cannot tell the ages stored as numbers from the ages written as text (see streaming.py)
+    raw['Age'] = raw['Age'].map(lambda age: str(age) if isinstance(age, int) else age)
+    raw.to_excel(folder / 'GSAF5.xlsx', index=False)
+    # A CSV export of the spreadsheet writes its date cells as ISO timestamps
+    pd.read_excel(folder / 'GSAF5.xlsx').to_csv(folder / 'GSAF5.csv', index=False)
+    return folder
@@ -0,0 +1,124 @@
+# Equivalence of the vectorized cleaning functions with the row-wise code they replaced
+#
+# Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmarks
+import functions as f
+import synthetic
+
+
+@pytest.fixture(scope='module')
+def raw():
+    # A few thousand seeded rows in the raw forms of the spreadsheet
+    return next(synthetic.generate(3000, chunk_size=3000, seed=0))
+
+
+calls = []
+
+
+def shout(value):
+    # A cleaner that counts its calls
+    calls.append(value)
+    return value if pd.isna(value) else value.upper()
+
+
+def legacy_classify_time(times):
+    return times.apply(f.clean_time_format).replace('', np.nan).apply(f.categorize_time)
+
+
+def test_classify_time_sample():
+    times = pd.Series(benchmarks.SAMPLE_TIMES, dtype=object)
+    assert benchmarks.same_values(legacy_classify_time(times), f.classify_time(times))
+
+
+def test_classify_time_synthetic(raw):
+    times = raw['Time']
+    assert benchmarks.same_values(legacy_classify_time(times), f.classify_time(times))
+
+
+def test_normalize_dates_sample():
+    dates = pd.Series(benchmarks.SAMPLE_DATES, dtype=object)
+    assert benchmarks.same_values(dates.apply(f.clean_date), f.normalize_dates(dates))
+
+
+def test_normalize_dates_synthetic(raw):
+    dates = raw['Date']
+    assert benchmarks.same_values(dates.apply(f.clean_date), f.normalize_dates(dates))
+
+
+def test_clean_age_sample():
+    ages = pd.Series(benchmarks.SAMPLE_AGES, dtype=object)
+    old = benchmarks.legacy_clean_age(pd.DataFrame({'Age': ages}))
+    new = f.clean_age(pd.DataFrame({'Age': ages}))
+    assert benchmarks.same_values(old['Age'], new['Age'])
+
+
+def test_clean_age_synthetic(raw):
+    old = benchmarks.legacy_clean_age(raw[['Age']].copy())
+    new = f.clean_age(raw[['Age']].copy())
+    assert benchmarks.same_values(old['Age'], new['Age'])
+
+
+@pytest.mark.parametrize('age, expected', [
+    ('30', (30, 30, 30)),
+    (30, (30, 30, 30)),
+    ('21 or 27', (24, 21, 27)),
+    ('20/30', (25, 20, 30)),
+    ('2 1/2', (2, 2, 2)),
+    ('6½', (6, 6, 6)),
+    ('3 1/2 & 40', (21, 3, 40)),
+])
+def test_parse_ages(age, expected):
+    parsed = f.parse_ages(pd.Series([age], dtype=object), bounds=True)
+    assert tuple(parsed.iloc[0]) == expected
+
+
+def test_species_report_is_json_safe(tmp_path):
+    df = pd.DataFrame({'Species': ['White shark', 'Questionable', np.nan, 'Tiger shark']})
+    cleaned = f.clean_and_normalize_species(df, 'Species')
+    assert cleaned.attrs['rejected_rows']['Species'][None] == 1
+    cleaned.to_parquet(tmp_path / 'species.parquet')
+
+
+def test_species_report_does_not_touch_the_input():
+    df = pd.DataFrame({'Species': ['White shark', 'Tiger shark']})
+    cleaned = f.clean_and_normalize_species(df, 'Species')
+    assert cleaned is not df and 'rejected_rows' not in df.attrs
+
+
+def test_compact_dtypes_out_of_range_ages():
+    compact = f.compact_dtypes(pd.DataFrame({'Age': [25, 200, 2.5, -1]}))
+    assert str(compact['Age'].dtype) == 'Int8'
+    assert compact['Age'].tolist() == [25, pd.NA, 2, pd.NA]
+
+
+def test_apply_on_uniques_memo_cache(tmp_path):
+    values = pd.Series(['a', 'b', np.nan, 'a', 'c', np.nan], dtype=object)
+    expected = values.apply(shout)
+
+    calls.clear()
+    first = f.apply_on_uniques(values, shout, cache_dir=str(tmp_path))
+    assert benchmarks.same_values(expected, first)
+    assert sorted(value for value in calls if isinstance(value, str)) == ['a', 'b', 'c']
+
+    # Cached values are read back, only the missing values go through the cleaner
+    calls.clear()
+    second = f.apply_on_uniques(values, shout, cache_dir=str(tmp_path))
+    assert benchmarks.same_values(expected, second)
+    assert all(pd.isna(value) for value in calls)
+
+    # A new version of the cleaner ignores the file of the previous one
+    calls.clear()
+    other = f.apply_on_uniques(values, shout, cache_dir=str(tmp_path), version='other')
+    assert benchmarks.same_values(expected, other)
+    assert sorted(value for value in calls if isinstance(value, str)) == ['a', 'b', 'c']
+    assert (tmp_path / f'shout-{f.cleaner_version(shout)}.pkl').exists() and (tmp_path / 'shout-other.pkl').exists()
+
+
+@pytest.mark.parametrize('ages', [['30', '40s', 'teen'], ['30', '2.5'], [np.nan]])
+def test_clean_age_dtype(ages):
+    assert f.clean_age(pd.DataFrame({'Age': ages}))['Age'].dtype == np.float64
@@ -0,0 +1,63 @@
+# The stage cache and the incremental mode of the pipeline against a full run
+#
+# Run from the repository root:  python -m pytest tests
+
+import pandas as pd
+import pytest
+
+import pipeline
+import synthetic
+
+
+EDITED, DROPPED, ADDED = 50, 100, 200
+
+
+@pytest.fixture(scope='module')
+def updated(spreadsheet):
+    '''
+    The synthetic spreadsheet with some rows edited, some dropped and new rows at the end.
+    '''
+    raw = pd.read_excel(spreadsheet / 'GSAF5.xlsx')
+    raw.loc[raw.index[:EDITED], 'Activity'] = raw['Activity'][:EDITED].fillna('') + ' (edited)'
+    raw = raw.drop(raw.index[EDITED:EDITED + DROPPED])
+    added = next(synthetic.generate(ADDED, chunk_size=ADDED, seed=1))
+    added['original order'] += len(raw) + DROPPED
+    pd.concat([raw, added], ignore_index=True).to_excel(spreadsheet / 'GSAF5_updated.xlsx', index=False)
+    return spreadsheet / 'GSAF5_updated.xlsx'
+
+
+def test_stage_cache(spreadsheet, updated, tmp_path):
+    source = str(spreadsheet / 'GSAF5.xlsx')
+    statuses = lambda df: {name: stage['status'] for name, stage in df.attrs['stages'].items()}
+    run = lambda source, **kwargs: pipeline.run_pipeline(source, None, str(tmp_path), verbose=False,
+                                                         cube_output=None, **kwargs)
+
+    first = run(source)
+    assert set(statuses(first).values()) == {'ran'}
+    second = run(source)
+    assert set(statuses(second).values()) == {'cached'}
+    pd.testing.assert_frame_equal(first, second)
+
+    # A forced stage with the same output leaves the stages after it cached
+    forced = statuses(run(source, force=['impute']))
+    assert forced.pop('impute') == 'ran' and set(forced.values()) == {'cached'}
+
+    # New source bytes miss the cache of every stage
+    assert set(statuses(run(str(updated))).values()) == {'ran'}
+
+
+def test_incremental_matches_pipeline(spreadsheet, updated, tmp_path):
+    store = str(tmp_path / 'cleaned_rows.pkl')
+    run = lambda source: pipeline.run_incremental(str(source), None, store, verbose=False, cube_output=None)
+
+    first = run(spreadsheet / 'GSAF5.xlsx')
+    rows = first.attrs['delta']['new']
+    assert first.attrs['delta'] == {'new': rows, 'changed': 0, 'removed': 0, 'reused': 0}
+    pd.testing.assert_frame_equal(first, pipeline.run_pipeline(str(spreadsheet / 'GSAF5.xlsx'), None, None,
+                                                               verbose=False, cube_output=None))
+
+    second = run(updated)
+    assert second.attrs['delta'] == {'new': ADDED, 'changed': EDITED, 'removed': DROPPED,
+                                     'reused': rows - EDITED - DROPPED}
+    pd.testing.assert_frame_equal(second, pipeline.run_pipeline(str(updated), None, None, verbose=False,
+                                                                cube_output=None))
@@ -0,0 +1,41 @@
+# The streaming mode against the in-memory pipeline on the same raw rows
+#
+# Run from the repository root:  python -m pytest tests
+
+import pandas as pd
+import pytest
+
+import cube
+import functions as f
+import pipeline
+import streaming
+
+
+def as_objects(df):
+    # Chunks written one after the other have the categories in another order
+    return df.astype({column: object for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)})
+
+
+@pytest.fixture(scope='module')
+def batch(spreadsheet):
+    output, cube_output = spreadsheet / 'batch.parquet', spreadsheet / 'batch_cube.parquet'
+    pipeline.run_pipeline(str(spreadsheet / 'GSAF5.xlsx'), str(output), cache_dir=None, verbose=False,
+                          cube_output=str(cube_output))
+    return f.load_cleaned(str(output)), cube.load_cube(str(cube_output))
+
+
+@pytest.mark.parametrize('chunk_rows', [700, 10_000])
+def test_streaming_csv_export_matches_pipeline(spreadsheet, batch, chunk_rows, tmp_path):
+    output, cube_output = tmp_path / 'streaming.parquet', tmp_path / 'streaming_cube.parquet'
+    streaming.run_streaming(str(spreadsheet / 'GSAF5.csv'), str(output), str(cube_output), chunk_rows=chunk_rows,
+                            verbose=False)
+    cleaned, counts = batch
+    pd.testing.assert_frame_equal(as_objects(cleaned), as_objects(f.load_cleaned(str(output))), check_dtype=False)
+    pd.testing.assert_frame_equal(as_objects(counts), as_objects(cube.load_cube(str(cube_output))), check_dtype=False)
+
+
+def test_excel_dates():
+    dates = pd.Series(['2002-03-25 00:00:00', '2019-05-10', '25 Mar 2002', '1900-1905', None], dtype=object)
+    parsed = streaming.excel_dates(dates)
+    assert parsed[0] == pd.Timestamp('2002-03-25') and parsed[1] == pd.Timestamp('2019-05-10')
+    assert parsed[2:4].tolist() == ['25 Mar 2002', '1900-1905'] and pd.isna(parsed[4])